@@ -0,0 +1,71 @@
+import time
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+TAG_CACHE_PREFIX = "cache:tag"
+
+
+def table_tag(table):
+    return f"{TAG_CACHE_PREFIX}:{table}"
+
+
+def bulk_tag(table):
+    return f"{TAG_CACHE_PREFIX}:{table}:bulk"
+
+
+def row_tag(table, pk):
+    return f"{TAG_CACHE_PREFIX}:{table}:row:{pk}"
+
+
+def model_tags(model, pks=None):
+    table = model._meta.db_table
+    # Escritas por queryset não dizem quais linhas mudaram: derrubam a tag "bulk", da qual
+    # dependem todas as entradas de linha da tabela.
+    if pks is None:
+        return [table_tag(table), bulk_tag(table)]
+    return [table_tag(table), *(row_tag(table, pk) for pk in pks)]
+
+
+def queryset_tags(queryset, pk=None):
+    query = queryset.query.clone()
+    query.get_compiler(using=queryset.db).as_sql()
+    tables = {queryset.model._meta.db_table}
+    tables.update(alias.table_name for alias in query.alias_map.values())
+
+    if pk is None:
+        return [table_tag(table) for table in tables]
+
+    table = queryset.model._meta.db_table
+    tags = [row_tag(table, pk), bulk_tag(table)]
+    tags.extend(table_tag(joined) for joined in tables if joined != table)
+    return tags
+
+
+def get_tag_versions(tags):
+    tags = sorted(set(tags))
+    versions = cache.get_many(tags)
+    for tag in tags:
+        if tag not in versions:
+            # Começar do relógio evita que uma tag expulsa do Redis volte para uma versão antiga e
+            # reative entradas obsoletas.
+            cache.add(tag, time.time_ns(), timeout=None)
+            versions[tag] = cache.get(tag)
+    return ":".join(str(versions[tag]) for tag in tags)
+
+
+def invalidate_tags(tags):
+    for tag in tags:
+        try:
+            cache.incr(tag)
+        except ValueError:
+            cache.add(tag, time.time_ns(), timeout=None)
+
+
+def invalidate_model(model, pks=None):
+    tags = model_tags(model, pks)
+    invalidate_tags(tags)
+    # Leitores de outras conexões ainda enxergam o estado antigo até o commit e podem ter gravado
+    # valores sob a versão nova; o segundo incremento descarta essas entradas.
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: invalidate_tags(tags))
@@ -0,0 +1,43 @@
+import json
+
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_ENCODER = JSONEncoder()
+
+
+def fast_path_enabled():
+    return orjson is not None and settings.JSON_FAST_PATH
+
+
+def dumps(data):
+    # Mesmo resultado do JSONRenderer padrão do DRF (compacto, UTF-8): o que o orjson não
+    # serializa sozinho, inclusive datas, passa pelo encoder do DRF ("Z" em UTC, Decimal como
+    # número, QuerySet como lista).
+    if fast_path_enabled():
+        return orjson.dumps(
+            data,
+            default=_ENCODER.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+    return json.dumps(
+        data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps_ascii(data):
+    # Linhas de log continuam ASCII: o caminho rápido só vale quando não há o que escapar.
+    if fast_path_enabled():
+        encoded = orjson.dumps(
+            data,
+            default=_ENCODER.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+        if encoded.isascii():
+            return encoded.decode("ascii")
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=True, separators=(",", ":"))
@@ -0,0 +1,86 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from django.urls import resolve
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from apps.core import json_codec
+from apps.core.parsers import FastJSONParser
+from apps.core.renderers import FastJSONRenderer
+
+ENDPOINTS = (
+    ("orders", "/api/v1/orders/", {"expand": "items,status_history"}),
+    ("products", "/api/v1/products/", {}),
+    ("customers", "/api/v1/customers/", {}),
+)
+
+
+def _fetch(path, params):
+    request = APIRequestFactory().get(path, params, HTTP_ACCEPT="application/json")
+    response = resolve(path).func(request)
+    return response.data
+
+
+def _per_call_ms(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def run_json_benchmark(iterations=200, page_size=100):
+    renderers = {"drf": JSONRenderer(), "fast": FastJSONRenderer()}
+    parsers = {"drf": JSONParser(), "fast": FastJSONParser()}
+
+    results = []
+    for name, path, params in ENDPOINTS:
+        data = _fetch(path, {**params, "page_size": page_size})
+        bodies = {key: renderer.render(data) for key, renderer in renderers.items()}
+        render_ms = {
+            key: _per_call_ms(lambda renderer=renderer: renderer.render(data), iterations)
+            for key, renderer in renderers.items()
+        }
+        parse_ms = {
+            key: _per_call_ms(
+                lambda parser=parser: parser.parse(io.BytesIO(bodies["drf"])), iterations
+            )
+            for key, parser in parsers.items()
+        }
+        results.append(
+            {
+                "endpoint": name,
+                "rows": len(data.get("results", [])),
+                "bytes": len(bodies["drf"]),
+                "identical": bodies["drf"] == bodies["fast"],
+                "render_drf_ms": round(render_ms["drf"], 3),
+                "render_fast_ms": round(render_ms["fast"], 3),
+                "render_speedup": round(render_ms["drf"] / render_ms["fast"], 2),
+                "parse_drf_ms": round(parse_ms["drf"], 3),
+                "parse_fast_ms": round(parse_ms["fast"], 3),
+                "parse_speedup": round(parse_ms["drf"] / parse_ms["fast"], 2),
+            }
+        )
+    return results
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o renderer/parser JSON padrão do DRF com os de apps.core (orjson, quando "
+        "instalado) sobre as listagens de pedidos, produtos e clientes do banco atual."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--page-size", type=int, default=100)
+
+    def handle(self, *args, **options):
+        if not json_codec.fast_path_enabled():
+            self.stdout.write(
+                "orjson indisponível ou JSON_FAST_PATH desligado: os dois lados usam o json "
+                "da biblioteca padrão."
+            )
+        for result in run_json_benchmark(options["iterations"], options["page_size"]):
+            self.stdout.write(" ".join(f"{key}={value}" for key, value in result.items()))
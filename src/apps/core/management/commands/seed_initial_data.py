@@ -5,6 +5,7 @@ from django.core.management.base import BaseCommand
 from apps.customers.models import Customer
 from apps.orders.models import Order, OrderItem, OrderStatus, OrderStatusHistory
 from apps.products.models import Product
+from apps.products.stock import set_stock
 
 
 class Command(BaseCommand):
@@ -55,6 +56,7 @@ class Command(BaseCommand):
                 sku=product_data["sku"],
                 defaults=product_data,
             )
+            set_stock(product, product_data["stock_quantity"], reference="seed")
             products[product.sku] = product
 
         return products
@@ -0,0 +1,228 @@
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Labels inválidos para a métrica {self.name}: {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        with self._lock:
+            return {key: self._copy(value) for key, value in self._values.items()}
+
+    def _copy(self, value):
+        return value
+
+    def describe(self):
+        return {
+            "kind": self.kind,
+            "documentation": self.documentation,
+            "labelnames": list(self.labelnames),
+        }
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+                self._values[key] = state
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    state["buckets"][index] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _copy(self, value):
+        return {"buckets": list(value["buckets"]), "sum": value["sum"], "count": value["count"]}
+
+    def describe(self):
+        return {**super().describe(), "buckets": list(self.buckets)}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _get_or_create(self, metric_class, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_class(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"Métrica {name} já registrada com outro tipo.")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def collect(self):
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self):
+        return {
+            metric.name: {
+                **metric.describe(),
+                "samples": [[list(key), value] for key, value in metric.samples().items()],
+            }
+            for metric in self.collect()
+        }
+
+
+REGISTRY = MetricsRegistry()
+
+_flush_lock = threading.Lock()
+_process = {"pid": None, "path": None, "flushed_at": 0.0}
+
+
+def _process_path(directory):
+    # O sufixo aleatório evita que um worker novo com o pid de um antigo sobrescreva (e faça
+    # regredir) os contadores que o anterior deixou.
+    if _process["pid"] != os.getpid():
+        _process.update(
+            pid=os.getpid(),
+            path=os.path.join(directory, f"{os.getpid()}-{uuid.uuid4().hex}.json"),
+            flushed_at=0.0,
+        )
+    return _process["path"]
+
+
+def flush(force=False):
+    directory = settings.METRICS_MULTIPROC_DIR
+    if not directory:
+        return
+
+    with _flush_lock:
+        now = time.monotonic()
+        if not force and now - _process["flushed_at"] < settings.METRICS_FLUSH_INTERVAL:
+            return
+        path = _process_path(directory)
+        _process["flushed_at"] = now
+
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(REGISTRY.snapshot(), file)
+        os.replace(temporary, path)
+
+
+def collect():
+    directory = settings.METRICS_MULTIPROC_DIR
+    if not directory:
+        return REGISTRY.snapshot()
+
+    # Cada worker grava o próprio snapshot; a leitura soma todos, inclusive os de workers já
+    # encerrados, para que os contadores não voltem quando o gunicorn recicla um processo.
+    flush(force=True)
+    merged = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        try:
+            with open(path, encoding="utf-8") as file:
+                snapshot = json.load(file)
+        except (OSError, ValueError):
+            continue
+        for name, metric in snapshot.items():
+            _merge(merged.setdefault(name, {**metric, "samples": {}}), metric["samples"])
+
+    for metric in merged.values():
+        metric["samples"] = [[list(key), value] for key, value in metric["samples"].items()]
+    return merged
+
+
+def _merge(target, samples):
+    for key, value in samples:
+        key = tuple(key)
+        current = target["samples"].get(key)
+        if current is None:
+            target["samples"][key] = value
+        elif target["kind"] == "histogram":
+            current["buckets"] = [a + b for a, b in zip(current["buckets"], value["buckets"])]
+            current["sum"] += value["sum"]
+            current["count"] += value["count"]
+        else:
+            target["samples"][key] = current + value
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+def render(snapshot):
+    lines = []
+    for name in sorted(snapshot):
+        metric = snapshot[name]
+        names = metric["labelnames"]
+        lines.append(f"# HELP {name} {_escape(metric['documentation'])}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        for key, value in sorted(metric["samples"]):
+            if metric["kind"] != "histogram":
+                lines.append(f"{name}{_labels(names, key)} {value}")
+                continue
+            # observe() já conta a observação em todos os buckets que a comportam (cumulativo).
+            for upper_bound, count in zip(metric["buckets"], value["buckets"]):
+                lines.append(f"{name}_bucket{_labels(names, key, [('le', upper_bound)])} {count}")
+            lines.append(f"{name}_bucket{_labels(names, key, [('le', '+Inf')])} {value['count']}")
+            lines.append(f"{name}_sum{_labels(names, key)} {value['sum']}")
+            lines.append(f"{name}_count{_labels(names, key)} {value['count']}")
+    return "\n".join(lines) + "\n"
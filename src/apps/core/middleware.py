@@ -1,8 +1,35 @@
 import logging
+import random
 import time
 import uuid
 
-from apps.core.observability import reset_correlation_id, set_correlation_id
+from django.conf import settings
+
+from apps.core import metrics
+from apps.core.metrics import REGISTRY
+from apps.core.observability import reset_correlation_id, set_correlation_id, track_queries
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Duração das requisições por método e rota (template da URL).",
+    labelnames=("method", "route"),
+)
+REQUESTS = REGISTRY.counter(
+    "http_requests_total",
+    "Requisições por método, rota e status HTTP.",
+    labelnames=("method", "route", "status"),
+)
+REQUEST_DB_QUERIES = REGISTRY.histogram(
+    "http_request_db_queries",
+    "Consultas ao banco por requisição, por rota.",
+    labelnames=("route",),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200),
+)
+REQUEST_DB_SECONDS = REGISTRY.histogram(
+    "http_request_db_seconds",
+    "Tempo gasto em consultas ao banco por requisição, por rota.",
+    labelnames=("route",),
+)
 
 
 class RequestLoggingMiddleware:
@@ -17,9 +44,11 @@ class RequestLoggingMiddleware:
         request.correlation_id = correlation_id
         start = time.perf_counter()
         client_ip = self._get_client_ip(request)
+        status_code = 500
 
         try:
-            response = self.get_response(request)
+            with track_queries(profile=self._should_profile()) as queries:
+                response = self.get_response(request)
         except Exception:
             duration_ms = round((time.perf_counter() - start) * 1000, 2)
             self.logger.exception(
@@ -30,6 +59,7 @@ class RequestLoggingMiddleware:
                     "status_code": 500,
                     "duration_ms": duration_ms,
                     "client_ip": client_ip,
+                    **self._query_fields(queries),
                 },
             )
             raise
@@ -51,13 +81,39 @@ class RequestLoggingMiddleware:
                     "status_code": status_code,
                     "duration_ms": duration_ms,
                     "client_ip": client_ip,
+                    **self._query_fields(queries),
                 },
             )
             response["X-Correlation-ID"] = correlation_id
             return response
         finally:
+            self._record_metrics(request, status_code, time.perf_counter() - start, queries)
             reset_correlation_id(token)
 
+    def _should_profile(self):
+        # Amostragem: o wrapper é barato, mas normalizar cada SQL tem custo em toda requisição.
+        rate = settings.SQL_PROFILE_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    def _query_fields(self, queries):
+        fields = {"db_queries": queries.count, "db_time_ms": round(queries.duration * 1000, 2)}
+        if queries.profile:
+            fields["sql_profile"] = queries.report()
+        return fields
+
+    def _record_metrics(self, request, status_code, duration, queries):
+        route = self._get_route(request)
+        REQUEST_DURATION.observe(duration, method=request.method, route=route)
+        REQUESTS.inc(method=request.method, route=route, status=status_code)
+        REQUEST_DB_QUERIES.observe(queries.count, route=route)
+        REQUEST_DB_SECONDS.observe(queries.duration, route=route)
+        metrics.flush()
+
+    def _get_route(self, request):
+        # O template da rota, não o caminho: IDs na URL multiplicariam as séries.
+        match = getattr(request, "resolver_match", None)
+        return f"/{match.route}" if match is not None else "unmatched"
+
     def _get_client_ip(self, request):
         forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
         if forwarded_for:
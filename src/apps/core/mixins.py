@@ -0,0 +1,344 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from apps.core.cache import get_tag_versions, queryset_tags
+from apps.core.metrics import REGISTRY
+
+RESPONSE_CACHE_PREFIX = "responses"
+LIST_VALIDATORS_PREFIX = "conditional:list"
+RESPONSE_CACHE_POLL_INTERVAL = 0.05
+
+RESPONSE_CACHE_REQUESTS = REGISTRY.counter(
+    "response_cache_requests_total",
+    "Respostas servidas pelo cache de respostas por view e resultado.",
+    labelnames=("view", "result"),
+)
+
+FIELDS_PARAMETER = OpenApiParameter(
+    name="fields",
+    type=str,
+    description="Campos retornados, separados por vírgula (ex.: id,status).",
+)
+
+
+class SparseFieldsMixin:
+    fields_query_param = "fields"
+    sparse_fields_actions = ("list", "retrieve")
+
+    def get_sparse_fields(self):
+        if self.action not in self.sparse_fields_actions:
+            return None
+
+        raw = self.request.query_params.get(self.fields_query_param)
+        if not raw:
+            return None
+
+        requested = {name.strip() for name in raw.split(",") if name.strip()}
+        unknown = requested - set(self.get_available_fields())
+        if unknown:
+            raise ValidationError(
+                {self.fields_query_param: f"Campos inválidos: {', '.join(sorted(unknown))}."}
+            )
+        return requested
+
+    def get_fields_context(self):
+        # Contexto que muda os campos disponíveis (ex.: relações de ?expand=), sem "fields":
+        # é justamente ele que está sendo calculado.
+        return {}
+
+    def get_available_fields(self):
+        return self.get_serializer_class()(context=self.get_fields_context()).fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.get_sparse_fields()
+        return context
+
+    def project_queryset(self, queryset, columns=()):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            columns = self.get_projection(queryset.model, fields)
+        if not columns:
+            return queryset
+
+        # Relações lidas pelo serializer vêm no mesmo SELECT, junto com a FK que as liga.
+        related = {column.rsplit("__", 1)[0] for column in columns if "__" in column}
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*columns, *related)
+
+    def get_projection(self, model, fields):
+        serializer_fields = self.get_available_fields()
+        columns = set()
+        for name in fields:
+            path = serializer_fields[name].source.split(".")
+            if path == ["*"]:
+                return None
+
+            # Campos calculados fora do modelo podem depender de qualquer coluna: nesse caso,
+            # carregar a linha inteira evita uma consulta extra por objeto.
+            try:
+                field = model._meta.get_field(path[0])
+                for part in path[1:]:
+                    field = field.related_model._meta.get_field(part)
+            except (FieldDoesNotExist, AttributeError):
+                return None
+            # Relações reversas expandidas chegam por prefetch, não por coluna.
+            if not field.concrete:
+                continue
+            columns.add("__".join(path))
+        return columns
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "O recurso foi alterado desde a versão informada em If-Match."
+    default_code = "precondition_failed"
+
+
+def _strip_weak(etag):
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+class ConditionalRequestMixin:
+    conditional_actions = ("list", "retrieve")
+    # Varreduras por cursor existem justamente para não agregar a tabela inteira.
+    unconditional_query_params = ("cursor",)
+    etag_timestamp_fields = ("updated_at",)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.validators = None
+
+        if (
+            request.method in ("GET", "HEAD")
+            and self.action in self.conditional_actions
+            and not any(param in request.query_params for param in self.unconditional_query_params)
+        ):
+            self.validators = self.get_validators(detail=self.action != "list")
+            self.check_not_modified(request, *self.validators)
+        elif request.method in ("PATCH", "DELETE") and "If-Match" in request.headers:
+            etag, _ = self.get_validators(detail=True)
+            self.check_if_match(request, etag)
+
+    def get_validators(self, detail):
+        queryset = self.get_queryset()
+        if not detail:
+            return self.get_list_validators(self.filter_queryset(queryset))
+        queryset = queryset.filter(pk=self.kwargs["id"])
+
+        # Só agregados sobre updated_at/id da linha: nada de montar ou serializar o corpo.
+        aggregates = queryset.order_by().aggregate(
+            rows=Count("pk", distinct=True),
+            **{
+                f"max_{index}": Max(field) for index, field in enumerate(self.etag_timestamp_fields)
+            },
+        )
+        timestamps = [
+            aggregates[f"max_{index}"]
+            for index in range(len(self.etag_timestamp_fields))
+            if aggregates[f"max_{index}"] is not None
+        ]
+        if not aggregates["rows"]:
+            return None, None
+
+        # Caches revalidam por URL, então fields e expand não entram na ETag; assim o If-Match
+        # das ações de escrita compara com a ETag do detalhe.
+        fingerprint = "|".join(
+            [
+                queryset.model._meta.label_lower,
+                str(self.kwargs["id"]),
+                str(aggregates["rows"]),
+                *(timestamp.isoformat() for timestamp in timestamps),
+            ]
+        )
+        etag = quote_etag(hashlib.sha1(fingerprint.encode("utf-8")).hexdigest())
+        return f"W/{etag}", max(timestamps) if timestamps else None
+
+    def get_list_validators(self, queryset):
+        # Listagens não agregam a tabela filtrada (seria o COUNT(*) que a paginação evita): a
+        # ETag vem das versões das tags das tabelas lidas, que qualquer escrita incrementa, e
+        # Last-Modified é o instante em que esse conjunto de versões foi visto pela primeira vez.
+        versions = get_tag_versions(queryset_tags(queryset))
+        fingerprint = f"{queryset.model._meta.label_lower}|{versions}"
+        digest = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+
+        key = f"{LIST_VALIDATORS_PREFIX}:{digest}"
+        cache.add(key, time.time(), timeout=settings.LIST_VALIDATORS_TTL)
+        seen_at = cache.get(key) or time.time()
+        return f"W/{quote_etag(digest)}", datetime.fromtimestamp(seen_at, tz=timezone.utc)
+
+    def check_not_modified(self, request, etag, last_modified):
+        if etag is None:
+            return
+
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match is not None:
+            candidates = {_strip_weak(value) for value in parse_etags(if_none_match)}
+            if "*" in candidates or _strip_weak(etag) in candidates:
+                raise NotModified()
+            return
+
+        if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+        if (
+            if_modified_since is not None
+            and last_modified is not None
+            and int(last_modified.timestamp()) <= if_modified_since
+        ):
+            raise NotModified()
+
+    def check_if_match(self, request, etag):
+        candidates = {_strip_weak(value) for value in parse_etags(request.headers["If-Match"])}
+        if etag is None:
+            # Recurso inexistente: o 404 sai da própria ação.
+            return
+        if "*" not in candidates and _strip_weak(etag) not in candidates:
+            raise PreconditionFailed()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            self._set_validator_headers(response)
+            return response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            self._set_validator_headers(response)
+        return response
+
+    def get_validator_headers(self):
+        etag, last_modified = getattr(self, "validators", None) or (None, None)
+        headers = {}
+        if etag is not None:
+            headers["ETag"] = etag
+        if last_modified is not None:
+            headers["Last-Modified"] = http_date(last_modified.timestamp())
+        return headers
+
+    def _set_validator_headers(self, response):
+        # Respostas do cache de respostas já trazem os validadores do corpo que foi guardado.
+        for name, value in self.get_validator_headers().items():
+            response.setdefault(name, value)
+
+
+class ResponseCacheMixin:
+    response_cache_actions = ()
+
+    def list(self, request, *args, **kwargs):
+        compute = super().list
+        if self.action not in self.response_cache_actions:
+            return compute(request, *args, **kwargs)
+        return self.get_cached_response(lambda: compute(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        compute = super().retrieve
+        if self.action not in self.response_cache_actions:
+            return compute(request, *args, **kwargs)
+        return self.get_cached_response(
+            lambda: compute(request, *args, **kwargs), pk=self.kwargs["id"]
+        )
+
+    def get_cached_response(self, compute, pk=None):
+        request = self.request
+        if request.accepted_renderer.format != "json":
+            return compute()
+
+        queryset = (
+            self.get_queryset() if pk is not None else self.filter_queryset(self.get_queryset())
+        )
+        key = self.get_response_cache_key(queryset, pk)
+        lock_key = f"{key}:lock"
+        view = type(self).__name__
+
+        entry = cache.get(key)
+        if entry is not None and entry["fresh_until"] > time.time():
+            return self._cached_http_response(entry, view, "hit")
+
+        # Só quem pega o lock recalcula; os demais servem a cópia vencida ou esperam a nova.
+        if not cache.add(lock_key, 1, timeout=settings.RESPONSE_CACHE_LOCK_TIMEOUT):
+            if entry is not None:
+                return self._cached_http_response(entry, view, "stale")
+            entry = self._wait_for_entry(key, lock_key)
+            if entry is not None:
+                return self._cached_http_response(entry, view, "hit")
+            RESPONSE_CACHE_REQUESTS.inc(view=view, result="bypass")
+            return compute()
+
+        try:
+            RESPONSE_CACHE_REQUESTS.inc(view=view, result="miss")
+            response = compute()
+            if response.status_code == status.HTTP_200_OK:
+                self._store(key, response)
+                response["X-Cache"] = "MISS"
+            return response
+        finally:
+            cache.delete(lock_key)
+
+    def get_validator_headers(self):
+        return {}
+
+    def get_response_cache_key(self, queryset, pk=None):
+        params = urlencode(
+            sorted(
+                (name, value)
+                for name in self.request.query_params
+                for value in self.request.query_params.getlist(name)
+            )
+        )
+        digest = hashlib.sha1(f"{self.request.path}?{params}".encode("utf-8")).hexdigest()
+        versions = get_tag_versions(queryset_tags(queryset, pk=pk))
+        return f"{RESPONSE_CACHE_PREFIX}:{digest}:{hashlib.sha1(versions.encode()).hexdigest()}"
+
+    def _store(self, key, response):
+        request = self.request
+        content = request.accepted_renderer.render(
+            response.data, request.accepted_media_type, self.get_renderer_context()
+        )
+        ttl = settings.RESPONSE_CACHE_TTL
+        cache.set(
+            key,
+            {
+                "content": content,
+                "content_type": request.accepted_media_type,
+                # Hits e cópias vencidas respondem com os validadores guardados junto do corpo.
+                "headers": self.get_validator_headers(),
+                "fresh_until": time.time() + ttl,
+            },
+            timeout=ttl + settings.RESPONSE_CACHE_STALE_TTL,
+        )
+
+    def _wait_for_entry(self, key, lock_key):
+        deadline = time.monotonic() + settings.RESPONSE_CACHE_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(RESPONSE_CACHE_POLL_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None or cache.get(lock_key) is None:
+                return entry
+        return None
+
+    def _cached_http_response(self, entry, view, result):
+        RESPONSE_CACHE_REQUESTS.inc(view=view, result=result)
+        response = HttpResponse(entry["content"], content_type=entry["content_type"])
+        for name, value in entry.get("headers", {}).items():
+            response[name] = value
+        response["X-Cache"] = result.upper()
+        return response
@@ -3,6 +3,8 @@ import uuid
 from django.db import models
 from django.utils import timezone
 
+from apps.core.cache import invalidate_model
+
 
 class TimeStampedModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -19,10 +21,31 @@ class SoftDeleteQuerySet(models.QuerySet):
     def deleted(self):
         return self.filter(deleted_at__isnull=False)
 
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        invalidate_model(self.model)
+        return rows
+
+    def delete(self):
+        result = super().delete()
+        invalidate_model(self.model)
+        return result
+
+    def bulk_create(self, objs, *args, **kwargs):
+        created = super().bulk_create(objs, *args, **kwargs)
+        # Linhas novas ainda não têm entradas próprias em cache; basta a tag da tabela.
+        invalidate_model(self.model, pks=())
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        invalidate_model(self.model)
+        return rows
 
-class SoftDeleteManager(models.Manager):
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
     def get_queryset(self):
-        return SoftDeleteQuerySet(self.model, using=self._db).filter(deleted_at__isnull=True)
+        return super().get_queryset().filter(deleted_at__isnull=True)
 
 
 class CoreModel(TimeStampedModel):
@@ -30,11 +53,21 @@ class CoreModel(TimeStampedModel):
     deleted_at = models.DateTimeField(null=True, blank=True)
 
     objects = SoftDeleteManager()
-    all_objects = models.Manager()
+    all_objects = SoftDeleteQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_model(type(self), pks=[self.pk])
+
+    def delete(self, *args, **kwargs):
+        pk = self.pk
+        result = super().delete(*args, **kwargs)
+        invalidate_model(type(self), pks=[pk])
+        return result
 
     def soft_delete(self):
         self.deleted_at = timezone.now()
-        self.save(update_fields=["deleted_at"])
+        self.save(update_fields=["deleted_at", "updated_at"])
 
     class Meta:
         abstract = True
@@ -1,8 +1,27 @@
-import json
+import copy
 import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from contextlib import ExitStack, contextmanager
 from contextvars import ContextVar
 from datetime import datetime, timezone
 
+from django.conf import settings
+from django.db import connections
+
+from apps.core import json_codec
+from apps.core.metrics import REGISTRY
+
+LOG_RECORDS = REGISTRY.counter(
+    "log_records_total",
+    "Registros de log do handler assíncrono por destino (escritos ou descartados).",
+    labelnames=("result",),
+)
+
 _correlation_id_ctx: ContextVar[str] = ContextVar("correlation_id", default="-")
 
 
@@ -18,6 +37,93 @@ def reset_correlation_id(token):
     _correlation_id_ctx.reset(token)
 
 
+SQL_FINGERPRINT_RULES = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"%s"), "?"),
+    # IN com 3 ou 30 parâmetros é a mesma consulta.
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?+)"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+def fingerprint(sql):
+    for pattern, replacement in SQL_FINGERPRINT_RULES:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+class QueryStats:
+    def __init__(self, profile=False):
+        self.count = 0
+        self.duration = 0.0
+        self.profile = profile
+        self.statements = {}
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if self.profile:
+                self._record(sql, elapsed)
+
+    def _record(self, sql, elapsed):
+        statement = fingerprint(sql)
+        entry = self.statements.setdefault(statement, [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed * 1000 >= settings.SQL_PROFILE_SLOW_QUERY_MS:
+            self.slow.append((statement, elapsed))
+
+    def report(self):
+        limit = settings.SQL_PROFILE_MAX_STATEMENTS
+        # A mesma consulta repetida muitas vezes numa requisição é o sintoma de N+1.
+        duplicates = sorted(
+            (
+                (statement, count, duration)
+                for statement, (count, duration) in self.statements.items()
+                if count >= settings.SQL_PROFILE_DUPLICATE_THRESHOLD
+            ),
+            key=lambda entry: (-entry[1], -entry[2]),
+        )
+        slow = sorted(self.slow, key=lambda entry: -entry[1])
+        return {
+            "distinct_statements": len(self.statements),
+            "n_plus_one": bool(duplicates),
+            "duplicates": [
+                {
+                    "sql": _truncate(statement),
+                    "count": count,
+                    "duration_ms": round(duration * 1000, 2),
+                }
+                for statement, count, duration in duplicates[:limit]
+            ],
+            "slow": [
+                {"sql": _truncate(statement), "duration_ms": round(elapsed * 1000, 2)}
+                for statement, elapsed in slow[:limit]
+            ],
+        }
+
+
+def _truncate(sql):
+    limit = settings.SQL_PROFILE_MAX_SQL_LENGTH
+    return sql if len(sql) <= limit else f"{sql[:limit]}..."
+
+
+@contextmanager
+def track_queries(profile=False):
+    stats = QueryStats(profile)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+        yield stats
+
+
 class CorrelationIdFilter(logging.Filter):
     def filter(self, record):
         record.correlation_id = get_correlation_id()
@@ -31,12 +137,15 @@ class JsonFormatter(logging.Formatter):
         "status_code",
         "duration_ms",
         "client_ip",
+        "db_queries",
+        "db_time_ms",
+        "sql_profile",
     )
 
     def format(self, record):
         level = "WARN" if record.levelname == "WARNING" else record.levelname
         payload = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
             "level": level,
             "logger": record.name,
             "message": record.getMessage(),
@@ -50,5 +159,131 @@ class JsonFormatter(logging.Formatter):
 
         if record.exc_info:
             payload["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exception"] = record.exc_text
+
+        return json_codec.dumps_ascii(payload)
+
+
+class AsyncBatchHandler(logging.Handler):
+    OVERFLOW_POLICIES = ("drop_new", "drop_old")
+
+    def __init__(
+        self, stream=None, capacity=10_000, batch_size=100, overflow="drop_new", shutdown_timeout=5
+    ):
+        super().__init__()
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Política de overflow inválida: {overflow}")
+        self.stream = stream or sys.stderr
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.shutdown_timeout = shutdown_timeout
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=capacity)
+        self._stopping = threading.Event()
+        self._worker = None
+        self._worker_pid = None
+        self._worker_lock = threading.Lock()
+        # Não é o lock do Handler: esse é tomado em handle() em volta de emit(), e a escrita
+        # lenta voltaria a segurar a thread da requisição.
+        self._write_lock = threading.Lock()
+
+    def emit(self, record):
+        try:
+            self._ensure_worker()
+            self._enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def prepare(self, record):
+        # Só o que depende do momento é resolvido na thread da requisição (mensagem e traceback;
+        # o correlation id já veio do filtro). Serializar e escrever ficam para o worker.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = (self.formatter or logging.Formatter()).formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+    def _enqueue(self, record):
+        try:
+            self._queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow == "drop_old":
+            try:
+                self._queue.get_nowait()
+                self._queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+        self.dropped += 1
+        LOG_RECORDS.inc(result="dropped")
+
+    def _ensure_worker(self):
+        # Depois de um fork (workers do gunicorn) a thread do processo pai não existe mais.
+        if self._worker_pid == os.getpid():
+            return
+        with self._worker_lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name="async-log-handler", daemon=True)
+            self._worker.start()
+            self._worker_pid = os.getpid()
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+            batch.extend(self._drain(self.batch_size - 1))
+            self._write(batch)
+
+    def _drain(self, limit):
+        records = []
+        while len(records) < limit:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return records
+
+    def _write(self, records):
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+
+        with self._write_lock:
+            try:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+            except Exception:
+                self.handleError(records[-1])
+        LOG_RECORDS.inc(len(lines), result="written")
+
+    def flush(self):
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                return
+            self._write(batch)
 
-        return json.dumps(payload, ensure_ascii=True)
+    def close(self):
+        # Chamado por logging.shutdown() na saída do processo: o worker esvazia a fila e o que
+        # sobrar depois do timeout é escrito aqui mesmo.
+        self._stopping.set()
+        if self._worker is not None and self._worker_pid == os.getpid():
+            self._worker.join(self.shutdown_timeout)
+        self.flush()
+        super().close()
@@ -1,22 +1,218 @@
+import base64
+import binascii
+import hashlib
+import json
 import math
+import uuid
 
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
+from apps.core.cache import get_tag_versions, queryset_tags
+from apps.core.metrics import REGISTRY
+
 DEFAULT_PAGE = 1
 DEFAULT_PAGE_SIZE = 20
 MAX_PAGE_SIZE = 100
+COUNT_CACHE_PREFIX = "pagination:count"
+
+COUNT_LOOKUPS = REGISTRY.counter(
+    "pagination_count_lookups_total",
+    "Totais de paginação por origem (cache, contagem exata ou estimativa).",
+    labelnames=("model", "source"),
+)
+
+
+def estimate_table_rows(model, using):
+    connection = connections[using]
+    if connection.vendor != "mysql":
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+class CachedCountPaginator(Paginator):
+    def __init__(self, object_list, per_page, filtered=True, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.filtered = filtered
+        self.estimated = False
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+
+        queryset = self.object_list.order_by()
+        label = queryset.model._meta.label_lower
+        key = self._cache_key(queryset)
+        cached = cache.get(key)
+        if cached is not None:
+            COUNT_LOOKUPS.inc(model=label, source="cache")
+            total, self.estimated = cached
+            return total
+
+        total, self.estimated = self._count(queryset)
+        COUNT_LOOKUPS.inc(model=label, source="estimate" if self.estimated else "exact")
+        cache.set(key, (total, self.estimated), timeout=settings.PAGINATION_COUNT_CACHE_TTL)
+        return total
+
+    def _count(self, queryset):
+        # O LIMIT interno limita o custo do COUNT(*) em filtros que varrem a tabela inteira.
+        limit = settings.PAGINATION_COUNT_LIMIT
+        total = queryset[: limit + 1].count()
+        if total <= limit:
+            return total, False
+
+        if not self.filtered:
+            rows = estimate_table_rows(queryset.model, queryset.db)
+            if rows is not None and rows > limit:
+                return rows, True
+        return limit, True
+
+    def _cache_key(self, queryset):
+        # Só o WHERE/JOIN importa para o total: projeções diferentes compartilham a mesma entrada.
+        counted = queryset.values("pk")
+        sql, params = counted.query.get_compiler(using=queryset.db).as_sql()
+        digest = hashlib.sha1(repr((sql, params)).encode("utf-8")).hexdigest()
+        versions = get_tag_versions(queryset_tags(counted))
+        return f"{COUNT_CACHE_PREFIX}:{queryset.model._meta.label_lower}:{versions}:{digest}"
+
+    def validate_number(self, number):
+        if not self.estimated:
+            return super().validate_number(number)
+
+        # Com total estimado, ainda pode haver páginas além da estimativa.
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        self.count
+        if not self.estimated:
+            return super().page(number)
+
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom : bottom + self.per_page], number, self)
 
 
 class PersonalPagination(PageNumberPagination):
     page_size_query_param = "page_size"
     max_page_size = MAX_PAGE_SIZE
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Cursor inválido."
+    unfiltered_query_params = ("page", "page_size", "cursor", "ordering")
 
     def get_page_size(self, request):
         page_size = request.query_params.get(self.page_size_query_param, DEFAULT_PAGE_SIZE)
         return min(int(page_size), self.max_page_size)
 
+    def django_paginator_class(self, queryset, page_size):
+        filtered = any(key not in self.unfiltered_query_params for key in self.request.query_params)
+        return CachedCountPaginator(queryset, page_size, filtered=filtered)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        return self.paginate_by_cursor(queryset, request)
+
+    def paginate_by_cursor(self, queryset, request):
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+
+        # O índice em created_at já carrega a PK no InnoDB, então o seek em (created_at, id)
+        # percorre o índice sem OFFSET nem COUNT(*).
+        if reverse:
+            queryset = queryset.order_by("created_at", "id")
+        else:
+            queryset = queryset.order_by("-created_at", "-id")
+
+        if position is not None:
+            created_at, pk = position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+                )
+
+        rows = list(queryset[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        has_next = position is not None if reverse else has_more
+        has_previous = has_more if reverse else position is not None
+
+        self.next_cursor = (
+            self.encode_cursor(rows[-1], reverse=False) if has_next and rows else None
+        )
+        self.previous_cursor = (
+            self.encode_cursor(rows[0], reverse=True) if has_previous and rows else None
+        )
+        return rows
+
+    def encode_cursor(self, instance, reverse):
+        payload = {"c": instance.created_at.isoformat(), "i": str(instance.pk), "r": reverse}
+        return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            created_at = parse_datetime(payload["c"])
+            pk = uuid.UUID(payload["i"])
+            reverse = bool(payload["r"])
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return (created_at, pk), reverse
+
     def get_paginated_response(self, data):
+        if self.cursor_mode:
+            return Response(
+                {
+                    "total": None,
+                    "total_estimated": None,
+                    "page": None,
+                    "page_size": self.get_page_size(self.request),
+                    "total_pages": None,
+                    "next": self.next_cursor,
+                    "previous": self.previous_cursor,
+                    "results": data,
+                }
+            )
+
         total_count = self.page.paginator.count
         page_size = self.get_page_size(self.request)
         total_pages = math.ceil(total_count / page_size)
@@ -24,9 +220,57 @@ class PersonalPagination(PageNumberPagination):
         return Response(
             {
                 "total": total_count,
+                "total_estimated": self.page.paginator.estimated,
                 "page": int(self.request.GET.get("page", DEFAULT_PAGE)),
                 "page_size": page_size,
                 "total_pages": total_pages,
                 "results": data,
             }
         )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["total", "total_estimated", "page", "page_size", "total_pages", "results"],
+            "properties": {
+                "total": {"type": "integer", "nullable": True, "example": 123},
+                "total_estimated": {
+                    "type": "boolean",
+                    "nullable": True,
+                    "description": (
+                        "Verdadeiro quando o total passa de PAGINATION_COUNT_LIMIT e é estimado; "
+                        "nulo na paginação por cursor."
+                    ),
+                },
+                "page": {"type": "integer", "nullable": True, "example": 1},
+                "page_size": {"type": "integer", "example": 10},
+                "total_pages": {"type": "integer", "nullable": True, "example": 13},
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "description": "Cursor da próxima página (apenas na paginação por cursor).",
+                },
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "description": "Cursor da página anterior (apenas na paginação por cursor).",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append(
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": (
+                    "Ativa a paginação por cursor (ordenada por created_at desc). Envie vazio na "
+                    "primeira página e depois os valores de next/previous."
+                ),
+                "schema": {"type": "string"},
+            }
+        )
+        return parameters
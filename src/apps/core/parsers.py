@@ -0,0 +1,22 @@
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from apps.core import json_codec
+
+
+class FastJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if not json_codec.fast_path_enabled() or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        try:
+            return json_codec.orjson.loads(body)
+        except json_codec.orjson.JSONDecodeError:
+            # Inteiros acima de 64 bits e afins: o parser do DRF decide, com as mesmas mensagens
+            # de erro de sempre.
+            return super().parse(io.BytesIO(body), media_type, parser_context)
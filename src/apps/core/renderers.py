@@ -0,0 +1,24 @@
+from rest_framework.renderers import JSONRenderer
+
+from apps.core import json_codec
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Indentação (API navegável, ?indent) e ajustes de UNICODE_JSON/COMPACT_JSON ficam com
+        # o renderer do DRF; o caminho rápido cobre a resposta compacta padrão.
+        if (
+            data is None
+            or not json_codec.fast_path_enabled()
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type or "", renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Como o DRF: U+2028/U+2029 escapados para o JSON poder ser embutido em JavaScript.
+        return (
+            json_codec.dumps(data)
+            .replace(b"\xe2\x80\xa8", b"\\u2028")
+            .replace(b"\xe2\x80\xa9", b"\\u2029")
+        )
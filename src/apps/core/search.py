@@ -0,0 +1,37 @@
+import operator
+import re
+import unicodedata
+from functools import reduce
+
+from django.db.models import Case, Max, Q, Value, When
+
+MAX_TERM_LENGTH = 64
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def normalize(text):
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    return [token[:MAX_TERM_LENGTH] for token in TOKEN_PATTERN.findall(normalize(text))]
+
+
+def match_all(terms, tokens, owner, **annotations):
+    # Cada token casa por prefixo (LIKE 'x%'), que percorre o índice de termos em vez da tabela
+    # principal; só sobram os donos em que todos os tokens casaram.
+    matched = reduce(
+        operator.add,
+        [
+            Max(Case(When(term__startswith=token, then=Value(1)), default=Value(0)))
+            for token in tokens
+        ],
+    )
+    return (
+        terms.filter(reduce(operator.or_, [Q(term__startswith=token) for token in tokens]))
+        .values(owner)
+        .annotate(matched=matched, **annotations)
+        .filter(matched=len(tokens))
+    )
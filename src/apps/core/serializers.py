@@ -0,0 +1,7 @@
+class SparseFieldsMixin:
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get("fields")
+        if requested is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in requested}
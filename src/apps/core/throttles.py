@@ -1,5 +1,13 @@
 from rest_framework.throttling import SimpleRateThrottle
 
+from apps.core.metrics import REGISTRY
+
+THROTTLE_REJECTIONS = REGISTRY.counter(
+    "throttle_rejections_total",
+    "Requisições recusadas pelo rate limit, por escopo.",
+    labelnames=("scope",),
+)
+
 
 class ClientOrIPRateThrottle(SimpleRateThrottle):
     scope = "client"
@@ -14,3 +22,7 @@ class ClientOrIPRateThrottle(SimpleRateThrottle):
             "scope": self.scope,
             "ident": ident,
         }
+
+    def throttle_failure(self):
+        THROTTLE_REJECTIONS.inc(scope=self.scope)
+        return super().throttle_failure()
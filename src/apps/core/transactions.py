@@ -0,0 +1,67 @@
+import random
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from apps.core.metrics import REGISTRY
+
+MYSQL_LOCK_WAIT_TIMEOUT = 1205
+MYSQL_DEADLOCK = 1213
+
+LOCK_CONFLICT_REASONS = {
+    MYSQL_LOCK_WAIT_TIMEOUT: "lock_wait_timeout",
+    MYSQL_DEADLOCK: "deadlock",
+}
+
+LOCK_RETRIES = REGISTRY.counter(
+    "db_lock_retries_total",
+    "Retentativas de transação após deadlock ou lock wait timeout.",
+    labelnames=("operation", "reason"),
+)
+LOCK_ABORTS = REGISTRY.counter(
+    "db_lock_aborts_total",
+    "Transações abortadas após esgotar as retentativas por conflito de lock.",
+    labelnames=("operation", "reason"),
+)
+
+
+class LockContentionError(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Recurso temporariamente bloqueado por concorrência. Tente novamente."
+    default_code = "lock_contention"
+
+
+def lock_conflict_reason(exc):
+    code = exc.args[0] if exc.args else None
+    return LOCK_CONFLICT_REASONS.get(code)
+
+
+def run_with_lock_retry(func, operation, max_attempts=None, base_delay=None, max_delay=None):
+    max_attempts = max_attempts or settings.DB_LOCK_RETRY_ATTEMPTS
+    base_delay = settings.DB_LOCK_RETRY_BASE_DELAY if base_delay is None else base_delay
+    max_delay = settings.DB_LOCK_RETRY_MAX_DELAY if max_delay is None else max_delay
+
+    attempt = 1
+    while True:
+        try:
+            return func()
+        except DatabaseError as exc:
+            reason = lock_conflict_reason(exc)
+            if reason is None:
+                raise
+
+            # A transação externa já foi invalidada pelo banco; só quem a abriu pode repetir.
+            if connection.in_atomic_block:
+                raise
+
+            if attempt >= max_attempts:
+                LOCK_ABORTS.inc(operation=operation, reason=reason)
+                raise LockContentionError() from exc
+
+            LOCK_RETRIES.inc(operation=operation, reason=reason)
+            delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+            time.sleep(random.uniform(0, delay))
+            attempt += 1
@@ -1,3 +1,5 @@
+from django.http import HttpResponse
+from django.views import View
 from drf_spectacular.plumbing import get_relative_url, set_query_parameters
 from drf_spectacular.settings import spectacular_settings
 from drf_spectacular.utils import extend_schema
@@ -7,6 +9,8 @@ from rest_framework.response import Response
 from rest_framework.reverse import reverse
 from rest_framework.views import APIView
 
+from apps.core import metrics
+
 
 class SpectacularElementsView(APIView):
     renderer_classes = [TemplateHTMLRenderer]
@@ -70,3 +74,12 @@ class HealthCheckView(APIView):
     @extend_schema(exclude=True)
     def get(self, request, *args, **kwargs):
         return Response({"status": "ok"})
+
+
+class MetricsView(View):
+    # View do Django, não do DRF: o scrape não passa pelo rate limit nem pela negociação.
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            metrics.render(metrics.collect()),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
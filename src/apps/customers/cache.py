@@ -0,0 +1,157 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django_redis import get_redis_connection
+
+from apps.core.metrics import REGISTRY
+
+CUSTOMER_CACHE_PREFIX = "customers:cache"
+INVALIDATION_CHANNEL = f"{CUSTOMER_CACHE_PREFIX}:invalidate"
+SUBSCRIBER_RETRY_DELAY = 1.0
+
+CUSTOMER_CACHE_REQUESTS = REGISTRY.counter(
+    "customer_cache_requests_total",
+    "Buscas de cliente ativo por camada que respondeu (local, redis ou banco).",
+    labelnames=("tier",),
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCache:
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LocalCache(
+    max_size=settings.CUSTOMER_LOCAL_CACHE_SIZE, ttl=settings.CUSTOMER_LOCAL_CACHE_TTL
+)
+
+_subscriber_lock = threading.Lock()
+_subscriber_pid = None
+
+
+def _cache_key(customer_id):
+    return f"{CUSTOMER_CACHE_PREFIX}:{customer_id}"
+
+
+def _redis_connection():
+    try:
+        return get_redis_connection("default")
+    except NotImplementedError:
+        return None
+
+
+def get_active_customer(customer_id, queryset):
+    key = str(customer_id)
+    ensure_subscriber()
+
+    customer = local_cache.get(key)
+    if customer is not None:
+        CUSTOMER_CACHE_REQUESTS.inc(tier="local")
+        return customer
+
+    customer = cache.get(_cache_key(key))
+    if customer is not None:
+        CUSTOMER_CACHE_REQUESTS.inc(tier="redis")
+        local_cache.set(key, customer)
+        return customer
+
+    CUSTOMER_CACHE_REQUESTS.inc(tier="database")
+    customer = queryset.filter(id=customer_id).first()
+    if customer is not None:
+        cache.set(_cache_key(key), customer, timeout=settings.CUSTOMER_CACHE_TTL)
+        local_cache.set(key, customer)
+    return customer
+
+
+def invalidate(customer_id):
+    key = str(customer_id)
+    _evict(key)
+    # A versão antiga pode ter sido relida por outra conexão antes do commit.
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _evict(key))
+
+
+def _evict(key):
+    local_cache.delete(key)
+    cache.delete(_cache_key(key))
+
+    client = _redis_connection()
+    if client is not None:
+        client.publish(INVALIDATION_CHANNEL, key)
+
+
+def ensure_subscriber():
+    global _subscriber_pid
+
+    # Cada processo (worker do gunicorn, por exemplo) precisa da própria assinatura.
+    if _subscriber_pid == os.getpid():
+        return
+
+    with _subscriber_lock:
+        if _subscriber_pid == os.getpid():
+            return
+        _subscriber_pid = os.getpid()
+        local_cache.clear()
+
+        client = _redis_connection()
+        if client is None:
+            return
+
+        thread = threading.Thread(
+            target=_listen, args=(client,), name="customer-cache-invalidation", daemon=True
+        )
+        thread.start()
+
+
+def _listen(client):
+    while True:
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            # Mensagens publicadas enquanto a assinatura estava caída se perderam.
+            local_cache.clear()
+            for message in pubsub.listen():
+                key = message["data"]
+                local_cache.delete(key.decode() if isinstance(key, bytes) else key)
+        except Exception:
+            logger.exception("Assinatura de invalidação do cache de clientes interrompida.")
+            local_cache.clear()
+            time.sleep(SUBSCRIBER_RETRY_DELAY)
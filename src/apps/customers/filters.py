@@ -1,12 +1,26 @@
 import django_filters
 
-from apps.customers.models import Customer
+from apps.customers import search
+from apps.customers.models import Customer, CustomerSearchTerm
 
 
 class CustomerFilter(django_filters.FilterSet):
     document = django_filters.CharFilter(label="CPF/CNPJ do cliente.")
     email = django_filters.CharFilter(label="E-mail doc cliente.")
     is_active = django_filters.BooleanFilter(label="Status do cliente do sistema.")
+    document_prefix = django_filters.CharFilter(
+        method="filter_document_prefix", label="Início do CPF/CNPJ (pontuação é ignorada)."
+    )
+    email_prefix = django_filters.CharFilter(
+        method="filter_email_prefix", label="Início do e-mail do cliente."
+    )
+    name_like = django_filters.CharFilter(
+        method="filter_name_like", label="Palavras do nome do cliente (por prefixo)."
+    )
+    q = django_filters.CharFilter(
+        method="filter_search",
+        label="Busca por documento, e-mail (se contiver @) ou palavras do nome.",
+    )
 
     class Meta:
         model = Customer
@@ -15,3 +29,15 @@ class CustomerFilter(django_filters.FilterSet):
             "email",
             "is_active",
         ]
+
+    def filter_document_prefix(self, queryset, name, value):
+        return search.search_document(queryset, value)
+
+    def filter_email_prefix(self, queryset, name, value):
+        return search.search_email(queryset, value)
+
+    def filter_name_like(self, queryset, name, value):
+        return search.search_name(queryset, CustomerSearchTerm.objects.all(), value)
+
+    def filter_search(self, queryset, name, value):
+        return search.search(queryset, CustomerSearchTerm.objects.all(), value)
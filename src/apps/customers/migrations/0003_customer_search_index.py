@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:01
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from apps.core.search import tokenize
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_search_index(apps, schema_editor):
+    Customer = apps.get_model("customers", "Customer")
+    CustomerSearchTerm = apps.get_model("customers", "CustomerSearchTerm")
+
+    last_pk = None
+    while True:
+        batch = Customer.objects.order_by("pk").only("pk", "name", "document")
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        customers = list(batch[:BACKFILL_BATCH_SIZE])
+        if not customers:
+            return
+
+        for customer in customers:
+            customer.document_digits = re.sub(r"\D", "", customer.document)
+        Customer.objects.bulk_update(customers, ["document_digits"])
+        CustomerSearchTerm.objects.bulk_create(
+            [
+                CustomerSearchTerm(customer_id=customer.pk, term=term)
+                for customer in customers
+                for term in dict.fromkeys(tokenize(customer.name))
+            ]
+        )
+        last_pk = customers[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0002_alter_customer_document_alter_customer_email"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customer",
+            name="document_digits",
+            field=models.CharField(db_index=True, default="", editable=False, max_length=14),
+        ),
+        migrations.CreateModel(
+            name="CustomerSearchTerm",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("term", models.CharField(max_length=64, verbose_name="Termo do nome")),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_terms",
+                        to="customers.customer",
+                        verbose_name="Cliente",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "customer_search_terms",
+                "indexes": [
+                    models.Index(fields=["term", "customer"], name="customer_se_term_3b6db0_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("customer", "term"), name="uniq_customer_search_term"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 
 from apps.core.models import CoreModel
+from apps.core.search import MAX_TERM_LENGTH
 from apps.core.validators import validate_document
+from apps.customers import cache as customer_cache
+from apps.customers import search
 
 
 class Customer(CoreModel):
@@ -9,6 +12,8 @@ class Customer(CoreModel):
     document = models.CharField(
         verbose_name="CPF/CNPJ", max_length=18, unique=True, validators=[validate_document]
     )
+    # Só os dígitos do documento, para buscas por prefixo que ignoram a pontuação digitada.
+    document_digits = models.CharField(max_length=14, db_index=True, editable=False, default="")
     email = models.EmailField(verbose_name="E-mail", db_index=True, unique=True)
     phone = models.CharField(verbose_name="Telefone", max_length=20)
     address = models.TextField(verbose_name="Endereço")
@@ -25,3 +30,52 @@ class Customer(CoreModel):
 
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        self.document_digits = search.digits_only(self.document)
+        if update_fields is not None and "document" in update_fields:
+            kwargs["update_fields"] = [*update_fields, "document_digits"]
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if update_fields is None or "name" in update_fields:
+                CustomerSearchTerm.objects.rebuild([self])
+        customer_cache.invalidate(self.pk)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        customer_cache.invalidate(self.pk)
+        return result
+
+
+class CustomerSearchTermQuerySet(models.QuerySet):
+    def rebuild(self, customers):
+        customers = list(customers)
+        self.filter(customer_id__in=[customer.pk for customer in customers]).delete()
+        self.bulk_create(
+            [
+                CustomerSearchTerm(customer_id=customer.pk, term=term)
+                for customer in customers
+                for term in search.name_terms(customer)
+            ]
+        )
+
+
+class CustomerSearchTerm(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    customer = models.ForeignKey(
+        Customer, on_delete=models.CASCADE, related_name="search_terms", verbose_name="Cliente"
+    )
+    term = models.CharField(max_length=MAX_TERM_LENGTH, verbose_name="Termo do nome")
+
+    objects = CustomerSearchTermQuerySet.as_manager()
+
+    class Meta:
+        db_table = "customer_search_terms"
+        indexes = [
+            models.Index(fields=["term", "customer"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["customer", "term"], name="uniq_customer_search_term"),
+        ]
@@ -0,0 +1,44 @@
+import re
+
+from apps.core.search import match_all, tokenize
+
+NON_DIGITS = re.compile(r"\D")
+# Pontuação típica de CPF/CNPJ digitados: "529.982.247-25", "11.222.333/0001-81".
+DOCUMENT_PATTERN = re.compile(r"^[\d.\-/\s]+$")
+
+
+def digits_only(value):
+    return NON_DIGITS.sub("", value or "")
+
+
+def name_terms(customer):
+    return list(dict.fromkeys(tokenize(customer.name)))
+
+
+def search_document(queryset, value):
+    digits = digits_only(value)
+    if not digits:
+        return queryset.none()
+    return queryset.filter(document_digits__startswith=digits)
+
+
+def search_email(queryset, value):
+    value = value.strip()
+    if not value:
+        return queryset.none()
+    return queryset.filter(email__istartswith=value)
+
+
+def search_name(queryset, terms, value):
+    tokens = list(dict.fromkeys(tokenize(value)))
+    if not tokens:
+        return queryset.none()
+    return queryset.filter(pk__in=match_all(terms, tokens, "customer").values("customer"))
+
+
+def search(queryset, terms, query):
+    if "@" in query:
+        return search_email(queryset, query)
+    if DOCUMENT_PATTERN.match(query):
+        return search_document(queryset, query)
+    return search_name(queryset, terms, query)
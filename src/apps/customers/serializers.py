@@ -1,9 +1,10 @@
 from rest_framework import serializers
 
+from apps.core.serializers import SparseFieldsMixin
 from apps.customers.models import Customer
 
 
-class CustomerModelSerializer(serializers.ModelSerializer):
+class CustomerModelSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Customer
         fields = ["id", "name", "document", "email", "phone", "address", "is_active"]
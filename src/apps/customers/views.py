@@ -3,14 +3,24 @@ from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import response, status, viewsets
 
+from apps.core.mixins import (
+    FIELDS_PARAMETER,
+    ConditionalRequestMixin,
+    ResponseCacheMixin,
+    SparseFieldsMixin,
+)
 from apps.customers.filters import CustomerFilter
 from apps.customers.models import Customer
 from apps.customers.serializers import CustomerModelSerializer
 
 
 @extend_schema_view(
-    list=extend_schema(summary="Listagem de clientes", tags=["Clientes"]),
-    retrieve=extend_schema(summary="Detalhar cliente", tags=["Clientes"]),
+    list=extend_schema(
+        summary="Listagem de clientes", parameters=[FIELDS_PARAMETER], tags=["Clientes"]
+    ),
+    retrieve=extend_schema(
+        summary="Detalhar cliente", parameters=[FIELDS_PARAMETER], tags=["Clientes"]
+    ),
     create=extend_schema(
         request=CustomerModelSerializer,
         responses=CustomerModelSerializer,
@@ -25,11 +35,17 @@ from apps.customers.serializers import CustomerModelSerializer
     ),
     destroy=extend_schema(summary="Remover cliente", tags=["Clientes"]),
 )
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(
+    ConditionalRequestMixin, ResponseCacheMixin, SparseFieldsMixin, viewsets.ModelViewSet
+):
     queryset = Customer.objects.all()
     serializer_class = CustomerModelSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = CustomerFilter
+    response_cache_actions = ("list",)
+
+    def get_queryset(self):
+        return self.project_queryset(super().get_queryset())
 
     def get_object(self) -> Customer:
         obj = get_object_or_404(self.get_queryset(), pk=self.kwargs["id"])
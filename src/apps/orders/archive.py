@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from apps.orders.models import ArchivedOrder, Order, OrderItem, OrderStatus, OrderStatusHistory
+from apps.orders.serializers import OrderDetailSerializer
+
+CLOSED_STATUSES = (OrderStatus.DELIVERED, OrderStatus.CANCELED)
+EXPANSIONS = ("items", "status_history")
+
+
+def archivable_orders(older_than):
+    # Pedido encerrado não muda mais: updated_at é o momento em que entrou no status final.
+    return Order.all_objects.filter(status__in=CLOSED_STATUSES, updated_at__lt=older_than)
+
+
+def archive_batch(older_than, batch_size):
+    with transaction.atomic():
+        # skip_locked: pedidos travados por outra transação ficam para a próxima execução.
+        order_ids = list(
+            archivable_orders(older_than)
+            .select_for_update(skip_locked=True)
+            .order_by("updated_at", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not order_ids:
+            return 0
+
+        orders = (
+            Order.all_objects.filter(id__in=order_ids)
+            .select_related("customer")
+            .prefetch_related(
+                Prefetch(
+                    "items",
+                    queryset=OrderItem.objects.select_related("product").order_by("created_at"),
+                ),
+                Prefetch(
+                    "status_history", queryset=OrderStatusHistory.objects.order_by("created_at")
+                ),
+            )
+        )
+        ArchivedOrder.objects.bulk_create(
+            [
+                ArchivedOrder(
+                    id=order.id,
+                    order_number=order.order_number,
+                    idempotency_key=order.idempotency_key,
+                    customer_id=order.customer_id,
+                    status=order.status,
+                    total_amount=order.total_amount,
+                    created_at=order.created_at,
+                    closed_at=order.updated_at,
+                    payload=ArchivedOrder.compress(
+                        OrderDetailSerializer(order, context={"expand": EXPANSIONS}).data
+                    ),
+                )
+                for order in orders
+            ]
+        )
+
+        OrderStatusHistory.objects.filter(order_id__in=order_ids).delete()
+        OrderItem.objects.filter(order_id__in=order_ids).delete()
+        Order.all_objects.filter(id__in=order_ids).delete()
+        return len(order_ids)
+
+
+def archive_closed_orders(older_than_days=None, batch_size=None, max_batches=None):
+    if older_than_days is None:
+        older_than_days = settings.ORDER_ARCHIVE_AFTER_DAYS
+    older_than = timezone.now() - timedelta(days=older_than_days)
+    batch_size = batch_size or settings.ORDER_ARCHIVE_BATCH_SIZE
+
+    # Cada lote confirma sozinho: interromper no meio só deixa pedidos para a próxima execução.
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        archived = archive_batch(older_than, batch_size)
+        if not archived:
+            return
+        batches += 1
+        yield archived
+
+
+def get_archived(**lookups):
+    archived = ArchivedOrder.objects.filter(**lookups).only("payload").first()
+    return None if archived is None else archived.data
+
+
+def archived_keys(idempotency_keys):
+    return dict(
+        ArchivedOrder.objects.filter(idempotency_key__in=idempotency_keys).values_list(
+            "idempotency_key", "id"
+        )
+    )
@@ -0,0 +1,111 @@
+import csv
+import json
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.orders.models import OrderItem
+
+ORDER_COLUMNS = {
+    "order_id": "id",
+    "order_number": "order_number",
+    "status": "status",
+    "customer_id": "customer_id",
+    "customer_name": "customer__name",
+    "total_amount": "total_amount",
+    "observations": "observations",
+    "created_at": "created_at",
+}
+ITEM_COLUMNS = {
+    "item_id": "id",
+    "product_id": "product_id",
+    "product_sku": "product__sku",
+    "product_name": "product__name",
+    "quantity": "quantity",
+    "unit_price": "unit_price",
+    "subtotal": "subtotal",
+}
+CSV_HEADER = (*ORDER_COLUMNS, *ITEM_COLUMNS)
+
+EXPORT_CONTENT_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+
+def iter_orders(queryset, chunk_size=None):
+    chunk_size = chunk_size or settings.ORDER_EXPORT_CHUNK_SIZE
+    queryset = queryset.order_by("created_at", "id").values(*ORDER_COLUMNS.values())
+
+    # Paginação por chave em (created_at, id): cada lote é uma consulta curta e limitada, então a
+    # memória não cresce com o período exportado nem a conexão fica presa a um cursor longo.
+    position = None
+    while True:
+        chunk = queryset
+        if position is not None:
+            created_at, order_id = position
+            chunk = chunk.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=order_id)
+            )
+        orders = list(chunk[:chunk_size])
+        if not orders:
+            return
+
+        items = defaultdict(list)
+        for item in (
+            OrderItem.objects.filter(order_id__in=[order["id"] for order in orders])
+            .order_by("order_id", "created_at", "id")
+            .values("order_id", *ITEM_COLUMNS.values())
+        ):
+            items[item.pop("order_id")].append(
+                {column: item[source] for column, source in ITEM_COLUMNS.items()}
+            )
+
+        for order in orders:
+            row = {column: order[source] for column, source in ORDER_COLUMNS.items()}
+            yield row, items[order["id"]]
+
+        last = orders[-1]
+        position = (last["created_at"], last["id"])
+
+
+def _format(value):
+    # Mesmo formato da API: datas no fuso configurado, decimais e UUIDs como texto.
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def render_csv(orders):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for order, items in orders:
+        base = [_format(value) for value in order.values()]
+        # Uma linha por item; pedidos sem itens saem uma vez com as colunas de item vazias.
+        for item in items or [dict.fromkeys(ITEM_COLUMNS)]:
+            yield writer.writerow(base + [_format(value) for value in item.values()])
+
+
+def render_jsonl(orders):
+    for order, items in orders:
+        order = {column: _format(value) for column, value in order.items()}
+        order["items"] = [
+            {column: _format(value) for column, value in item.items()} for item in items
+        ]
+        yield json.dumps(order, ensure_ascii=False) + "\n"
+
+
+RENDERERS = {"csv": render_csv, "jsonl": render_jsonl}
+
+
+def export(queryset, output, chunk_size=None):
+    return RENDERERS[output](iter_orders(queryset, chunk_size))
@@ -1,11 +1,12 @@
 import django_filters
+from django.db.models import Q
 
-from apps.orders.models import Order, OrderStatus
+from apps.orders.models import ORDER_NUMBER_PREFIX, Order, OrderStatus
 
 
 class OrderFilter(django_filters.FilterSet):
     order_number = django_filters.CharFilter(
-        field_name="order_number", lookup_expr="icontains", label="Número do pedido"
+        method="filter_order_number", label="Número do pedido (por prefixo, com ou sem ORD-)"
     )
 
     customer = django_filters.UUIDFilter(field_name="customer", label="ID do cliente")
@@ -14,10 +15,27 @@ class OrderFilter(django_filters.FilterSet):
         field_name="status", choices=OrderStatus.choices, label="Status do pedido"
     )
 
+    created_at = django_filters.IsoDateTimeFromToRangeFilter(
+        field_name="created_at",
+        label="Período de criação (created_at_after / created_at_before, ISO 8601)",
+    )
+
     class Meta:
         model = Order
         fields = [
             "order_number",
             "customer",
             "status",
+            "created_at",
         ]
+
+    def filter_order_number(self, queryset, name, value):
+        # Prefixo vira LIKE 'ORD-X%' e usa o índice único; o prefixo fixo é opcional na busca.
+        # Pedidos antigos da API foram numerados sem ORD-, então o valor cru também casa.
+        value = value.strip().upper()
+        if value.startswith(ORDER_NUMBER_PREFIX):
+            return queryset.filter(order_number__istartswith=value)
+        return queryset.filter(
+            Q(order_number__istartswith=f"{ORDER_NUMBER_PREFIX}{value}")
+            | Q(order_number__istartswith=value)
+        )
@@ -0,0 +1,58 @@
+import hashlib
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+IDEMPOTENCY_CACHE_PREFIX = "orders:idempotency"
+WAIT_POLL_INTERVAL = 0.05
+
+
+class IdempotencyConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Já existe uma requisição em processamento com esta chave de idempotência."
+    default_code = "idempotency_conflict"
+
+
+def _cache_key(kind, idempotency_key):
+    digest = hashlib.sha256(idempotency_key.encode("utf-8")).hexdigest()
+    return f"{IDEMPOTENCY_CACHE_PREFIX}:{kind}:{digest}"
+
+
+def get_cached_response(idempotency_key):
+    return cache.get(_cache_key("response", idempotency_key))
+
+
+def store_response(idempotency_key, data):
+    cache.set(
+        _cache_key("response", idempotency_key),
+        dict(data),
+        timeout=settings.ORDER_IDEMPOTENCY_TTL,
+    )
+
+
+@contextmanager
+def idempotency_lock(idempotency_key):
+    lock_key = _cache_key("lock", idempotency_key)
+    token = uuid.uuid4().hex
+    acquired = cache.add(lock_key, token, timeout=settings.ORDER_IDEMPOTENCY_LOCK_TIMEOUT)
+    try:
+        yield acquired
+    finally:
+        if acquired and cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+def wait_for_response(idempotency_key):
+    lock_key = _cache_key("lock", idempotency_key)
+    deadline = time.monotonic() + settings.ORDER_IDEMPOTENCY_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_POLL_INTERVAL)
+        cached = get_cached_response(idempotency_key)
+        if cached is not None or cache.get(lock_key) is None:
+            return cached
+    return None
@@ -0,0 +1,231 @@
+import csv
+import json
+import uuid
+from collections import defaultdict
+from decimal import Decimal
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from apps.core.transactions import run_with_lock_retry
+from apps.customers.models import Customer
+from apps.orders import archive, outbox
+from apps.orders.models import Order, OrderItem
+from apps.orders.serializers import OrderCreateSerializer
+from apps.products import cache as product_cache
+from apps.products.models import Product
+from apps.products.stock import ShardPool
+from apps.reports import rollups
+
+CSV_COLUMNS = ("idempotency_key", "customer_id", "product_id", "quantity", "observations")
+
+
+class OrderImportRecordSerializer(OrderCreateSerializer):
+    def validate(self, attrs):
+        if not attrs["items"]:
+            raise serializers.ValidationError("Pedido sem items selecionados.")
+        return attrs
+
+
+class ImportRecord:
+    def __init__(self, line, payload=None, error=None):
+        self.line = line
+        self.payload = payload
+        self.error = error
+        self.data = None
+        self.result = None
+
+    @property
+    def idempotency_key(self):
+        if self.data is not None:
+            return self.data["idempotency_key"]
+        if isinstance(self.payload, dict):
+            return self.payload.get("idempotency_key")
+        return None
+
+    def fail(self, errors):
+        self.result = {"status": "error", "errors": errors}
+
+    def as_report(self):
+        return {"line": self.line, "idempotency_key": self.idempotency_key, **self.result}
+
+
+def parse_jsonl(lines):
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield ImportRecord(line_number, payload=json.loads(line))
+        except ValueError:
+            yield ImportRecord(line_number, error="JSON inválido.")
+
+
+def parse_csv(lines):
+    reader = csv.DictReader(lines)
+    missing = set(CSV_COLUMNS[:4]) - set(reader.fieldnames or ())
+    if missing:
+        yield ImportRecord(1, error=f"Colunas obrigatórias ausentes: {', '.join(sorted(missing))}")
+        return
+
+    current = None
+    for row in reader:
+        key = row["idempotency_key"]
+        if current is None or current.payload["idempotency_key"] != key:
+            if current is not None:
+                yield current
+            current = ImportRecord(
+                reader.line_num,
+                payload={
+                    "idempotency_key": key,
+                    "customer_id": row["customer_id"],
+                    "observations": row.get("observations") or "",
+                    "items": [],
+                },
+            )
+        current.payload["items"].append(
+            {"product_id": row["product_id"], "quantity": row["quantity"]}
+        )
+
+    if current is not None:
+        yield current
+
+
+class OrderImporter:
+    def __init__(self, chunk_size=None):
+        self.chunk_size = chunk_size or settings.ORDER_IMPORT_CHUNK_SIZE
+
+    def run(self, records):
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, self.chunk_size))
+            if not chunk:
+                return
+            self._import_chunk(chunk)
+            for record in chunk:
+                yield record.as_report()
+
+    def _import_chunk(self, chunk):
+        valid = []
+        for record in chunk:
+            if record.error is not None:
+                record.fail(record.error)
+                continue
+            serializer = OrderImportRecordSerializer(data=record.payload)
+            if not serializer.is_valid():
+                record.fail(serializer.errors)
+                continue
+            record.data = serializer.validated_data
+            valid.append(record)
+
+        if not valid:
+            return
+
+        try:
+            run_with_lock_retry(lambda: self._persist(valid), operation="order_import")
+        except IntegrityError:
+            # Outra requisição gravou uma das chaves no meio do caminho: refaz o lote, que
+            # agora enxerga a chave como duplicada.
+            run_with_lock_retry(lambda: self._persist(valid), operation="order_import")
+
+    def _persist(self, records):
+        for record in records:
+            record.result = None
+
+        keys = {record.idempotency_key for record in records}
+        existing = dict(
+            Order.all_objects.filter(idempotency_key__in=keys).values_list("idempotency_key", "id")
+        )
+        existing.update(archive.archived_keys(keys))
+        customers = set(
+            Customer.objects.filter(
+                id__in={record.data["customer_id"] for record in records}, is_active=True
+            ).values_list("id", flat=True)
+        )
+        products = product_cache.get_products(
+            list({item["product_id"] for record in records for item in record.data["items"]}),
+            Product.objects.filter(is_active=True),
+        )
+
+        pending = []
+        replays = []
+        claimed = {}
+        for record in records:
+            key = record.idempotency_key
+            if key in existing:
+                record.result = {"status": "duplicate", "order_id": str(existing[key])}
+            elif key in claimed:
+                replays.append((record, claimed[key]))
+            elif record.data["customer_id"] not in customers:
+                record.fail("Cliente inativo ou inexistente.")
+            elif missing := [
+                str(item["product_id"])
+                for item in record.data["items"]
+                if item["product_id"] not in products
+            ]:
+                record.fail(f"Produto inativo ou inexistente: {', '.join(missing)}")
+            else:
+                claimed[key] = record
+                pending.append(record)
+
+        with transaction.atomic():
+            pool = ShardPool(
+                {item["product_id"] for record in pending for item in record.data["items"]}
+            )
+            orders = []
+            items = []
+            for record in pending:
+                order = self._build_order(record, products, pool, items)
+                if order is not None:
+                    orders.append(order)
+
+            Order.objects.bulk_create(orders)
+            OrderItem.objects.bulk_create(items)
+            rollups.record_created(orders, items)
+            outbox.order_created(orders, items)
+            pool.flush()
+
+        for record, original in replays:
+            if original.result["status"] == "created":
+                record.result = {"status": "duplicate", "order_id": original.result["order_id"]}
+            else:
+                record.fail(f"Pedido com a mesma chave falhou na linha {original.line}.")
+
+    def _build_order(self, record, products, pool, items):
+        order_id = uuid.uuid4()
+        requested = defaultdict(int)
+        for item in record.data["items"]:
+            requested[item["product_id"]] += item["quantity"]
+
+        try:
+            pool.reserve(requested, reference=str(order_id), products=products)
+        except serializers.ValidationError as exc:
+            record.fail(exc.detail)
+            return None
+
+        order = Order(
+            id=order_id,
+            customer_id=record.data["customer_id"],
+            idempotency_key=record.idempotency_key,
+            observations=record.data.get("observations", ""),
+            total_amount=Decimal("0"),
+        )
+        order.order_number = order.generate_order_number()
+        for item in record.data["items"]:
+            product = products[item["product_id"]]
+            subtotal = product.price * item["quantity"]
+            order.total_amount += subtotal
+            items.append(
+                OrderItem(
+                    id=uuid.uuid4(),
+                    order=order,
+                    product=product,
+                    quantity=item["quantity"],
+                    unit_price=product.price,
+                    subtotal=subtotal,
+                )
+            )
+
+        record.result = {"status": "created", "order_id": str(order.id)}
+        return order
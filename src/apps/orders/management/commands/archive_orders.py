@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.orders.archive import archive_closed_orders
+
+
+class Command(BaseCommand):
+    help = (
+        "Move pedidos DELIVERED ou CANCELED há mais de N dias (ORDER_ARCHIVE_AFTER_DAYS) para "
+        "orders_archive, em lotes que confirmam um a um. Pode ser interrompido e executado de "
+        "novo: retoma pelos pedidos que ainda estão nas tabelas quentes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.ORDER_ARCHIVE_AFTER_DAYS)
+        parser.add_argument("--batch-size", type=int, default=settings.ORDER_ARCHIVE_BATCH_SIZE)
+        parser.add_argument(
+            "--max-batches", type=int, default=None, help="Para após N lotes (padrão: todos)."
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 0:
+            raise CommandError("--days não pode ser negativo.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size deve ser um inteiro positivo.")
+
+        total = 0
+        for archived in archive_closed_orders(
+            options["days"], options["batch_size"], options["max_batches"]
+        ):
+            total += archived
+            self.stdout.write(f"Lote arquivado: {archived} pedidos (total: {total})")
+        self.stdout.write(f"Pedidos arquivados: {total}")
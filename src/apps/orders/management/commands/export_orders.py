@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.orders import exporter
+from apps.orders.filters import OrderFilter
+from apps.orders.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta pedidos com itens e nome do cliente em JSONL (um pedido por linha) ou CSV (um "
+        "item por linha), lendo em lotes para manter a memória constante. Aceita os mesmos "
+        "filtros da listagem de pedidos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", choices=sorted(exporter.RENDERERS), default="jsonl")
+        parser.add_argument("--file", default="-", help="Arquivo de saída, ou '-' (padrão).")
+        parser.add_argument("--chunk-size", type=int, default=None)
+        parser.add_argument("--status")
+        parser.add_argument("--customer")
+        parser.add_argument("--order-number")
+        parser.add_argument("--created-after", help="Data/hora ISO 8601 (inclusiva).")
+        parser.add_argument("--created-before", help="Data/hora ISO 8601 (inclusiva).")
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] is not None and options["chunk_size"] < 1:
+            raise CommandError("--chunk-size deve ser um inteiro positivo.")
+
+        filters = {
+            "status": options["status"],
+            "customer": options["customer"],
+            "order_number": options["order_number"],
+            "created_at_after": options["created_after"],
+            "created_at_before": options["created_before"],
+        }
+        filterset = OrderFilter(
+            data={name: value for name, value in filters.items() if value is not None},
+            queryset=Order.objects.all(),
+        )
+        if not filterset.is_valid():
+            raise CommandError(filterset.errors.as_json())
+
+        chunks = exporter.export(filterset.qs, options["output"], options["chunk_size"])
+        if options["file"] == "-":
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+        else:
+            with open(options["file"], "w", encoding="utf-8", newline="") as stream:
+                stream.writelines(chunks)
+        self.stderr.write("Exportação concluída.")
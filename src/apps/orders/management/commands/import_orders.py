@@ -0,0 +1,43 @@
+import json
+import sys
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.orders.importer import OrderImporter, parse_csv, parse_jsonl
+
+PARSERS = {"jsonl": parse_jsonl, "csv": parse_csv}
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa pedidos em lote a partir de um arquivo JSONL (um pedido por linha) ou CSV "
+        "(um item por linha, agrupado por idempotency_key). O relatório por registro é "
+        "escrito em JSONL na saída padrão."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Arquivo de entrada, ou '-' para ler da entrada padrão.")
+        parser.add_argument("--format", choices=sorted(PARSERS), default=None)
+        parser.add_argument("--chunk-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        input_format = options["format"] or ("csv" if path.endswith(".csv") else "jsonl")
+
+        if options["chunk_size"] is not None and options["chunk_size"] < 1:
+            raise CommandError("--chunk-size deve ser um inteiro positivo.")
+
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+        totals = Counter()
+        try:
+            records = PARSERS[input_format](stream)
+            for result in OrderImporter(chunk_size=options["chunk_size"]).run(records):
+                totals[result["status"]] += 1
+                self.stdout.write(json.dumps(result, ensure_ascii=False))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        summary = ", ".join(f"{status}: {count}" for status, count in sorted(totals.items()))
+        self.stderr.write(f"Importação concluída ({summary or 'nenhum registro'}).")
@@ -0,0 +1,108 @@
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from rest_framework.exceptions import ValidationError
+
+from apps.core.transactions import LOCK_ABORTS, LOCK_RETRIES, LockContentionError
+from apps.customers.models import Customer
+from apps.orders.serializers import OrderCreateSerializer
+from apps.products.models import Product
+
+LOCK_REASONS = ("deadlock", "lock_wait_timeout")
+
+
+def run_contention_benchmark(workers, orders, products, items_per_order, stock=1_000_000):
+    suffix = uuid.uuid4().hex[:8].upper()
+    customer = Customer.objects.create(
+        name=f"Cliente Benchmark {suffix}",
+        document=f"BENCH-{suffix}",
+        email=f"benchmark-{suffix.lower()}@example.com",
+        phone="0",
+        address="Benchmark",
+    )
+    product_ids = [
+        Product.objects.create(
+            sku=f"BENCH-{suffix}-{index}",
+            name=f"Produto Benchmark {index}",
+            price=1,
+            stock_quantity=stock,
+        ).id
+        for index in range(products)
+    ]
+    basket_size = min(items_per_order, products)
+
+    def place_order(_):
+        # Cestas sobrepostas em ordem aleatória: o pior caso para ordem de lock.
+        basket = random.sample(product_ids, basket_size)
+        serializer = OrderCreateSerializer(
+            data={
+                "customer_id": str(customer.id),
+                "idempotency_key": f"bench-{uuid.uuid4()}",
+                "items": [{"product_id": str(product_id), "quantity": 1} for product_id in basket],
+            }
+        )
+        try:
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+            return "created"
+        except LockContentionError:
+            return "aborted"
+        except ValidationError:
+            return "rejected"
+        except Exception:
+            return "failed"
+        finally:
+            connections.close_all()
+
+    retries_before = _lock_metric_total(LOCK_RETRIES)
+    aborts_before = _lock_metric_total(LOCK_ABORTS)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outcomes = list(executor.map(place_order, range(orders)))
+    elapsed = time.perf_counter() - start
+
+    created = outcomes.count("created")
+    return {
+        "orders": orders,
+        "workers": workers,
+        "created": created,
+        "rejected": outcomes.count("rejected"),
+        "aborted": outcomes.count("aborted"),
+        "failed": outcomes.count("failed"),
+        "retries": _lock_metric_total(LOCK_RETRIES) - retries_before,
+        "lock_aborts": _lock_metric_total(LOCK_ABORTS) - aborts_before,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(created / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def _lock_metric_total(metric):
+    return sum(metric.value(operation="order_create", reason=reason) for reason in LOCK_REASONS)
+
+
+class Command(BaseCommand):
+    help = (
+        "Dispara pedidos concorrentes com cestas sobrepostas e reporta vazão e abortos. "
+        "Cria cliente e produtos próprios de benchmark; use apenas em ambientes de teste."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--orders", type=int, default=200)
+        parser.add_argument("--products", type=int, default=5)
+        parser.add_argument("--items-per-order", type=int, default=3)
+
+    def handle(self, *args, **options):
+        report = run_contention_benchmark(
+            workers=options["workers"],
+            orders=options["orders"],
+            products=options["products"],
+            items_per_order=options["items_per_order"],
+        )
+        for key, value in report.items():
+            self.stdout.write(f"{key}: {value}")
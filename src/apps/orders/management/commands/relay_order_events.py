@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django_redis import get_redis_connection
+
+from apps.orders.outbox import relay_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Publica os eventos pendentes de order_events no Redis Stream ORDER_EVENT_STREAM, em "
+        "lotes, e os marca como publicados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.ORDER_EVENT_RELAY_BATCH_SIZE)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Executa continuamente, aguardando N segundos entre as varreduras.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size deve ser um inteiro positivo.")
+
+        try:
+            client = get_redis_connection("default")
+        except NotImplementedError:
+            raise CommandError("O relay precisa do cache padrão no Redis (django-redis).")
+
+        interval = options["interval"]
+        while True:
+            relayed = relay_pending(client, options["batch_size"])
+            self.stdout.write(f"Eventos publicados: {relayed}")
+            if not interval:
+                return
+            time.sleep(interval)
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0003_customer_search_index"),
+        ("orders", "0002_orderstatushistory_changed_by"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedOrder",
+            fields=[
+                ("id", models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                (
+                    "order_number",
+                    models.CharField(max_length=30, unique=True, verbose_name="Número do pedido"),
+                ),
+                ("idempotency_key", models.CharField(max_length=255, unique=True)),
+                ("customer_id", models.UUIDField(db_index=True, verbose_name="ID do cliente")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("CONFIRMED", "Confirmed"),
+                            ("SEPARATED", "Separated"),
+                            ("SHIPPED", "Shipped"),
+                            ("DELIVERED", "Delivered"),
+                            ("CANCELED", "Canceled"),
+                        ],
+                        max_length=20,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "total_amount",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=15, verbose_name="Valor total"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="Criado em")),
+                ("closed_at", models.DateTimeField(verbose_name="Encerrado em")),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                ("payload", models.BinaryField(verbose_name="Pedido completo (JSON comprimido)")),
+            ],
+            options={
+                "db_table": "orders_archive",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["status", "updated_at"], name="orders_status_c9c24a_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="archivedorder",
+            index=models.Index(fields=["created_at"], name="orders_arch_created_66e297_idx"),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:13
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0003_order_archive"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderEvent",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[
+                            ("order.created", "Pedido criado"),
+                            ("order.status_changed", "Status alterado"),
+                            ("order.canceled", "Pedido cancelado"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("order_id", models.UUIDField(verbose_name="ID do pedido")),
+                (
+                    "payload",
+                    models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("published_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "order_events",
+                "indexes": [
+                    models.Index(fields=["order_id"], name="order_event_order_i_f3f7d4_idx"),
+                    models.Index(
+                        fields=["published_at", "id"], name="order_event_publish_1d1cac_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -1,9 +1,14 @@
+import json
 import uuid
+import zlib
 
-from django.db import IntegrityError, models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, models, transaction
 
 from apps.core.models import CoreModel
 
+ORDER_NUMBER_PREFIX = "ORD-"
+
 
 class OrderStatus(models.TextChoices):
     PENDING = "PENDING", "Pending"
@@ -41,19 +46,27 @@ class Order(CoreModel):
             models.Index(fields=["customer"]),
             models.Index(fields=["created_at"]),
             models.Index(fields=["deleted_at"]),
+            models.Index(fields=["status", "updated_at"]),
         ]
 
-    def generate_order_number(self):
-        return f"ORD-{uuid.uuid4().hex[:12].upper()}"
+    @staticmethod
+    def generate_order_number():
+        return f"{ORDER_NUMBER_PREFIX}{uuid.uuid4().hex[:12].upper()}"
 
     def save(self, *args, **kwargs):
         if not self.order_number:
             for _ in range(5):
                 self.order_number = self.generate_order_number()
                 try:
-                    return super().save(*args, **kwargs)
+                    # Savepoint por tentativa: a transação externa continua utilizável, e qualquer
+                    # outra violação (idempotency_key repetida, por exemplo) sobe para quem chamou.
+                    with transaction.atomic():
+                        return super().save(*args, **kwargs)
                 except IntegrityError:
+                    collided = Order.all_objects.filter(order_number=self.order_number).exists()
                     self.order_number = None
+                    if not collided:
+                        raise
             raise IntegrityError("Could not generate unique order number.")
         return super().save(*args, **kwargs)
 
@@ -109,3 +122,62 @@ class OrderStatusHistory(models.Model):
             models.Index(fields=["order"]),
             models.Index(fields=["created_at"]),
         ]
+
+
+class ArchivedOrder(models.Model):
+    # Pedido encerrado fora das tabelas quentes: a representação completa (itens e histórico)
+    # fica comprimida em payload; as demais colunas servem só para localizar o pedido.
+    id = models.UUIDField(primary_key=True, editable=False)
+    order_number = models.CharField(max_length=30, unique=True, verbose_name="Número do pedido")
+    idempotency_key = models.CharField(max_length=255, unique=True)
+    customer_id = models.UUIDField(db_index=True, verbose_name="ID do cliente")
+    status = models.CharField(max_length=20, choices=OrderStatus.choices, verbose_name="Status")
+    total_amount = models.DecimalField(max_digits=15, decimal_places=2, verbose_name="Valor total")
+    created_at = models.DateTimeField(verbose_name="Criado em")
+    closed_at = models.DateTimeField(verbose_name="Encerrado em")
+    archived_at = models.DateTimeField(auto_now_add=True)
+    payload = models.BinaryField(verbose_name="Pedido completo (JSON comprimido)")
+
+    class Meta:
+        db_table = "orders_archive"
+        indexes = [
+            models.Index(fields=["created_at"]),
+        ]
+
+    def __str__(self):
+        return self.order_number
+
+    @staticmethod
+    def compress(data):
+        return zlib.compress(json.dumps(data, cls=DjangoJSONEncoder).encode("utf-8"))
+
+    @property
+    def data(self):
+        return json.loads(zlib.decompress(bytes(self.payload)).decode("utf-8"))
+
+
+class OrderEventType(models.TextChoices):
+    CREATED = "order.created", "Pedido criado"
+    STATUS_CHANGED = "order.status_changed", "Status alterado"
+    CANCELED = "order.canceled", "Pedido cancelado"
+
+
+class OrderEvent(models.Model):
+    # Outbox: gravado na mesma transação da mudança no pedido. O id crescente é a posição do
+    # evento no feed (?since=) e no stream publicado pelo relay.
+    id = models.BigAutoField(primary_key=True)
+    event_type = models.CharField(max_length=30, choices=OrderEventType.choices)
+    order_id = models.UUIDField(verbose_name="ID do pedido")
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "order_events"
+        indexes = [
+            models.Index(fields=["order_id"]),
+            models.Index(fields=["published_at", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.id} {self.event_type}"
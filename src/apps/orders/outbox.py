@@ -0,0 +1,128 @@
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from apps.orders.models import OrderEvent, OrderEventType
+
+
+def order_created(orders, items):
+    items_by_order = {}
+    for item in items:
+        items_by_order.setdefault(item.order_id, []).append(
+            {
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "unit_price": item.unit_price,
+                "subtotal": item.subtotal,
+            }
+        )
+
+    OrderEvent.objects.bulk_create(
+        [
+            OrderEvent(
+                event_type=OrderEventType.CREATED,
+                order_id=order.pk,
+                payload={
+                    "order_number": order.order_number,
+                    "customer_id": order.customer_id,
+                    "status": order.status,
+                    "total_amount": order.total_amount,
+                    "items": items_by_order.get(order.pk, []),
+                },
+            )
+            for order in orders
+        ]
+    )
+
+
+def status_changed(transitions, changed_by, reason=""):
+    OrderEvent.objects.bulk_create(
+        [
+            OrderEvent(
+                event_type=OrderEventType.STATUS_CHANGED,
+                order_id=order.pk,
+                payload={
+                    "previous_status": previous_status,
+                    "new_status": new_status,
+                    "changed_by": changed_by,
+                    "reason": reason,
+                },
+            )
+            for order, previous_status, new_status in transitions
+        ]
+    )
+
+
+def order_canceled(order, previous_status):
+    OrderEvent.objects.create(
+        event_type=OrderEventType.CANCELED,
+        order_id=order.pk,
+        payload={"previous_status": previous_status},
+    )
+
+
+def feed(since=0, limit=None):
+    limit = limit or settings.ORDER_EVENT_FEED_LIMIT
+    # Ids são reservados no INSERT, mas ficam visíveis só no commit: uma transação lenta pode
+    # aparecer depois de ids maiores. A defasagem evita que o consumidor avance o cursor sobre
+    # ela. Transações mais longas que isso só chegam ao consumidor pelo stream.
+    visible_until = timezone.now() - timedelta(seconds=settings.ORDER_EVENT_FEED_LAG)
+    return list(
+        OrderEvent.objects.filter(id__gt=since, created_at__lte=visible_until).order_by("id")[
+            :limit
+        ]
+    )
+
+
+def stream_fields(event):
+    return {
+        "id": event.pk,
+        "type": event.event_type,
+        "order_id": str(event.order_id),
+        "payload": json.dumps(event.payload, cls=DjangoJSONEncoder, ensure_ascii=False),
+        "created_at": event.created_at.isoformat(),
+    }
+
+
+def relay_batch(client, batch_size=None):
+    batch_size = batch_size or settings.ORDER_EVENT_RELAY_BATCH_SIZE
+
+    with transaction.atomic():
+        # skip_locked permite mais de um relay sem publicar o mesmo lote duas vezes.
+        events = list(
+            OrderEvent.objects.filter(published_at__isnull=True)
+            .select_for_update(skip_locked=True)
+            .order_by("id")[:batch_size]
+        )
+        if not events:
+            return 0
+
+        # Entrega pelo menos uma vez: se o commit falhar depois do XADD, o lote é publicado de
+        # novo, e o consumidor descarta pelo campo "id".
+        pipeline = client.pipeline(transaction=False)
+        for event in events:
+            pipeline.xadd(
+                settings.ORDER_EVENT_STREAM,
+                stream_fields(event),
+                maxlen=settings.ORDER_EVENT_STREAM_MAXLEN,
+                approximate=True,
+            )
+        pipeline.execute()
+
+        OrderEvent.objects.filter(id__in=[event.pk for event in events]).update(
+            published_at=timezone.now()
+        )
+    return len(events)
+
+
+def relay_pending(client, batch_size=None):
+    relayed = 0
+    while True:
+        published = relay_batch(client, batch_size)
+        if not published:
+            return relayed
+        relayed += published
@@ -1,12 +1,22 @@
 import uuid
+from collections import defaultdict
+from decimal import Decimal
 
-from django.db import transaction
-from django.db.models import F
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from rest_framework import serializers
 
+from apps.core.serializers import SparseFieldsMixin
+from apps.core.transactions import run_with_lock_retry
+from apps.customers import cache as customer_cache
 from apps.customers.models import Customer
-from apps.orders.models import Order, OrderItem, OrderStatus, OrderStatusHistory
+from apps.orders import outbox
+from apps.orders.models import Order, OrderEvent, OrderItem, OrderStatus, OrderStatusHistory
+from apps.products import cache as product_cache
+from apps.products import stock
 from apps.products.models import Product
+from apps.reports import rollups
 
 VALID_TRANSITIONS = {
     OrderStatus.PENDING: [OrderStatus.CONFIRMED, OrderStatus.CANCELED],
@@ -27,13 +37,16 @@ class OrderCreateSerializer(serializers.Serializer):
     items = OrderItemInputSerializer(many=True)
     observations = serializers.CharField(required=False, allow_blank=True)
 
+    replayed = False
+
     def validate(self, attrs):
         customer_id = attrs["customer_id"]
         items = attrs["items"]
 
-        try:
-            customer = Customer.objects.get(id=customer_id, is_active=True)
-        except Customer.DoesNotExist:
+        customer = customer_cache.get_active_customer(
+            customer_id, Customer.objects.filter(is_active=True)
+        )
+        if customer is None:
             raise serializers.ValidationError("Cliente inativo ou inexistente.")
 
         if not items:
@@ -48,62 +61,80 @@ class OrderCreateSerializer(serializers.Serializer):
         idempotency_key = validated_data["idempotency_key"]
         observations = validated_data.get("observations", "")
 
-        existing = Order.objects.filter(idempotency_key=idempotency_key).first()
+        # A view já procurou a chave no banco e no arquivo; aqui só resta a corrida, que chega
+        # como IntegrityError.
+        if not self.context.get("idempotency_checked"):
+            existing = Order.objects.filter(idempotency_key=idempotency_key).first()
+            if existing:
+                self.replayed = True
+                return existing
 
-        if existing:
+        try:
+            return run_with_lock_retry(
+                lambda: self._place_order(customer, items, idempotency_key, observations),
+                operation="order_create",
+            )
+        except IntegrityError:
+            existing = Order.objects.filter(idempotency_key=idempotency_key).first()
+            if existing is None or transaction.get_connection().in_atomic_block:
+                raise
+            self.replayed = True
             return existing
 
-        with transaction.atomic():
-
-            products_map = {}
-
-            for item in items:
-                product = Product.objects.select_for_update().get(
-                    id=item["product_id"], is_active=True
-                )
+    def _place_order(self, customer, items, idempotency_key, observations):
+        requested = defaultdict(int)
+        for item in items:
+            requested[item["product_id"]] += item["quantity"]
 
-                if product.stock_quantity < item["quantity"]:
-                    raise serializers.ValidationError(
-                        f"Estoque insuficiente para o produto: {product.name}"
-                    )
+        with transaction.atomic():
+            products_map = self._get_products(requested)
 
-                products_map[product.id] = product
+            total = sum(
+                (products_map[item["product_id"]].price * item["quantity"] for item in items),
+                Decimal("0"),
+            )
 
+            # Número gerado aqui, e não no laço de Order.save: sem savepoints no caminho quente, e
+            # uma idempotency_key repetida chega intacta ao replay de create().
             order = Order.objects.create(
-                order_number=str(uuid.uuid4()).replace("-", "")[:12],
+                order_number=Order.generate_order_number(),
                 customer=customer,
-                total_amount=0,
+                total_amount=total,
                 idempotency_key=idempotency_key,
                 observations=observations,
             )
 
-            total = 0
-
-            for item in items:
-                product = products_map[item["product_id"]]
-                quantity = item["quantity"]
-                unit_price = product.price
-                subtotal = unit_price * quantity
-
-                Product.objects.filter(id=product.id).update(
-                    stock_quantity=F("stock_quantity") - quantity
-                )
+            stock.reserve(requested, reference=str(order.id), products=products_map)
+
+            order_items = OrderItem.objects.bulk_create(
+                [
+                    OrderItem(
+                        id=uuid.uuid4(),
+                        order=order,
+                        product=products_map[item["product_id"]],
+                        quantity=item["quantity"],
+                        unit_price=products_map[item["product_id"]].price,
+                        subtotal=products_map[item["product_id"]].price * item["quantity"],
+                    )
+                    for item in items
+                ]
+            )
+            rollups.record_created([order], order_items)
+            outbox.order_created([order], order_items)
 
-                OrderItem.objects.create(
-                    id=uuid.uuid4(),
-                    order=order,
-                    product=product,
-                    quantity=quantity,
-                    unit_price=unit_price,
-                    subtotal=subtotal,
-                )
+            return order
 
-                total += subtotal
+    def _get_products(self, requested):
+        # Preço e nome podem vir do cache; o saldo é conferido depois nos shards travados.
+        products_map = product_cache.get_products(
+            list(requested), Product.objects.filter(is_active=True)
+        )
 
-            order.total_amount = total
-            order.save(update_fields=["total_amount"])
+        for product_id in requested:
+            if product_id not in products_map:
+                raise serializers.ValidationError(f"Produto inativo ou inexistente: {product_id}")
 
-            return order
+        return products_map
 
 
 class OrderItemOutputSerializer(serializers.ModelSerializer):
@@ -121,7 +152,20 @@ class OrderItemOutputSerializer(serializers.ModelSerializer):
         ]
 
 
-class OrderDetailSerializer(serializers.ModelSerializer):
+class OrderStatusHistoryOutputSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderStatusHistory
+        fields = [
+            "id",
+            "previous_status",
+            "new_status",
+            "changed_by",
+            "reason",
+            "created_at",
+        ]
+
+
+class OrderDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     customer_name = serializers.CharField(source="customer.name")
 
     class Meta:
@@ -137,18 +181,18 @@ class OrderDetailSerializer(serializers.ModelSerializer):
             "created_at",
         ]
 
-
-class OrderStatusHistoryOutputSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = OrderStatusHistory
-        fields = [
-            "id",
-            "previous_status",
-            "new_status",
-            "changed_by",
-            "reason",
-            "created_at",
-        ]
+    def get_fields(self):
+        fields = super().get_fields()
+        expand = self.context.get("expand", ())
+        requested = self.context.get("fields")
+        expansions = {
+            "items": OrderItemOutputSerializer,
+            "status_history": OrderStatusHistoryOutputSerializer,
+        }
+        for name, serializer_class in expansions.items():
+            if name in expand and (requested is None or name in requested):
+                fields[name] = serializer_class(many=True, read_only=True)
+        return fields
 
 
 class OrderStatusUpdateSerializer(serializers.Serializer):
@@ -172,13 +216,20 @@ class OrderStatusUpdateSerializer(serializers.Serializer):
     def save(self):
         order = self.context["order"]
         new_status = self.validated_data["new_status"]
-        previous_status = self.validated_data["previous_status"]
         reason = self.validated_data.get("reason", "")
         changed_by = self.validated_data["changed_by"]
 
         with transaction.atomic():
+            # validate() viu o pedido sem lock: outro PATCH ou o cancelamento pode ter mudado o
+            # status desde então, e aplicar a mesma transição duas vezes duplicaria rollups e
+            # eventos.
+            locked = Order.objects.select_for_update().only("status").get(pk=order.pk)
+            previous_status = locked.status
+            if new_status not in VALID_TRANSITIONS.get(previous_status, []):
+                raise serializers.ValidationError("Transição de status inválida")
+
             order.status = new_status
-            order.save(update_fields=["status"])
+            order.save(update_fields=["status", "updated_at"])
 
             OrderStatusHistory.objects.create(
                 order=order,
@@ -187,5 +238,114 @@ class OrderStatusUpdateSerializer(serializers.Serializer):
                 changed_by=changed_by,
                 reason=reason,
             )
+            rollups.record_status_change(order, previous_status, new_status)
+            outbox.status_changed([(order, previous_status, new_status)], changed_by, reason)
 
         return order
+
+
+class OrderBulkStatusUpdateSerializer(serializers.Serializer):
+    order_ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
+    new_status = serializers.ChoiceField(choices=OrderStatus.choices)
+    changed_by = serializers.CharField(required=False, default="System")
+    reason = serializers.CharField(required=False, allow_blank=True)
+
+    def validate_order_ids(self, value):
+        order_ids = list(dict.fromkeys(value))
+        if len(order_ids) > settings.ORDER_BULK_STATUS_MAX_ORDERS:
+            raise serializers.ValidationError(
+                f"Máximo de {settings.ORDER_BULK_STATUS_MAX_ORDERS} pedidos por requisição."
+            )
+        return order_ids
+
+    def save(self):
+        order_ids = self.validated_data["order_ids"]
+        new_status = self.validated_data["new_status"]
+        changed_by = self.validated_data["changed_by"]
+        reason = self.validated_data.get("reason", "")
+
+        with transaction.atomic():
+            # Trava os pedidos em ordem de id, como o PATCH individual faria um a um, e valida
+            # todas as transições em memória antes de qualquer escrita.
+            orders = {
+                order.pk: order
+                for order in Order.objects.select_for_update()
+                .filter(id__in=order_ids)
+                .order_by("id")
+                .only("id", "customer_id", "status", "total_amount", "created_at")
+            }
+
+            results, transitions = [], []
+            for order_id in order_ids:
+                order = orders.get(order_id)
+                if order is None:
+                    results.append(self._error(order_id, "Pedido não encontrado."))
+                elif new_status not in VALID_TRANSITIONS.get(order.status, []):
+                    results.append(self._error(order_id, "Transição de status inválida"))
+                else:
+                    transitions.append((order, order.status, new_status))
+                    results.append(
+                        {
+                            "order_id": str(order_id),
+                            "status": "updated",
+                            "previous_status": order.status,
+                            "new_status": new_status,
+                        }
+                    )
+
+            if transitions:
+                Order.objects.filter(id__in=[order.pk for order, _, _ in transitions]).update(
+                    status=new_status, updated_at=timezone.now()
+                )
+                OrderStatusHistory.objects.bulk_create(
+                    [
+                        OrderStatusHistory(
+                            order=order,
+                            previous_status=previous_status,
+                            new_status=new_status,
+                            changed_by=changed_by,
+                            reason=reason,
+                        )
+                        for order, previous_status, _ in transitions
+                    ]
+                )
+                rollups.record_status_changes(transitions)
+                outbox.status_changed(transitions, changed_by, reason)
+
+        return results
+
+    def _error(self, order_id, message):
+        return {"order_id": str(order_id), "status": "error", "errors": [message]}
+
+
+class OrderBulkStatusResultSerializer(serializers.Serializer):
+    order_id = serializers.UUIDField()
+    status = serializers.CharField(help_text="updated ou error.")
+    previous_status = serializers.ChoiceField(choices=OrderStatus.choices, required=False)
+    new_status = serializers.ChoiceField(choices=OrderStatus.choices, required=False)
+    errors = serializers.ListField(child=serializers.CharField(), required=False)
+
+
+class OrderBulkStatusResponseSerializer(serializers.Serializer):
+    updated = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    results = OrderBulkStatusResultSerializer(many=True)
+
+
+class OrderEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderEvent
+        fields = ["id", "event_type", "order_id", "payload", "created_at"]
+
+
+class OrderEventFeedQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, required=False, default=0)
+    limit = serializers.IntegerField(min_value=1, required=False)
+
+    def validate_limit(self, value):
+        return min(value, settings.ORDER_EVENT_FEED_LIMIT)
+
+
+class OrderEventFeedSerializer(serializers.Serializer):
+    results = OrderEventSerializer(many=True)
+    next_since = serializers.IntegerField()
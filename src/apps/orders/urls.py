@@ -4,6 +4,10 @@ from apps.orders.views import OrderViewSet
 
 urlpatterns = [
     path("", OrderViewSet.as_view({"get": "list", "post": "create"})),
+    path("import/", OrderViewSet.as_view({"post": "import_orders"})),
+    path("status/", OrderViewSet.as_view({"post": "bulk_update_status"})),
+    path("events/", OrderViewSet.as_view({"get": "events"})),
+    path("export/", OrderViewSet.as_view({"get": "export_orders"})),
     path("<uuid:id>/", OrderViewSet.as_view({"get": "retrieve", "delete": "destroy"})),
     path("<uuid:id>/status/", OrderViewSet.as_view({"patch": "update_status"})),
     path("<uuid:id>/items/", OrderViewSet.as_view({"get": "items"})),
@@ -1,28 +1,99 @@
+import codecs
+import json
+from collections import defaultdict
+
 from django.db import transaction
-from django.db.models import F
+from django.db.models import Prefetch
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
+from apps.core.mixins import FIELDS_PARAMETER, ConditionalRequestMixin, SparseFieldsMixin
+from apps.orders import archive, exporter, outbox
 from apps.orders.filters import OrderFilter
+from apps.orders.idempotency import (
+    IdempotencyConflict,
+    get_cached_response,
+    idempotency_lock,
+    store_response,
+    wait_for_response,
+)
+from apps.orders.importer import OrderImporter, parse_csv, parse_jsonl
 from apps.orders.models import Order, OrderItem, OrderStatus, OrderStatusHistory
 from apps.orders.serializers import (
+    OrderBulkStatusResponseSerializer,
+    OrderBulkStatusUpdateSerializer,
     OrderCreateSerializer,
     OrderDetailSerializer,
+    OrderEventFeedQuerySerializer,
+    OrderEventFeedSerializer,
     OrderItemOutputSerializer,
     OrderStatusHistoryOutputSerializer,
     OrderStatusUpdateSerializer,
 )
-from apps.products.models import Product
+from apps.products import stock
+from apps.reports import rollups
+
+ORDER_DETAIL_COLUMNS = (
+    "id",
+    "order_number",
+    "customer",
+    "status",
+    "total_amount",
+    "observations",
+    "created_at",
+)
+
+ORDER_EXPANSIONS = {
+    "items": Prefetch(
+        "items",
+        queryset=OrderItem.objects.select_related("product")
+        .only("id", "order", "product", "quantity", "unit_price", "subtotal", "product__name")
+        .order_by("created_at"),
+    ),
+    "status_history": Prefetch(
+        "status_history", queryset=OrderStatusHistory.objects.order_by("created_at")
+    ),
+}
+
+EXPAND_PARAMETER = OpenApiParameter(
+    name="expand",
+    type=str,
+    description="Relações embutidas na resposta, separadas por vírgula: items, status_history.",
+)
+
+EXPORT_OUTPUT_PARAMETER = OpenApiParameter(
+    name="output",
+    type=str,
+    enum=sorted(exporter.RENDERERS),
+    default="jsonl",
+    description=(
+        "Formato do arquivo: jsonl (um pedido por linha, com itens) ou csv (um item por linha)."
+    ),
+)
+
+IMPORT_PARSERS = {
+    "application/x-ndjson": parse_jsonl,
+    "application/jsonl": parse_jsonl,
+    "text/csv": parse_csv,
+}
 
 
 @extend_schema_view(
-    list=extend_schema(summary="Listagem de Pedidos", tags=["Pedidos"]),
-    retrieve=extend_schema(summary="Detalhar pedido", tags=["Pedidos"]),
+    list=extend_schema(
+        summary="Listagem de Pedidos",
+        parameters=[EXPAND_PARAMETER, FIELDS_PARAMETER],
+        tags=["Pedidos"],
+    ),
+    retrieve=extend_schema(
+        summary="Detalhar pedido", parameters=[EXPAND_PARAMETER, FIELDS_PARAMETER], tags=["Pedidos"]
+    ),
     create=extend_schema(
         request=OrderCreateSerializer,
         responses=OrderDetailSerializer,
@@ -32,6 +103,8 @@ from apps.products.models import Product
     destroy=extend_schema(summary="Remover pedido", tags=["Pedidos"]),
 )
 class OrderViewSet(
+    ConditionalRequestMixin,
+    SparseFieldsMixin,
     viewsets.GenericViewSet,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
@@ -42,6 +115,43 @@ class OrderViewSet(
     filter_backends = [DjangoFilterBackend]
     filterset_class = OrderFilter
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("list", "retrieve", "update_status"):
+            # OrderDetailSerializer lê customer.name: o join evita uma consulta por pedido.
+            queryset = self.project_queryset(queryset, (*ORDER_DETAIL_COLUMNS, "customer__name"))
+            # As relações expandidas saem em uma consulta por relação para a página inteira.
+            return queryset.prefetch_related(
+                *(ORDER_EXPANSIONS[name] for name in sorted(self.get_selected_expand()))
+            )
+        if self.action in ("items", "status_history"):
+            return queryset.only("id")
+        return queryset
+
+    def get_expand(self):
+        if self.action not in ("list", "retrieve"):
+            return set()
+
+        raw = self.request.query_params.get("expand", "")
+        expand = {name.strip() for name in raw.split(",") if name.strip()}
+        unknown = expand - set(ORDER_EXPANSIONS)
+        if unknown:
+            raise ValidationError({"expand": f"Relações inválidas: {', '.join(sorted(unknown))}."})
+        return expand
+
+    def get_selected_expand(self):
+        # Com ?fields=, só as relações expandidas que também foram pedidas entram na resposta.
+        fields = self.get_sparse_fields()
+        return {name for name in self.get_expand() if fields is None or name in fields}
+
+    def get_fields_context(self):
+        return {"expand": self.get_expand()}
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["expand"] = self.get_expand()
+        return context
+
     def get_serializer_class(self):
         if self.action == "create":
             return OrderCreateSerializer
@@ -54,19 +164,163 @@ class OrderViewSet(
         self.check_object_permissions(self.request, obj)
         return obj
 
+    def get_archived_order(self):
+        # Pedidos encerrados há muito tempo saem das tabelas quentes (apps/orders/archive.py);
+        # o detalhe continua respondendo pelo arquivo quando o pedido não está mais lá.
+        if Order.all_objects.filter(id=self.kwargs["id"]).exists():
+            return None
+        return archive.get_archived(id=self.kwargs["id"])
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            data = archive.get_archived(id=self.kwargs["id"])
+            if data is None:
+                raise
+
+        expand = self.get_selected_expand()
+        fields = self.get_sparse_fields()
+        data = {
+            name: value
+            for name, value in data.items()
+            if name in expand
+            or (name not in archive.EXPANSIONS and (fields is None or name in fields))
+        }
+        return Response(data, status=status.HTTP_200_OK)
+
     def create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        idempotency_key = self._get_idempotency_key(request)
+        if idempotency_key is None:
+            return self._create_order(request)
 
-        order = serializer.save()
+        cached = get_cached_response(idempotency_key)
+        if cached is not None:
+            return Response(cached, status=status.HTTP_200_OK)
+
+        with idempotency_lock(idempotency_key) as acquired:
+            if not acquired:
+                cached = wait_for_response(idempotency_key)
+                if cached is None:
+                    raise IdempotencyConflict()
+                return Response(cached, status=status.HTTP_200_OK)
+
+            return self._create_order(request, idempotency_key)
+
+    def _create_order(self, request, idempotency_key=None):
+        existing = None
+        if idempotency_key is not None:
+            existing = (
+                Order.objects.select_related("customer")
+                .filter(idempotency_key=idempotency_key)
+                .first()
+            )
+
+        if existing is None and idempotency_key is not None:
+            archived = archive.get_archived(idempotency_key=idempotency_key)
+            if archived is not None:
+                data = {
+                    name: value
+                    for name, value in archived.items()
+                    if name not in archive.EXPANSIONS
+                }
+                store_response(idempotency_key, data)
+                return Response(data, status=status.HTTP_200_OK)
 
-        status_code = status.HTTP_201_CREATED
-        if Order.objects.filter(idempotency_key=request.data.get("idempotency_key")).count() > 1:
-            status_code = status.HTTP_200_OK
+        if existing is not None:
+            order, status_code = existing, status.HTTP_200_OK
+        else:
+            serializer = self.get_serializer(data=request.data)
+            serializer.context["idempotency_checked"] = idempotency_key is not None
+            serializer.is_valid(raise_exception=True)
+            order = serializer.save()
+            status_code = status.HTTP_200_OK if serializer.replayed else status.HTTP_201_CREATED
 
         output = OrderDetailSerializer(order)
+        if idempotency_key is not None:
+            store_response(idempotency_key, output.data)
         return Response(output.data, status=status_code)
 
+    def _get_idempotency_key(self, request):
+        idempotency_key = (
+            request.data.get("idempotency_key") if hasattr(request.data, "get") else None
+        )
+        if not isinstance(idempotency_key, str) or not 0 < len(idempotency_key) <= 255:
+            return None
+        return idempotency_key
+
+    @extend_schema(
+        request={
+            "application/x-ndjson": OpenApiTypes.BINARY,
+            "text/csv": OpenApiTypes.BINARY,
+        },
+        responses={(200, "application/x-ndjson"): OpenApiTypes.BINARY},
+        summary="Importar pedidos em lote (JSONL ou CSV)",
+        tags=["Pedidos"],
+    )
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_orders(self, request):
+        content_type = request.content_type.split(";")[0].strip()
+        if content_type not in IMPORT_PARSERS:
+            raise ValidationError(
+                f"Content-Type não suportado. Use um de: {', '.join(IMPORT_PARSERS)}."
+            )
+
+        chunk_size = request.query_params.get("chunk_size")
+        if chunk_size is not None and (not chunk_size.isdigit() or int(chunk_size) < 1):
+            raise ValidationError("chunk_size deve ser um inteiro positivo.")
+
+        lines = codecs.iterdecode(request.stream or [], "utf-8")
+        records = IMPORT_PARSERS[content_type](lines)
+        report = OrderImporter(chunk_size=int(chunk_size) if chunk_size else None).run(records)
+
+        return StreamingHttpResponse(
+            (json.dumps(result, ensure_ascii=False) + "\n" for result in report),
+            content_type="application/x-ndjson",
+        )
+
+    @extend_schema(
+        parameters=[EXPORT_OUTPUT_PARAMETER],
+        filters=True,
+        responses={
+            (200, "application/x-ndjson"): OpenApiTypes.BINARY,
+            (200, "text/csv"): OpenApiTypes.BINARY,
+        },
+        summary="Exportar pedidos com itens (JSONL ou CSV)",
+        tags=["Pedidos"],
+    )
+    @action(detail=False, methods=["get"], url_path="export")
+    def export_orders(self, request):
+        # "format" é reservado pelo DRF para a negociação de renderer.
+        output = request.query_params.get("output", "jsonl")
+        if output not in exporter.RENDERERS:
+            raise ValidationError(
+                {"output": f"Formato inválido. Use um de: {', '.join(sorted(exporter.RENDERERS))}."}
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            exporter.export(queryset, output), content_type=exporter.EXPORT_CONTENT_TYPES[output]
+        )
+        response["Content-Disposition"] = f'attachment; filename="orders.{output}"'
+        return response
+
+    @extend_schema(
+        parameters=[OrderEventFeedQuerySerializer],
+        responses=OrderEventFeedSerializer,
+        summary="Feed de eventos de pedidos",
+        tags=["Pedidos"],
+    )
+    @action(detail=False, methods=["get"], url_path="events")
+    def events(self, request):
+        query = OrderEventFeedQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        since = query.validated_data["since"]
+
+        events = outbox.feed(since, query.validated_data.get("limit"))
+        data = {"results": events, "next_since": events[-1].pk if events else since}
+        return Response(OrderEventFeedSerializer(data).data, status=status.HTTP_200_OK)
+
     @extend_schema(
         request=OrderStatusUpdateSerializer,
         responses=OrderDetailSerializer,
@@ -86,6 +340,24 @@ class OrderViewSet(
 
         return Response(OrderDetailSerializer(order).data, status=status.HTTP_200_OK)
 
+    @extend_schema(
+        request=OrderBulkStatusUpdateSerializer,
+        responses=OrderBulkStatusResponseSerializer,
+        summary="Atualizar status de pedidos em lote",
+        tags=["Pedidos"],
+    )
+    @action(detail=False, methods=["post"], url_path="status")
+    def bulk_update_status(self, request):
+        serializer = OrderBulkStatusUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+
+        updated = sum(1 for result in results if result["status"] == "updated")
+        return Response(
+            {"updated": updated, "failed": len(results) - updated, "results": results},
+            status=status.HTTP_200_OK,
+        )
+
     @extend_schema(
         responses=OrderItemOutputSerializer(many=True),
         summary="Listar itens do pedido",
@@ -93,6 +365,10 @@ class OrderViewSet(
     )
     @action(detail=True, methods=["get"], url_path="items")
     def items(self, request, id=None):
+        archived = self.get_archived_order()
+        if archived is not None:
+            return Response(archived["items"], status=status.HTTP_200_OK)
+
         order = self.get_object()
         items = (
             OrderItem.objects.select_related("product").filter(order=order).order_by("created_at")
@@ -107,6 +383,10 @@ class OrderViewSet(
     )
     @action(detail=True, methods=["get"], url_path="status-history")
     def status_history(self, request, id=None):
+        archived = self.get_archived_order()
+        if archived is not None:
+            return Response(archived["status_history"], status=status.HTTP_200_OK)
+
         order = self.get_object()
         history = OrderStatusHistory.objects.filter(order=order).order_by("created_at")
         serializer = OrderStatusHistoryOutputSerializer(history, many=True)
@@ -115,20 +395,24 @@ class OrderViewSet(
     def destroy(self, request, *args, **kwargs):
         order = self.get_object()
 
-        if order.status not in [OrderStatus.PENDING, OrderStatus.CONFIRMED]:
-            raise ValidationError("Apenas pedidos PENDENTE ou CONFIRMADO podem ser cancelados.")
-
         with transaction.atomic():
-            items = (
-                OrderItem.objects.select_related("product").select_for_update().filter(order=order)
-            )
+            order = Order.objects.select_for_update().get(pk=order.pk)
+
+            if order.status not in [OrderStatus.PENDING, OrderStatus.CONFIRMED]:
+                raise ValidationError("Apenas pedidos PENDENTE ou CONFIRMADO podem ser cancelados.")
+
+            requested = defaultdict(int)
+            for product_id, quantity in OrderItem.objects.filter(order=order).values_list(
+                "product_id", "quantity"
+            ):
+                requested[product_id] += quantity
 
-            for item in items:
-                Product.objects.filter(id=item.product.id).update(
-                    stock_quantity=F("stock_quantity") + item.quantity
-                )
+            stock.release(requested, reference=str(order.id))
 
+            previous_status = order.status
             order.status = OrderStatus.CANCELED
-            order.save(update_fields=["status"])
+            order.save(update_fields=["status", "updated_at"])
+            rollups.record_status_change(order, previous_status, OrderStatus.CANCELED)
+            outbox.order_canceled(order, previous_status)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from apps.core.metrics import REGISTRY
+
+PRODUCT_CACHE_PREFIX = "products:cache"
+
+PRODUCT_CACHE_REQUESTS = REGISTRY.counter(
+    "product_cache_requests_total",
+    "Leituras do cache de produtos por tipo de entrada e resultado.",
+    labelnames=("kind", "result"),
+)
+
+
+def _cache_key(kind, product_id):
+    return f"{PRODUCT_CACHE_PREFIX}:{kind}:{product_id}"
+
+
+def get_detail(product_id):
+    data = cache.get(_cache_key("detail", product_id))
+    PRODUCT_CACHE_REQUESTS.inc(kind="detail", result="miss" if data is None else "hit")
+    return data
+
+
+def store_detail(product_id, data):
+    cache.set(_cache_key("detail", product_id), dict(data), timeout=settings.PRODUCT_CACHE_TTL)
+
+
+def get_products(product_ids, queryset):
+    keys = {_cache_key("instance", product_id): product_id for product_id in product_ids}
+    products = {keys[key]: product for key, product in cache.get_many(list(keys)).items()}
+    PRODUCT_CACHE_REQUESTS.inc(len(products), kind="instance", result="hit")
+
+    missing = [product_id for product_id in product_ids if product_id not in products]
+    if missing:
+        PRODUCT_CACHE_REQUESTS.inc(len(missing), kind="instance", result="miss")
+        fetched = queryset.in_bulk(missing)
+        cache.set_many(
+            {
+                _cache_key("instance", product_id): product
+                for product_id, product in fetched.items()
+            },
+            timeout=settings.PRODUCT_CACHE_TTL,
+        )
+        products.update(fetched)
+
+    return products
+
+
+def invalidate(product_ids, kinds=("detail", "instance")):
+    keys = [_cache_key(kind, product_id) for product_id in product_ids for kind in kinds]
+    if not keys:
+        return
+
+    cache.delete_many(keys)
+    # Um leitor concorrente pode repovoar a entrada com a linha antiga antes do commit.
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_stock(product_ids):
+    # Reservas só mudam o saldo exibido no detalhe; preço e nome seguem válidos para os pedidos.
+    invalidate(product_ids, kinds=("detail",))
@@ -1,6 +1,7 @@
 import django_filters
 
-from apps.products.models import Product
+from apps.products import search
+from apps.products.models import Product, ProductSearchTerm
 
 
 class ProductFilter(django_filters.FilterSet):
@@ -11,7 +12,11 @@ class ProductFilter(django_filters.FilterSet):
         field_name="name", lookup_expr="exact", label="Nome exato do produto"
     )
     name_like = django_filters.CharFilter(
-        field_name="name", lookup_expr="icontains", label="Nome do produto (LIKE)"
+        method="filter_name_like", label="Palavras do nome do produto (por prefixo)"
+    )
+    q = django_filters.CharFilter(
+        method="filter_search",
+        label="Busca textual em SKU, nome e descrição, ordenada por relevância",
     )
     is_active = django_filters.BooleanFilter(
         field_name="is_active", label="Status do produto no sistema"
@@ -24,3 +29,9 @@ class ProductFilter(django_filters.FilterSet):
             "name",
             "is_active",
         ]
+
+    def filter_name_like(self, queryset, name, value):
+        return search.search(queryset, ProductSearchTerm.objects.all(), value, fields=["name"])
+
+    def filter_search(self, queryset, name, value):
+        return search.search(queryset, ProductSearchTerm.objects.all(), value)
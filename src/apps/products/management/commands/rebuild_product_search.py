@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, Q
+
+from apps.core.cache import invalidate_model
+from apps.products.models import Product, ProductSearchTerm
+
+
+def stale_products(full=False):
+    queryset = Product.all_objects.all()
+    if full:
+        return queryset
+    return queryset.filter(
+        Q(search_document__isnull=True) | Q(search_document__indexed_at__lt=F("updated_at"))
+    )
+
+
+def rebuild_search_index(batch_size, full=False):
+    indexed = 0
+    last_id = None
+    while True:
+        pending = stale_products(full).order_by("id")
+        if last_id is not None:
+            pending = pending.filter(id__gt=last_id)
+        product_ids = list(pending.values_list("id", flat=True)[:batch_size])
+        if not product_ids:
+            return indexed
+
+        with transaction.atomic():
+            # A trava impede que um save concorrente fique com termos antigos e indexed_at novo.
+            products = list(
+                Product.all_objects.select_for_update().filter(id__in=product_ids).order_by("id")
+            )
+            ProductSearchTerm.objects.rebuild(products)
+            invalidate_model(Product, pks=product_ids)
+
+        indexed += len(products)
+        last_id = product_ids[-1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Atualiza o índice de busca de produtos (?q=), reindexando apenas os produtos alterados "
+        "desde a última indexação. Necessário após cargas feitas fora de Product.save."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--full", action="store_true", help="Reindexa todos os produtos, alterados ou não."
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size deve ser um inteiro positivo.")
+
+        indexed = rebuild_search_index(options["batch_size"], full=options["full"])
+        self.stdout.write(f"Produtos indexados: {indexed}")
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.products.stock import settle
+
+
+class Command(BaseCommand):
+    help = (
+        "Consolida os shards de estoque em Product.stock_quantity e rebalanceia os shards dos "
+        "produtos com movimentações pendentes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Executa continuamente, aguardando N segundos entre as consolidações.",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        while True:
+            settled = settle()
+            self.stdout.write(f"Produtos consolidados: {settled}")
+            if not interval:
+                return
+            time.sleep(interval)
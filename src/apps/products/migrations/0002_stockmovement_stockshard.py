@@ -0,0 +1,101 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:39
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockMovement",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "shard_index",
+                    models.PositiveSmallIntegerField(null=True, verbose_name="Índice do shard"),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("RESERVE", "Reserve"),
+                            ("RELEASE", "Release"),
+                            ("ADJUST", "Adjust"),
+                        ],
+                        max_length=10,
+                        verbose_name="Tipo",
+                    ),
+                ),
+                ("quantity", models.IntegerField(verbose_name="Variação de estoque")),
+                (
+                    "reference",
+                    models.CharField(blank=True, max_length=64, verbose_name="Referência"),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("settled_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="stock_movements",
+                        to="products.product",
+                        verbose_name="Produto",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "product_stock_movements",
+                "indexes": [
+                    models.Index(
+                        fields=["product", "settled_at"], name="product_sto_product_e0aa6b_idx"
+                    ),
+                    models.Index(fields=["reference"], name="product_sto_referen_9f83ab_idx"),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="StockShard",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("index", models.PositiveSmallIntegerField(verbose_name="Índice do shard")),
+                (
+                    "quantity",
+                    models.PositiveIntegerField(verbose_name="Quantidade disponível no shard"),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_shards",
+                        to="products.product",
+                        verbose_name="Produto",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "product_stock_shards",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("product", "index"), name="uniq_stock_shard_index"
+                    )
+                ],
+            },
+        ),
+    ]
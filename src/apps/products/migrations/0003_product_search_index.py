@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0002_stockmovement_stockshard"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductSearchDocument",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_document",
+                        serialize=False,
+                        to="products.product",
+                        verbose_name="Produto",
+                    ),
+                ),
+                ("indexed_at", models.DateTimeField(verbose_name="updated_at do produto indexado")),
+            ],
+            options={
+                "db_table": "product_search_documents",
+            },
+        ),
+        migrations.CreateModel(
+            name="ProductSearchTerm",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("term", models.CharField(max_length=64, verbose_name="Termo")),
+                ("field", models.CharField(max_length=20, verbose_name="Campo de origem")),
+                ("weight", models.PositiveSmallIntegerField(verbose_name="Peso")),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_terms",
+                        to="products.product",
+                        verbose_name="Produto",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "product_search_terms",
+                "indexes": [
+                    models.Index(fields=["term", "product"], name="product_sea_term_ecd03d_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("product", "term", "field"), name="uniq_product_search_term"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,6 +1,23 @@
-from django.db import models
+import uuid
 
-from apps.core.models import CoreModel
+from django.db import models, transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from apps.core.models import CoreModel, SoftDeleteManager, SoftDeleteQuerySet
+from apps.products import cache as product_cache
+from apps.products import search
+
+
+class ProductQuerySet(SoftDeleteQuerySet):
+    def with_available_stock(self):
+        shard_total = (
+            StockShard.objects.filter(product=OuterRef("pk"))
+            .values("product")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        return self.annotate(available_stock=Coalesce(Subquery(shard_total), F("stock_quantity")))
 
 
 class Product(CoreModel):
@@ -11,6 +28,9 @@ class Product(CoreModel):
     stock_quantity = models.PositiveIntegerField(verbose_name="Quantidade em estoque")
     is_active = models.BooleanField(default=True, db_index=True, verbose_name="Status")
 
+    objects = SoftDeleteManager.from_queryset(ProductQuerySet)()
+    all_objects = ProductQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Produto"
         verbose_name_plural = "Produtos"
@@ -23,6 +43,126 @@ class Product(CoreModel):
     def __str__(self):
         return self.name
 
-    def update_stock(self, quantity: int):
-        self.stock_quantity = quantity
-        self.save(update_fields=["stock_quantity"])
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if update_fields is None or set(update_fields) & set(search.FIELD_WEIGHTS):
+                ProductSearchTerm.objects.rebuild([self])
+        product_cache.invalidate([self.pk])
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        product_cache.invalidate([self.pk])
+        return result
+
+    @property
+    def available_quantity(self):
+        if "available_stock" in self.__dict__:
+            return self.available_stock
+
+        total = self.stock_shards.aggregate(total=Sum("quantity"))["total"]
+        return self.stock_quantity if total is None else total
+
+
+class ProductSearchTermQuerySet(models.QuerySet):
+    def rebuild(self, products):
+        products = list(products)
+        product_ids = [product.pk for product in products]
+
+        self.filter(product_id__in=product_ids).delete()
+        self.bulk_create(
+            [
+                ProductSearchTerm(product_id=product.pk, term=term, field=field, weight=weight)
+                for product in products
+                for (term, field), weight in search.document_terms(product).items()
+            ]
+        )
+
+        # indexed_at guarda o updated_at lido: o reindexador incremental compara os dois.
+        ProductSearchDocument.objects.filter(product_id__in=product_ids).delete()
+        ProductSearchDocument.objects.bulk_create(
+            [
+                ProductSearchDocument(product_id=product.pk, indexed_at=product.updated_at)
+                for product in products
+            ]
+        )
+
+
+class ProductSearchTerm(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="search_terms", verbose_name="Produto"
+    )
+    term = models.CharField(max_length=search.MAX_TERM_LENGTH, verbose_name="Termo")
+    field = models.CharField(max_length=20, verbose_name="Campo de origem")
+    weight = models.PositiveSmallIntegerField(verbose_name="Peso")
+
+    objects = ProductSearchTermQuerySet.as_manager()
+
+    class Meta:
+        db_table = "product_search_terms"
+        indexes = [
+            models.Index(fields=["term", "product"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "term", "field"], name="uniq_product_search_term"
+            ),
+        ]
+
+
+class ProductSearchDocument(models.Model):
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_document",
+        verbose_name="Produto",
+    )
+    indexed_at = models.DateTimeField(verbose_name="updated_at do produto indexado")
+
+    class Meta:
+        db_table = "product_search_documents"
+
+
+class StockShard(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="stock_shards", verbose_name="Produto"
+    )
+    index = models.PositiveSmallIntegerField(verbose_name="Índice do shard")
+    quantity = models.PositiveIntegerField(verbose_name="Quantidade disponível no shard")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "product_stock_shards"
+        constraints = [
+            models.UniqueConstraint(fields=["product", "index"], name="uniq_stock_shard_index"),
+        ]
+
+
+class StockMovementKind(models.TextChoices):
+    RESERVE = "RESERVE", "Reserve"
+    RELEASE = "RELEASE", "Release"
+    ADJUST = "ADJUST", "Adjust"
+
+
+class StockMovement(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    product = models.ForeignKey(
+        Product, on_delete=models.PROTECT, related_name="stock_movements", verbose_name="Produto"
+    )
+    shard_index = models.PositiveSmallIntegerField(null=True, verbose_name="Índice do shard")
+    kind = models.CharField(max_length=10, choices=StockMovementKind.choices, verbose_name="Tipo")
+    quantity = models.IntegerField(verbose_name="Variação de estoque")
+    reference = models.CharField(max_length=64, blank=True, verbose_name="Referência")
+    created_at = models.DateTimeField(auto_now_add=True)
+    settled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "product_stock_movements"
+        indexes = [
+            models.Index(fields=["product", "settled_at"]),
+            models.Index(fields=["reference"]),
+        ]
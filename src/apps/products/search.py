@@ -0,0 +1,49 @@
+from django.db.models import Case, F, IntegerField, OuterRef, Subquery, Sum, When
+
+from apps.core.search import MAX_TERM_LENGTH, match_all, normalize, tokenize
+
+# Um SKU digitado é quase sempre o produto procurado; a descrição só desempata.
+FIELD_WEIGHTS = {"sku": 8, "name": 4, "description": 1}
+EXACT_MATCH_BONUS = 2
+
+
+def document_terms(product):
+    terms = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        value = getattr(product, field)
+        tokens = tokenize(value)
+        if field == "sku":
+            # O SKU inteiro também vira termo, para que "ABC-123" case sem depender da quebra.
+            tokens.append(normalize(value).strip()[:MAX_TERM_LENGTH])
+        for token in tokens:
+            if token:
+                terms[(token, field)] = terms.get((token, field), 0) + weight
+    return terms
+
+
+def search(queryset, terms, query, fields=None):
+    tokens = list(dict.fromkeys(tokenize(query)))
+    if not tokens:
+        return queryset.none()
+
+    if fields is not None:
+        terms = terms.filter(field__in=fields)
+
+    ranked = match_all(
+        terms,
+        tokens,
+        "product",
+        rank=Sum(
+            Case(
+                When(term__in=tokens, then=F("weight") * EXACT_MATCH_BONUS),
+                default=F("weight"),
+                output_field=IntegerField(),
+            )
+        ),
+    )
+
+    return (
+        queryset.filter(pk__in=ranked.values("product"))
+        .annotate(search_rank=Subquery(ranked.filter(product=OuterRef("pk")).values("rank")[:1]))
+        .order_by("-search_rank", "-created_at", "-id")
+    )
@@ -1,9 +1,11 @@
 from rest_framework import serializers
 
+from apps.core.serializers import SparseFieldsMixin
+from apps.products import stock
 from apps.products.models import Product
 
 
-class ProductModelSerializer(serializers.ModelSerializer):
+class ProductModelSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     is_active = serializers.BooleanField(default=True)
 
     class Meta:
@@ -19,6 +21,19 @@ class ProductModelSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id"]
 
+    def update(self, instance, validated_data):
+        quantity = validated_data.pop("stock_quantity", None)
+        instance = super().update(instance, validated_data)
+        if quantity is not None:
+            stock.set_stock(instance, quantity, reference="api")
+        return instance
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if "stock_quantity" in data:
+            data["stock_quantity"] = instance.available_quantity
+        return data
+
 
 class ProductUpdateSerializer(serializers.ModelSerializer):
     is_active = serializers.BooleanField(default=True)
@@ -0,0 +1,320 @@
+import random
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, When
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.core.cache import invalidate_model
+from apps.core.metrics import REGISTRY
+from apps.products import cache as product_cache
+from apps.products.models import Product, StockMovement, StockMovementKind, StockShard
+
+STOCK_LOCK_WAIT_SECONDS = REGISTRY.histogram(
+    "stock_lock_wait_seconds",
+    "Tempo aguardando os locks dos shards de estoque.",
+    labelnames=("operation",),
+)
+
+
+def split_quantity(quantity, shard_count=None):
+    shard_count = shard_count or settings.STOCK_SHARD_COUNT
+    base, remainder = divmod(quantity, shard_count)
+    return [base + (1 if index < remainder else 0) for index in range(shard_count)]
+
+
+def ensure_shards(product_ids):
+    with transaction.atomic():
+        products = list(
+            Product.all_objects.select_for_update().filter(id__in=product_ids).order_by("id")
+        )
+        existing = defaultdict(set)
+        for product_id, index in StockShard.objects.filter(product_id__in=product_ids).values_list(
+            "product_id", "index"
+        ):
+            existing[product_id].add(index)
+
+        shards = []
+        for product in products:
+            # Sem shards, o estoque ainda vive em stock_quantity; com shards, novos índices nascem
+            # vazios.
+            if existing[product.pk]:
+                quantities = [0] * settings.STOCK_SHARD_COUNT
+            else:
+                quantities = split_quantity(product.stock_quantity)
+            shards.extend(
+                StockShard(product=product, index=index, quantity=quantity)
+                for index, quantity in enumerate(quantities)
+                if index not in existing[product.pk]
+            )
+        StockShard.objects.bulk_create(shards, ignore_conflicts=True)
+
+
+def reserve(requested, reference, products):
+    shard_index = random.randrange(settings.STOCK_SHARD_COUNT)
+    # O caminho é escolhido por uma leitura sem lock, antes de travar qualquer shard: tanto
+    # ensure_shards (que trava produtos) quanto a troca para todos os shards do pedido, com
+    # shards já travados, fugiriam da ordem produto -> (product_id, index).
+    available = _peek_shards(requested, shard_index)
+    missing = [product_id for product_id in requested if product_id not in available]
+    if missing:
+        ensure_shards(missing)
+        available.update(_peek_shards(missing, shard_index))
+
+    if all(available[product_id] >= quantity for product_id, quantity in requested.items()):
+        if _reserve_from_index(requested, reference, shard_index):
+            return
+        # Outra transação esvaziou o shard entre a leitura e o lock. Travar os demais agora sai
+        # da ordem canônica; um eventual deadlock é desfeito pelo banco e a criação do pedido é
+        # repetida por run_with_lock_retry.
+
+    pool = ShardPool(requested)
+    pool.reserve(requested, reference, products)
+    pool.flush()
+
+
+def release(requested, reference):
+    shard_index = random.randrange(settings.STOCK_SHARD_COUNT)
+    present = set(
+        StockShard.objects.filter(product_id__in=list(requested), index=shard_index).values_list(
+            "product_id", flat=True
+        )
+    )
+    missing = [product_id for product_id in requested if product_id not in present]
+    if missing:
+        ensure_shards(missing)
+
+    _increment_shards(requested, shard_index)
+    StockMovement.objects.bulk_create(
+        [
+            StockMovement(
+                product_id=product_id,
+                shard_index=shard_index,
+                kind=StockMovementKind.RELEASE,
+                quantity=quantity,
+                reference=reference,
+            )
+            for product_id, quantity in requested.items()
+        ]
+    )
+    _stock_changed(requested)
+
+
+def set_stock(product, quantity, reference=""):
+    with transaction.atomic():
+        locked = Product.all_objects.select_for_update().get(pk=product.pk)
+        with STOCK_LOCK_WAIT_SECONDS.time(operation="set_stock"):
+            shards = list(
+                StockShard.objects.select_for_update().filter(product=locked).order_by("index")
+            )
+        current = sum(shard.quantity for shard in shards) if shards else locked.stock_quantity
+
+        _redistribute(locked, shards, quantity)
+        Product.all_objects.filter(pk=locked.pk).update(
+            stock_quantity=quantity, updated_at=timezone.now()
+        )
+
+        now = timezone.now()
+        StockMovement.objects.filter(product=locked, settled_at__isnull=True).update(settled_at=now)
+        StockMovement.objects.create(
+            product=locked,
+            kind=StockMovementKind.ADJUST,
+            quantity=quantity - current,
+            reference=reference,
+            settled_at=now,
+        )
+        product_cache.invalidate([product.pk])
+
+    product.stock_quantity = quantity
+    product.__dict__.pop("available_stock", None)
+
+
+def settle(product_ids=None):
+    pending = StockMovement.objects.filter(settled_at__isnull=True)
+    if product_ids is not None:
+        pending = pending.filter(product_id__in=product_ids)
+
+    settled = 0
+    for product_id in pending.values_list("product_id", flat=True).distinct().order_by():
+        with transaction.atomic():
+            product = Product.all_objects.select_for_update().get(pk=product_id)
+            with STOCK_LOCK_WAIT_SECONDS.time(operation="settle"):
+                shards = list(
+                    StockShard.objects.select_for_update().filter(product=product).order_by("index")
+                )
+            total = sum(shard.quantity for shard in shards)
+
+            _redistribute(product, shards, total)
+            Product.all_objects.filter(pk=product.pk).update(stock_quantity=total)
+            StockMovement.objects.filter(product=product, settled_at__isnull=True).update(
+                settled_at=timezone.now()
+            )
+        settled += 1
+
+    return settled
+
+
+def _stock_changed(product_ids):
+    # Os shards não passam pelo CoreModel: avisa os caches que exibem o saldo do produto. A
+    # listagem cacheada traz o saldo ao vivo e não sabe quais produtos cada página contém, então
+    # a tag da tabela cai a cada reserva ou liberação: na escrita intensa, o cache de listagem
+    # vale pouco, em troca de nunca servir saldo antigo.
+    product_ids = list(product_ids)
+    product_cache.invalidate_stock(product_ids)
+    invalidate_model(Product, pks=product_ids)
+
+
+def _peek_shards(product_ids, shard_index):
+    return dict(
+        StockShard.objects.filter(product_id__in=list(product_ids), index=shard_index).values_list(
+            "product_id", "quantity"
+        )
+    )
+
+
+def _lock_shards(product_ids, shard_index):
+    with STOCK_LOCK_WAIT_SECONDS.time(operation="reserve"):
+        return {
+            shard.product_id: shard
+            for shard in StockShard.objects.select_for_update()
+            .filter(product_id__in=list(product_ids), index=shard_index)
+            .order_by("product_id")
+        }
+
+
+def _reserve_from_index(requested, reference, shard_index):
+    shards = _lock_shards(requested, shard_index)
+    if any(shards[product_id].quantity < quantity for product_id, quantity in requested.items()):
+        return False
+
+    _apply_deltas({shards[product_id].pk: -quantity for product_id, quantity in requested.items()})
+    StockMovement.objects.bulk_create(
+        [
+            StockMovement(
+                product_id=product_id,
+                shard_index=shard_index,
+                kind=StockMovementKind.RESERVE,
+                quantity=-quantity,
+                reference=reference,
+            )
+            for product_id, quantity in sorted(requested.items())
+        ]
+    )
+    _stock_changed(requested)
+    return True
+
+
+def _apply_deltas(deltas):
+    if not deltas:
+        return
+    StockShard.objects.filter(pk__in=deltas.keys()).update(
+        quantity=Case(
+            *[When(pk=pk, then=F("quantity") + delta) for pk, delta in deltas.items()],
+            default=F("quantity"),
+            output_field=IntegerField(),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def _increment_shards(requested, shard_index):
+    StockShard.objects.filter(product_id__in=requested.keys(), index=shard_index).update(
+        quantity=Case(
+            *[
+                When(product_id=product_id, then=F("quantity") + quantity)
+                for product_id, quantity in requested.items()
+            ],
+            default=F("quantity"),
+            output_field=IntegerField(),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def _redistribute(product, shards, total):
+    now = timezone.now()
+    by_index = {shard.index: shard for shard in shards}
+    targets = split_quantity(total)
+
+    to_update = []
+    to_create = []
+    for index, quantity in enumerate(targets):
+        shard = by_index.pop(index, None)
+        if shard is None:
+            to_create.append(StockShard(product=product, index=index, quantity=quantity))
+            continue
+        shard.quantity = quantity
+        shard.updated_at = now
+        to_update.append(shard)
+
+    for shard in by_index.values():
+        shard.quantity = 0
+        shard.updated_at = now
+        to_update.append(shard)
+
+    StockShard.objects.bulk_update(to_update, ["quantity", "updated_at"])
+    StockShard.objects.bulk_create(to_create)
+
+
+class ShardPool:
+    def __init__(self, product_ids):
+        self.shards = lock_all_shards(product_ids)
+        self.deltas = defaultdict(int)
+        self.movements = []
+
+    def reserve(self, requested, reference, products):
+        for product_id, quantity in requested.items():
+            if sum(shard.quantity for shard in self.shards[product_id]) < quantity:
+                raise serializers.ValidationError(
+                    f"Estoque insuficiente para o produto: {products[product_id].name}"
+                )
+
+        for product_id, quantity in sorted(requested.items()):
+            remaining = quantity
+            for shard in sorted(self.shards[product_id], key=lambda shard: -shard.quantity):
+                amount = min(shard.quantity, remaining)
+                if not amount:
+                    continue
+                shard.quantity -= amount
+                self.deltas[shard.pk] -= amount
+                self.movements.append(
+                    StockMovement(
+                        product_id=product_id,
+                        shard_index=shard.index,
+                        kind=StockMovementKind.RESERVE,
+                        quantity=-amount,
+                        reference=reference,
+                    )
+                )
+                remaining -= amount
+                if not remaining:
+                    break
+
+    def flush(self):
+        _apply_deltas({pk: delta for pk, delta in self.deltas.items() if delta})
+        StockMovement.objects.bulk_create(self.movements)
+        _stock_changed({movement.product_id for movement in self.movements})
+        self.deltas.clear()
+        self.movements = []
+
+
+def lock_all_shards(product_ids):
+    product_ids = list(product_ids)
+    with_shards = set(
+        StockShard.objects.filter(product_id__in=product_ids).values_list("product_id", flat=True)
+    )
+    missing = [product_id for product_id in product_ids if product_id not in with_shards]
+    if missing:
+        ensure_shards(missing)
+
+    shards = defaultdict(list)
+    with STOCK_LOCK_WAIT_SECONDS.time(operation="reserve_many"):
+        for shard in (
+            StockShard.objects.select_for_update()
+            .filter(product_id__in=product_ids)
+            .order_by("product_id", "index")
+        ):
+            shards[shard.product_id].append(shard)
+    return shards
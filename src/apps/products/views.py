@@ -4,6 +4,14 @@ from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import response, status, viewsets
 from rest_framework.decorators import action
 
+from apps.core.mixins import (
+    FIELDS_PARAMETER,
+    ConditionalRequestMixin,
+    ResponseCacheMixin,
+    SparseFieldsMixin,
+)
+from apps.products import cache as product_cache
+from apps.products import stock
 from apps.products.filters import ProductFilter
 from apps.products.models import Product
 from apps.products.serializers import (
@@ -14,8 +22,12 @@ from apps.products.serializers import (
 
 
 @extend_schema_view(
-    list=extend_schema(summary="Listagem de produtos", tags=["Produtos"]),
-    retrieve=extend_schema(summary="Detalhar produto", tags=["Produtos"]),
+    list=extend_schema(
+        summary="Listagem de produtos", parameters=[FIELDS_PARAMETER], tags=["Produtos"]
+    ),
+    retrieve=extend_schema(
+        summary="Detalhar produto", parameters=[FIELDS_PARAMETER], tags=["Produtos"]
+    ),
     partial_update=extend_schema(
         summary="Atualização parcial",
         request=ProductUpdateSerializer,
@@ -29,17 +41,39 @@ from apps.products.serializers import (
         tags=["Produtos"],
     ),
 )
-class ProductViewSet(viewsets.ModelViewSet):
-    queryset = Product.objects.all()
+class ProductViewSet(
+    ConditionalRequestMixin, ResponseCacheMixin, SparseFieldsMixin, viewsets.ModelViewSet
+):
+    queryset = Product.objects.with_available_stock()
     serializer_class = ProductModelSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = ProductFilter
+    response_cache_actions = ("list",)
+    # Reservas mexem só nos shards: o saldo exibido muda sem tocar em products.updated_at.
+    etag_timestamp_fields = ("updated_at", "stock_shards__updated_at")
+
+    def get_queryset(self):
+        # O detalhe é sempre montado inteiro para o cache e recortado na resposta.
+        if self.action == "retrieve":
+            return super().get_queryset()
+        return self.project_queryset(super().get_queryset())
 
     def get_object(self) -> Product:
         obj = get_object_or_404(self.get_queryset(), id=self.kwargs["id"])
         self.check_object_permissions(self.request, obj)
         return obj
 
+    def retrieve(self, request, *args, **kwargs):
+        data = product_cache.get_detail(self.kwargs["id"])
+        if data is None:
+            data = ProductModelSerializer(self.get_object()).data
+            product_cache.store_detail(self.kwargs["id"], data)
+
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            data = {name: value for name, value in data.items() if name in fields}
+        return response.Response(data)
+
     @extend_schema(
         request=ProductStockUpdateSerializer,
         responses=ProductModelSerializer,
@@ -53,6 +87,6 @@ class ProductViewSet(viewsets.ModelViewSet):
         serializer = ProductStockUpdateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        product.update_stock(serializer.validated_data["stock_quantity"])
+        stock.set_stock(product, serializer.validated_data["stock_quantity"], reference="api")
 
         return response.Response(ProductModelSerializer(product).data, status=status.HTTP_200_OK)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.reports.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula do zero as tabelas de rollup de relatórios a partir de orders e order_items. "
+        "Use para o backfill inicial ou para corrigir divergências; prefira horários de pouco "
+        "movimento, pois as tabelas são reescritas em uma única transação."
+    )
+
+    def handle(self, *args, **options):
+        for model, rows in rebuild().items():
+            self.stdout.write(f"{model._meta.db_table}: {rows} linhas")
@@ -0,0 +1,131 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("customers", "0003_customer_search_index"),
+        ("products", "0003_product_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyStatusRollup",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("shard", models.PositiveSmallIntegerField(verbose_name="Shard")),
+                (
+                    "order_count",
+                    models.IntegerField(default=0, verbose_name="Quantidade de pedidos"),
+                ),
+                (
+                    "total_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=17, verbose_name="Valor total"
+                    ),
+                ),
+                ("day", models.DateField(verbose_name="Dia de criação do pedido")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("CONFIRMED", "Confirmed"),
+                            ("SEPARATED", "Separated"),
+                            ("SHIPPED", "Shipped"),
+                            ("DELIVERED", "Delivered"),
+                            ("CANCELED", "Canceled"),
+                        ],
+                        max_length=20,
+                        verbose_name="Status",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "report_daily_status",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "status", "shard"), name="uniq_report_daily_status"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="CustomerMonthlyRollup",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("shard", models.PositiveSmallIntegerField(verbose_name="Shard")),
+                (
+                    "order_count",
+                    models.IntegerField(default=0, verbose_name="Quantidade de pedidos"),
+                ),
+                (
+                    "total_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=17, verbose_name="Valor total"
+                    ),
+                ),
+                ("month", models.DateField(verbose_name="Primeiro dia do mês")),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_rollups",
+                        to="customers.customer",
+                        verbose_name="Cliente",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "report_customer_monthly",
+                "indexes": [models.Index(fields=["month"], name="report_cust_month_3c50e8_idx")],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("customer", "month", "shard"), name="uniq_report_customer_monthly"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ProductDailyRollup",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("shard", models.PositiveSmallIntegerField(verbose_name="Shard")),
+                (
+                    "order_count",
+                    models.IntegerField(default=0, verbose_name="Quantidade de pedidos"),
+                ),
+                (
+                    "total_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=17, verbose_name="Valor total"
+                    ),
+                ),
+                ("day", models.DateField(verbose_name="Dia de criação do pedido")),
+                ("quantity", models.IntegerField(default=0, verbose_name="Quantidade vendida")),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_rollups",
+                        to="products.product",
+                        verbose_name="Produto",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "report_product_daily",
+                "indexes": [models.Index(fields=["day"], name="report_prod_day_7666ad_idx")],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("product", "day", "shard"), name="uniq_report_product_daily"
+                    )
+                ],
+            },
+        ),
+    ]
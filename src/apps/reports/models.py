@@ -0,0 +1,73 @@
+from django.db import models
+
+from apps.orders.models import OrderStatus
+
+
+class RollupModel(models.Model):
+    # Cada bucket é dividido em shards sorteados na escrita, como o estoque: pedidos do mesmo dia
+    # não disputam a mesma linha. A leitura soma os shards.
+    id = models.BigAutoField(primary_key=True)
+    shard = models.PositiveSmallIntegerField(verbose_name="Shard")
+    order_count = models.IntegerField(default=0, verbose_name="Quantidade de pedidos")
+    total_amount = models.DecimalField(
+        max_digits=17, decimal_places=2, default=0, verbose_name="Valor total"
+    )
+
+    class Meta:
+        abstract = True
+
+
+class DailyStatusRollup(RollupModel):
+    day = models.DateField(verbose_name="Dia de criação do pedido")
+    status = models.CharField(max_length=20, choices=OrderStatus.choices, verbose_name="Status")
+
+    class Meta:
+        db_table = "report_daily_status"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "status", "shard"], name="uniq_report_daily_status"
+            ),
+        ]
+
+
+class CustomerMonthlyRollup(RollupModel):
+    customer = models.ForeignKey(
+        "customers.Customer",
+        on_delete=models.CASCADE,
+        related_name="monthly_rollups",
+        verbose_name="Cliente",
+    )
+    month = models.DateField(verbose_name="Primeiro dia do mês")
+
+    class Meta:
+        db_table = "report_customer_monthly"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["customer", "month", "shard"], name="uniq_report_customer_monthly"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["month"]),
+        ]
+
+
+class ProductDailyRollup(RollupModel):
+    product = models.ForeignKey(
+        "products.Product",
+        on_delete=models.CASCADE,
+        related_name="daily_rollups",
+        verbose_name="Produto",
+    )
+    day = models.DateField(verbose_name="Dia de criação do pedido")
+    quantity = models.IntegerField(default=0, verbose_name="Quantidade vendida")
+
+    class Meta:
+        db_table = "report_product_daily"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "day", "shard"], name="uniq_report_product_daily"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["day"]),
+        ]
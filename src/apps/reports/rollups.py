@@ -0,0 +1,203 @@
+import random
+import uuid
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from apps.orders.models import ArchivedOrder, Order, OrderItem, OrderStatus
+from apps.reports.models import CustomerMonthlyRollup, DailyStatusRollup, ProductDailyRollup
+
+ROLLUP_MODELS = (DailyStatusRollup, CustomerMonthlyRollup, ProductDailyRollup)
+REBUILD_BATCH_SIZE = 1000
+ARCHIVE_SHARD = 1
+
+
+def order_day(order):
+    return timezone.localdate(order.created_at)
+
+
+def record_created(orders, items):
+    changes = _changes()
+    items_by_order = defaultdict(list)
+    for item in items:
+        items_by_order[item.order_id].append((item.product_id, item.quantity, item.subtotal))
+
+    for order in orders:
+        _add_status(changes, order, order.status, 1)
+        if order.status != OrderStatus.CANCELED:
+            _add_booked(changes, order, items_by_order[order.pk], 1)
+    _apply(changes)
+
+
+def record_status_change(order, previous_status, new_status):
+    record_status_changes([(order, previous_status, new_status)])
+
+
+def record_status_changes(transitions):
+    changes = _changes()
+    for order, previous_status, new_status in transitions:
+        _add_status(changes, order, previous_status, -1)
+        _add_status(changes, order, new_status, 1)
+
+    # Pedido cancelado deixa de contar como venda para cliente e produto.
+    signs = {
+        order.pk: -1 if new_status == OrderStatus.CANCELED else 1
+        for order, previous_status, new_status in transitions
+        if OrderStatus.CANCELED in (previous_status, new_status) and previous_status != new_status
+    }
+    if signs:
+        items = defaultdict(list)
+        for order_id, *item in OrderItem.objects.filter(order_id__in=signs).values_list(
+            "order_id", "product_id", "quantity", "subtotal"
+        ):
+            items[order_id].append(tuple(item))
+        for order, _, _ in transitions:
+            if order.pk in signs:
+                _add_booked(changes, order, items[order.pk], signs[order.pk])
+    _apply(changes)
+
+
+def _changes():
+    return defaultdict(lambda: defaultdict(int))
+
+
+def _add_status(changes, order, status, sign):
+    key = (DailyStatusRollup, (("day", order_day(order)), ("status", status)))
+    changes[key]["order_count"] += sign
+    changes[key]["total_amount"] += sign * order.total_amount
+
+
+def _add_booked(changes, order, items, sign):
+    day = order_day(order)
+    key = (
+        CustomerMonthlyRollup,
+        (("customer_id", order.customer_id), ("month", day.replace(day=1))),
+    )
+    changes[key]["order_count"] += sign
+    changes[key]["total_amount"] += sign * order.total_amount
+
+    per_product = defaultdict(lambda: [0, Decimal("0")])
+    for product_id, quantity, subtotal in items:
+        per_product[product_id][0] += quantity
+        per_product[product_id][1] += subtotal
+    for product_id, (quantity, subtotal) in per_product.items():
+        key = (ProductDailyRollup, (("product_id", product_id), ("day", day)))
+        changes[key]["order_count"] += sign
+        changes[key]["quantity"] += sign * quantity
+        changes[key]["total_amount"] += sign * subtotal
+
+
+def _apply(changes):
+    per_model = defaultdict(dict)
+    for (model, lookups), deltas in changes.items():
+        if any(deltas.values()):
+            per_model[model][lookups] = deltas
+
+    # Ordem fixa de escrita entre transações concorrentes, para não criar ciclos de espera.
+    for model in ROLLUP_MODELS:
+        if per_model[model]:
+            _increment(model, dict(sorted(per_model[model].items(), key=str)))
+
+
+def _increment(model, rows):
+    # Um único upsert por tabela, quente ou fria: pedidos com muitos produtos não viram uma
+    # consulta por produto, e não há janela entre UPDATE e INSERT para outra transação.
+    shard = random.randrange(settings.REPORT_ROLLUP_SHARDS)
+    keys = ["shard", *(name for name, _ in next(iter(rows)))]
+    metrics = sorted({field for deltas in rows.values() for field in deltas})
+    fields = [model._meta.get_field(name) for name in (*keys, *metrics)]
+
+    params = []
+    for lookups, deltas in rows.items():
+        values = [
+            shard,
+            *(value for _, value in lookups),
+            *(deltas.get(name, 0) for name in metrics),
+        ]
+        params.extend(
+            field.get_db_prep_save(value, connection) for field, value in zip(fields, values)
+        )
+
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = [quote(field.column) for field in fields]
+    key_columns, metric_columns = columns[: len(keys)], columns[len(keys) :]
+    placeholders = ", ".join([f"({', '.join(['%s'] * len(fields))})"] * len(rows))
+    if connection.vendor == "mysql":
+        increments = [f"{column} = {column} + VALUES({column})" for column in metric_columns]
+        conflict = f"ON DUPLICATE KEY UPDATE {', '.join(increments)}"
+    else:
+        increments = [
+            f"{column} = {table}.{column} + excluded.{column}" for column in metric_columns
+        ]
+        conflict = f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {', '.join(increments)}"
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES {placeholders} {conflict}", params
+        )
+
+
+def rebuild():
+    orders = Order.all_objects.order_by()
+    booked = orders.exclude(status=OrderStatus.CANCELED)
+    sources = {
+        DailyStatusRollup: orders.annotate(day=TruncDate("created_at")).values("day", "status"),
+        CustomerMonthlyRollup: booked.annotate(
+            month=TruncMonth("created_at", output_field=DateField())
+        ).values("customer_id", "month"),
+        ProductDailyRollup: OrderItem.objects.order_by()
+        .exclude(order__status=OrderStatus.CANCELED)
+        .annotate(day=TruncDate("order__created_at"))
+        .values("product_id", "day")
+        .annotate(quantity=Sum("quantity")),
+    }
+    totals = {
+        DailyStatusRollup: {"order_count": Count("id"), "total_amount": Sum("total_amount")},
+        CustomerMonthlyRollup: {"order_count": Count("id"), "total_amount": Sum("total_amount")},
+        ProductDailyRollup: {
+            "order_count": Count("order_id", distinct=True),
+            "total_amount": Sum("subtotal"),
+        },
+    }
+
+    rebuilt = {}
+    with transaction.atomic():
+        for model in ROLLUP_MODELS:
+            model.objects.all().delete()
+            rows = sources[model].annotate(**totals[model]).iterator(chunk_size=REBUILD_BATCH_SIZE)
+            created = model.objects.bulk_create(
+                (model(shard=0, **row) for row in rows), batch_size=REBUILD_BATCH_SIZE
+            )
+            rebuilt[model] = len(created)
+
+        # Pedidos arquivados entram como um shard à parte, já que a leitura soma os shards.
+        for model, rows in _archived_rows().items():
+            model.objects.bulk_create(rows, batch_size=REBUILD_BATCH_SIZE)
+            rebuilt[model] += len(rows)
+    return rebuilt
+
+
+def _archived_rows():
+    changes = _changes()
+    archived = ArchivedOrder.objects.order_by().only(
+        "created_at", "status", "total_amount", "customer_id", "payload"
+    )
+    for order in archived.iterator(chunk_size=REBUILD_BATCH_SIZE):
+        _add_status(changes, order, order.status, 1)
+        if order.status != OrderStatus.CANCELED:
+            items = [
+                (uuid.UUID(item["product"]), item["quantity"], Decimal(item["subtotal"]))
+                for item in order.data.get("items", [])
+            ]
+            _add_booked(changes, order, items, 1)
+
+    rows = defaultdict(list)
+    for (model, lookups), deltas in changes.items():
+        rows[model].append(model(shard=ARCHIVE_SHARD, **dict(lookups), **deltas))
+    return rows
@@ -0,0 +1,45 @@
+from django.conf import settings
+from rest_framework import serializers
+
+from apps.orders.models import OrderStatus
+
+GROUP_BY_CHOICES = ("day_status", "customer_month", "product_day")
+
+
+class ReportQuerySerializer(serializers.Serializer):
+    group_by = serializers.ChoiceField(choices=GROUP_BY_CHOICES)
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    status = serializers.ChoiceField(choices=OrderStatus.choices, required=False)
+    customer = serializers.UUIDField(required=False)
+    product = serializers.UUIDField(required=False)
+
+    def validate(self, attrs):
+        if attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError("date_from deve ser anterior ou igual a date_to.")
+
+        span = (attrs["date_to"] - attrs["date_from"]).days + 1
+        if span > settings.REPORT_MAX_RANGE_DAYS:
+            raise serializers.ValidationError(
+                f"O período máximo é de {settings.REPORT_MAX_RANGE_DAYS} dias."
+            )
+        return attrs
+
+
+class ReportRowSerializer(serializers.Serializer):
+    # Cada group_by preenche só as próprias chaves; as demais ficam fora da linha.
+    day = serializers.DateField(required=False)
+    month = serializers.DateField(required=False)
+    status = serializers.ChoiceField(choices=OrderStatus.choices, required=False)
+    customer = serializers.UUIDField(source="customer_id", required=False)
+    product = serializers.UUIDField(source="product_id", required=False)
+    order_count = serializers.IntegerField()
+    quantity = serializers.IntegerField(required=False)
+    total_amount = serializers.DecimalField(max_digits=17, decimal_places=2)
+
+
+class ReportSerializer(serializers.Serializer):
+    group_by = serializers.ChoiceField(choices=GROUP_BY_CHOICES)
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    results = ReportRowSerializer(many=True)
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from apps.reports.views import ReportView
+
+urlpatterns = [
+    path("", ReportView.as_view()),
+]
@@ -0,0 +1,78 @@
+from django.db.models import Sum
+from drf_spectacular.utils import extend_schema
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.reports.models import CustomerMonthlyRollup, DailyStatusRollup, ProductDailyRollup
+from apps.reports.serializers import ReportQuerySerializer, ReportSerializer
+
+# group_by -> (rollup, colunas do agrupamento, coluna do período, filtros opcionais, métricas)
+REPORTS = {
+    "day_status": (
+        DailyStatusRollup,
+        ("day", "status"),
+        "day",
+        {"status": "status"},
+        ("order_count", "total_amount"),
+    ),
+    "customer_month": (
+        CustomerMonthlyRollup,
+        ("customer_id", "month"),
+        "month",
+        {"customer": "customer_id"},
+        ("order_count", "total_amount"),
+    ),
+    "product_day": (
+        ProductDailyRollup,
+        ("product_id", "day"),
+        "day",
+        {"product": "product_id"},
+        ("order_count", "quantity", "total_amount"),
+    ),
+}
+
+
+class ReportView(APIView):
+    @extend_schema(
+        summary="Relatório de pedidos agregado",
+        description=(
+            "Lê apenas as tabelas de rollup: o custo depende do período pedido, não do volume "
+            "de pedidos. day_status conta todos os pedidos pelo status atual; customer_month e "
+            "product_day desconsideram pedidos cancelados."
+        ),
+        parameters=[ReportQuerySerializer],
+        responses=ReportSerializer,
+        tags=["Relatórios"],
+    )
+    def get(self, request, *args, **kwargs):
+        query = ReportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        model, keys, period, filters, metrics = REPORTS[params["group_by"]]
+        date_from = params["date_from"]
+        if period == "month":
+            date_from = date_from.replace(day=1)
+
+        rows = model.objects.filter(
+            **{f"{period}__gte": date_from, f"{period}__lte": params["date_to"]},
+            **{column: params[name] for name, column in filters.items() if name in params},
+        )
+        # Soma os shards de cada bucket; buckets que zeraram (cancelamentos) não aparecem.
+        rows = (
+            rows.values(*keys)
+            .annotate(**{metric: Sum(metric) for metric in metrics})
+            .exclude(order_count=0)
+            .order_by(*keys)
+        )
+
+        return Response(
+            ReportSerializer(
+                {
+                    "group_by": params["group_by"],
+                    "date_from": params["date_from"],
+                    "date_to": params["date_to"],
+                    "results": rows,
+                }
+            ).data
+        )
@@ -24,7 +24,13 @@ INSTALLED_APPS = [
     "drf_spectacular",
 ]
 
-INSTALLED_APPS = INSTALLED_APPS + ["apps.core", "apps.customers", "apps.products", "apps.orders"]
+INSTALLED_APPS = INSTALLED_APPS + [
+    "apps.core",
+    "apps.customers",
+    "apps.products",
+    "apps.orders",
+    "apps.reports",
+]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
@@ -54,6 +60,8 @@ TEMPLATES = [
     },
 ]
 
+JSON_FAST_PATH = config("JSON_FAST_PATH", default=True, cast=bool)
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [],
     "DEFAULT_PERMISSION_CLASSES": [
@@ -68,6 +76,15 @@ REST_FRAMEWORK = {
             default="100/hour",
         ),
     },
+    "DEFAULT_RENDERER_CLASSES": [
+        "apps.core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "apps.core.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PAGINATION_CLASS": "apps.core.paginator.PersonalPagination",
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
@@ -83,7 +100,52 @@ CACHES = {
     }
 }
 
+PAGINATION_COUNT_CACHE_TTL = config("PAGINATION_COUNT_CACHE_TTL", default=30, cast=int)
+PAGINATION_COUNT_LIMIT = config("PAGINATION_COUNT_LIMIT", default=10_000, cast=int)
+
+RESPONSE_CACHE_TTL = config("RESPONSE_CACHE_TTL", default=30, cast=int)
+RESPONSE_CACHE_STALE_TTL = config("RESPONSE_CACHE_STALE_TTL", default=60, cast=int)
+RESPONSE_CACHE_LOCK_TIMEOUT = config("RESPONSE_CACHE_LOCK_TIMEOUT", default=5, cast=int)
+LIST_VALIDATORS_TTL = config("LIST_VALIDATORS_TTL", default=86_400, cast=int)
+
+METRICS_MULTIPROC_DIR = config("METRICS_MULTIPROC_DIR", default="")
+METRICS_FLUSH_INTERVAL = config("METRICS_FLUSH_INTERVAL", default=1.0, cast=float)
+
+SQL_PROFILE_SAMPLE_RATE = config("SQL_PROFILE_SAMPLE_RATE", default=0.0, cast=float)
+SQL_PROFILE_SLOW_QUERY_MS = config("SQL_PROFILE_SLOW_QUERY_MS", default=100, cast=float)
+SQL_PROFILE_DUPLICATE_THRESHOLD = config("SQL_PROFILE_DUPLICATE_THRESHOLD", default=5, cast=int)
+SQL_PROFILE_MAX_STATEMENTS = config("SQL_PROFILE_MAX_STATEMENTS", default=10, cast=int)
+SQL_PROFILE_MAX_SQL_LENGTH = config("SQL_PROFILE_MAX_SQL_LENGTH", default=500, cast=int)
+
+PRODUCT_CACHE_TTL = config("PRODUCT_CACHE_TTL", default=300, cast=int)
+
+CUSTOMER_CACHE_TTL = config("CUSTOMER_CACHE_TTL", default=300, cast=int)
+CUSTOMER_LOCAL_CACHE_TTL = config("CUSTOMER_LOCAL_CACHE_TTL", default=30, cast=int)
+CUSTOMER_LOCAL_CACHE_SIZE = config("CUSTOMER_LOCAL_CACHE_SIZE", default=10_000, cast=int)
+
+STOCK_SHARD_COUNT = config("STOCK_SHARD_COUNT", default=8, cast=int)
+
+ORDER_IDEMPOTENCY_TTL = config("ORDER_IDEMPOTENCY_TTL", default=60 * 60 * 24, cast=int)
+ORDER_IDEMPOTENCY_LOCK_TIMEOUT = config("ORDER_IDEMPOTENCY_LOCK_TIMEOUT", default=10, cast=int)
+
+ORDER_IMPORT_CHUNK_SIZE = config("ORDER_IMPORT_CHUNK_SIZE", default=500, cast=int)
+ORDER_EXPORT_CHUNK_SIZE = config("ORDER_EXPORT_CHUNK_SIZE", default=1000, cast=int)
+ORDER_ARCHIVE_AFTER_DAYS = config("ORDER_ARCHIVE_AFTER_DAYS", default=180, cast=int)
+ORDER_ARCHIVE_BATCH_SIZE = config("ORDER_ARCHIVE_BATCH_SIZE", default=500, cast=int)
+ORDER_BULK_STATUS_MAX_ORDERS = config("ORDER_BULK_STATUS_MAX_ORDERS", default=500, cast=int)
+ORDER_EVENT_STREAM = config("ORDER_EVENT_STREAM", default="orders:events")
+ORDER_EVENT_STREAM_MAXLEN = config("ORDER_EVENT_STREAM_MAXLEN", default=100_000, cast=int)
+ORDER_EVENT_RELAY_BATCH_SIZE = config("ORDER_EVENT_RELAY_BATCH_SIZE", default=500, cast=int)
+ORDER_EVENT_FEED_LIMIT = config("ORDER_EVENT_FEED_LIMIT", default=500, cast=int)
+ORDER_EVENT_FEED_LAG = config("ORDER_EVENT_FEED_LAG", default=5, cast=int)
+
+REPORT_ROLLUP_SHARDS = config("REPORT_ROLLUP_SHARDS", default=8, cast=int)
+REPORT_MAX_RANGE_DAYS = config("REPORT_MAX_RANGE_DAYS", default=366, cast=int)
+
 LOG_LEVEL = config("LOG_LEVEL", default="INFO")
+LOG_QUEUE_SIZE = config("LOG_QUEUE_SIZE", default=10_000, cast=int)
+LOG_BATCH_SIZE = config("LOG_BATCH_SIZE", default=100, cast=int)
+LOG_QUEUE_OVERFLOW = config("LOG_QUEUE_OVERFLOW", default="drop_new")
 
 LOGGING = {
     "version": 1,
@@ -100,9 +162,12 @@ LOGGING = {
     },
     "handlers": {
         "console": {
-            "class": "logging.StreamHandler",
+            "class": "apps.core.observability.AsyncBatchHandler",
             "formatter": "json",
             "filters": ["correlation_id"],
+            "capacity": LOG_QUEUE_SIZE,
+            "batch_size": LOG_BATCH_SIZE,
+            "overflow": LOG_QUEUE_OVERFLOW,
         },
     },
     "loggers": {
@@ -125,6 +190,8 @@ LOGGING = {
 
 WSGI_APPLICATION = "config.wsgi.application"
 
+DATABASE_LOCK_WAIT_TIMEOUT = config("DATABASE_LOCK_WAIT_TIMEOUT", default=5, cast=int)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.mysql",
@@ -134,7 +201,10 @@ DATABASES = {
         "HOST": config("DATABASE_HOST"),
         "PORT": config("DATABASE_PORT", "3306"),
         "OPTIONS": {
-            "init_command": "SET sql_mode='STRICT_TRANS_TABLES'",
+            "init_command": (
+                "SET sql_mode='STRICT_TRANS_TABLES', "
+                f"innodb_lock_wait_timeout={DATABASE_LOCK_WAIT_TIMEOUT}"
+            ),
             "charset": "utf8mb4",
         },
         "TEST": {
@@ -143,6 +213,10 @@ DATABASES = {
     },
 }
 
+DB_LOCK_RETRY_ATTEMPTS = config("DB_LOCK_RETRY_ATTEMPTS", default=4, cast=int)
+DB_LOCK_RETRY_BASE_DELAY = config("DB_LOCK_RETRY_BASE_DELAY", default=0.05, cast=float)
+DB_LOCK_RETRY_MAX_DELAY = config("DB_LOCK_RETRY_MAX_DELAY", default=1.0, cast=float)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -4,7 +4,7 @@ from django.contrib import admin
 from django.urls import include, path
 from drf_spectacular.views import SpectacularAPIView
 
-from apps.core.views import HealthCheckView, SpectacularRapiDocView
+from apps.core.views import HealthCheckView, MetricsView, SpectacularRapiDocView
 
 url_v1 = "api/v1"
 
@@ -12,10 +12,12 @@ urlpatterns = [
     path("", SpectacularRapiDocView.as_view(url_name="schema"), name="redoc"),
     path("docs/schema/", SpectacularAPIView.as_view(), name="schema"),
     path("health/", HealthCheckView.as_view(), name="health"),
+    path("metrics", MetricsView.as_view(), name="metrics"),
     path("admin/", admin.site.urls),
     path(f"{url_v1}/customers/", include("apps.customers.urls")),
     path(f"{url_v1}/products/", include("apps.products.urls")),
     path(f"{url_v1}/orders/", include("apps.orders.urls")),
+    path(f"{url_v1}/reports/", include("apps.reports.urls")),
 ]
 
 if settings.DEBUG:
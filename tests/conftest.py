@@ -1,5 +1,25 @@
+import re
+from collections import Counter
+from contextlib import contextmanager
+
 import pytest
 from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db import connection
+from django.dispatch import receiver
+from django.test.utils import CaptureQueriesContext
+from rest_framework import throttling
+from rest_framework.settings import api_settings
+
+from apps.customers import cache as customer_cache
+
+
+@receiver(setting_changed)
+def reload_throttle_rates(*, setting, **kwargs):
+    # SimpleRateThrottle guarda as taxas na importação; sem isso o override de um teste vaza
+    # para os seguintes (ou é ignorado, dependendo da ordem).
+    if setting == "REST_FRAMEWORK":
+        throttling.SimpleRateThrottle.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
 
 
 @pytest.fixture(autouse=True)
@@ -8,3 +28,24 @@ def clear_cache():
         cache.clear()
     except Exception:
         pass
+    customer_cache.local_cache.clear()
+
+
+def _fingerprint(sql):
+    return re.sub(r"'[^']*'|\b\d+\b", "?", sql)
+
+
+@pytest.fixture
+def query_budget():
+    @contextmanager
+    def check(budget):
+        with CaptureQueriesContext(connection) as context:
+            yield context
+
+        executed = len(context.captured_queries)
+        if executed > budget:
+            repeated = Counter(_fingerprint(query["sql"]) for query in context.captured_queries)
+            report = "\n".join(f"{count}x {sql}" for sql, count in repeated.most_common())
+            pytest.fail(f"{executed} consultas excedem o orçamento de {budget}:\n{report}")
+
+    return check
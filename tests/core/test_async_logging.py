@@ -0,0 +1,82 @@
+import json
+import logging
+import threading
+from io import StringIO
+
+from apps.core.observability import LOG_RECORDS, AsyncBatchHandler, JsonFormatter
+
+
+class BlockingStream(StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, value):
+        self.writing.set()
+        self.release.wait(5)
+        return super().write(value)
+
+
+def make_logger(handler):
+    handler.setFormatter(JsonFormatter())
+    logger = logging.getLogger(f"test.async.{id(handler)}")
+    logger.propagate = False
+    logger.addHandler(handler)
+    return logger
+
+
+def messages(stream):
+    return [json.loads(line)["message"] for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_written_in_batches_and_flushed_on_close():
+    stream = StringIO()
+    handler = AsyncBatchHandler(stream=stream, batch_size=10)
+    logger = make_logger(handler)
+
+    for index in range(25):
+        logger.info("pedido %s", index)
+    try:
+        raise ValueError("falhou")
+    except ValueError:
+        logger.exception("erro")
+    handler.close()
+
+    assert messages(stream) == [f"pedido {index}" for index in range(25)] + ["erro"]
+    last = json.loads(stream.getvalue().splitlines()[-1])
+    assert "ValueError: falhou" in last["exception"]
+
+
+def test_full_buffer_drops_new_records_and_counts_them():
+    stream = BlockingStream()
+    handler = AsyncBatchHandler(stream=stream, capacity=2, overflow="drop_new")
+    logger = make_logger(handler)
+    dropped = LOG_RECORDS.value(result="dropped")
+
+    logger.info("1")
+    assert stream.writing.wait(5)
+    for message in ("2", "3", "4"):
+        logger.info(message)
+    stream.release.set()
+    handler.close()
+
+    assert messages(stream) == ["1", "2", "3"]
+    assert handler.dropped == 1
+    assert LOG_RECORDS.value(result="dropped") == dropped + 1
+
+
+def test_full_buffer_can_drop_oldest_records():
+    stream = BlockingStream()
+    handler = AsyncBatchHandler(stream=stream, capacity=2, overflow="drop_old")
+    logger = make_logger(handler)
+
+    logger.info("1")
+    assert stream.writing.wait(5)
+    for message in ("2", "3", "4"):
+        logger.info(message)
+    stream.release.set()
+    handler.close()
+
+    assert messages(stream) == ["1", "3", "4"]
+    assert handler.dropped == 1
@@ -0,0 +1,93 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.customers.models import Customer
+from apps.orders.models import Order
+from apps.products import stock
+from apps.products.models import Product
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def customer():
+    return Customer.objects.create(
+        name="Cliente Condicional",
+        document="52998224725",
+        email="condicional@teste.com",
+        phone="11999999999",
+        address="Rua Condicional",
+    )
+
+
+@pytest.mark.django_db
+def test_detail_answers_if_none_match_until_the_row_changes(api_client, customer):
+    url = f"/api/v1/customers/{customer.id}/"
+
+    first = api_client.get(url)
+    cached = api_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    api_client.patch(url, {"name": "Cliente Renomeado"})
+    changed = api_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert first["Last-Modified"]
+    assert cached.status_code == 304
+    assert cached["ETag"] == first["ETag"]
+    assert changed.status_code == 200
+    assert changed["ETag"] != first["ETag"]
+
+
+@pytest.mark.django_db
+def test_list_answers_if_modified_since(api_client, customer):
+    first = api_client.get("/api/v1/customers/")
+    cached = api_client.get("/api/v1/customers/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+
+    assert cached.status_code == 304
+
+
+@pytest.mark.django_db
+def test_list_validators_do_not_scan_the_table(api_client, customer):
+    Order.objects.create(customer=customer, idempotency_key="scan", total_amount=1)
+    first = api_client.get("/api/v1/orders/")
+
+    with CaptureQueriesContext(connection) as plain:
+        api_client.get("/api/v1/orders/")
+    with CaptureQueriesContext(connection) as conditional:
+        cached = api_client.get("/api/v1/orders/", HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert first["ETag"] and first["Last-Modified"]
+    assert not any("MAX(" in query["sql"].upper() for query in plain.captured_queries)
+    assert cached.status_code == 304
+    assert conditional.captured_queries == []
+
+
+@pytest.mark.django_db
+def test_product_list_etag_follows_stock_reservations(api_client):
+    product = Product.objects.create(sku="ETAG-1", name="ETag", price=1, stock_quantity=10)
+    first = api_client.get("/api/v1/products/")
+
+    stock.reserve({product.id: 2}, reference="etag", products={product.id: product})
+    changed = api_client.get("/api/v1/products/", HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert changed.status_code == 200
+    assert changed.data["results"][0]["stock_quantity"] == 8
+
+
+@pytest.mark.django_db
+def test_writes_honor_if_match(api_client, customer):
+    order = Order.objects.create(customer=customer, idempotency_key="etag", total_amount=1)
+    etag = api_client.get(f"/api/v1/orders/{order.id}/")["ETag"]
+
+    confirmed = api_client.patch(
+        f"/api/v1/orders/{order.id}/status/", {"new_status": "CONFIRMED"}, HTTP_IF_MATCH=etag
+    )
+    stale = api_client.delete(f"/api/v1/orders/{order.id}/", HTTP_IF_MATCH=etag)
+
+    assert confirmed.status_code == 200
+    assert stale.status_code == 412
+    order.refresh_from_db()
+    assert order.status == "CONFIRMED"
@@ -0,0 +1,84 @@
+import io
+import json
+import logging
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from apps.core import json_codec
+from apps.core.observability import JsonFormatter
+from apps.core.parsers import FastJSONParser
+from apps.core.renderers import FastJSONRenderer
+
+PAYLOAD = {
+    "id": uuid.UUID("6f1c1f9e-59a5-4c55-9d0b-0a1e3a4f7f10"),
+    "total_amount": Decimal("10.50"),
+    "created_at": datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+    "local": datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=-3))),
+    "day": date(2026, 1, 2),
+    "name": "Pedido ação\u2028fim",
+    "label": gettext_lazy("Pending"),
+    "items": [{"quantity": 2, "price": 1.5, "active": True, "note": None}],
+    1: "chave numérica",
+}
+
+
+@pytest.mark.parametrize("fast_path", [True, False])
+def test_fast_renderer_matches_drf_output(settings, fast_path):
+    settings.JSON_FAST_PATH = fast_path
+
+    assert FastJSONRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+
+
+def test_indented_rendering_falls_back_to_drf():
+    rendered = FastJSONRenderer().render(PAYLOAD, "application/json; indent=2")
+
+    assert rendered == JSONRenderer().render(PAYLOAD, "application/json; indent=2")
+    assert b"\n  " in rendered
+
+
+@pytest.mark.django_db
+def test_api_responses_are_rendered_by_fast_renderer():
+    response = APIClient().get("/api/v1/orders/")
+
+    assert isinstance(response.accepted_renderer, FastJSONRenderer)
+    assert response.content == JSONRenderer().render(response.data)
+
+
+def test_fast_parser_matches_drf_parser():
+    body = JSONRenderer().render({**PAYLOAD, "big": 2**70})
+
+    assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+
+def test_fast_parser_rejects_invalid_json():
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(io.BytesIO(b'{"a": NaN}'))
+
+
+def test_log_lines_encode_decimal_and_uuid_as_ascii():
+    record = logging.LogRecord("api.request", logging.INFO, __file__, 1, "ação", None, None)
+    record.sql_profile = {"id": PAYLOAD["id"], "total": PAYLOAD["total_amount"]}
+
+    line = JsonFormatter().format(record)
+
+    assert line.isascii()
+    payload = json.loads(line)
+    assert payload["message"] == "ação"
+    assert payload["sql_profile"] == {"id": str(PAYLOAD["id"]), "total": 10.5}
+
+
+def test_log_lines_are_compact_with_or_without_fast_path(settings):
+    settings.JSON_FAST_PATH = True
+    fast = json_codec.dumps_ascii({"id": PAYLOAD["id"], "items": [1, 2]})
+    settings.JSON_FAST_PATH = False
+    fallback = json_codec.dumps_ascii({"id": PAYLOAD["id"], "items": [1, 2]})
+
+    assert fast == fallback == '{"id":"%s","items":[1,2]}' % PAYLOAD["id"]
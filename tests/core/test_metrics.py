@@ -0,0 +1,99 @@
+import json
+import uuid
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from apps.core import metrics
+from apps.core.middleware import REQUEST_DB_QUERIES, REQUEST_DURATION, REQUESTS
+from apps.core.throttles import THROTTLE_REJECTIONS
+
+ORDER_ROUTE = "/api/v1/orders/<uuid:id>/"
+
+
+def histogram_count(histogram, **labels):
+    return histogram.samples().get(tuple(labels.values()), {"count": 0})["count"]
+
+
+@pytest.mark.django_db
+def test_requests_are_measured_by_route_template():
+    client = APIClient()
+    before = REQUESTS.value(method="GET", route=ORDER_ROUTE, status=404)
+    observed = histogram_count(REQUEST_DURATION, method="GET", route=ORDER_ROUTE)
+
+    client.get(f"/api/v1/orders/{uuid.uuid4()}/")
+    client.get(f"/api/v1/orders/{uuid.uuid4()}/")
+
+    assert REQUESTS.value(method="GET", route=ORDER_ROUTE, status=404) == before + 2
+    assert histogram_count(REQUEST_DURATION, method="GET", route=ORDER_ROUTE) == observed + 2
+    assert histogram_count(REQUEST_DB_QUERIES, route=ORDER_ROUTE) >= 2
+
+    response = client.get("/metrics")
+    body = response.content.decode()
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert (
+        f'http_request_duration_seconds_bucket{{method="GET",route="{ORDER_ROUTE}",le="+Inf"}}'
+        in body
+    )
+    assert f'http_requests_total{{method="GET",route="{ORDER_ROUTE}",status="404"}}' in body
+    assert "http_request_db_seconds_sum" in body
+
+
+def test_multiprocess_snapshots_are_summed(tmp_path, settings):
+    settings.METRICS_MULTIPROC_DIR = str(tmp_path)
+    counter = metrics.REGISTRY.counter("test_jobs_total", "Jobs de teste.", labelnames=("kind",))
+    histogram = metrics.REGISTRY.histogram("test_job_seconds", "Duração de teste.", buckets=(1, 5))
+    counter.inc(kind="a")
+    histogram.observe(0.5)
+
+    # Snapshot de outro worker (ou de um que já encerrou) no mesmo diretório.
+    other = metrics.REGISTRY.snapshot()
+    other["test_jobs_total"]["samples"] = [[["a"], 2], [["b"], 1]]
+    other["test_job_seconds"]["samples"] = [[[], {"buckets": [0, 1], "sum": 3.0, "count": 1}]]
+    (tmp_path / "999-other.json").write_text(json.dumps(other))
+
+    merged = metrics.collect()
+    samples = {tuple(key): value for key, value in merged["test_jobs_total"]["samples"]}
+    assert samples == {("a",): counter.value(kind="a") + 2, ("b",): 1}
+    [(_, seconds)] = merged["test_job_seconds"]["samples"]
+    assert seconds["count"] == histogram.samples()[()]["count"] + 1
+    assert seconds["buckets"][1] == histogram.samples()[()]["buckets"][1] + 1
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+    body = metrics.render(merged)
+    assert 'test_jobs_total{kind="b"} 1' in body
+    assert 'test_job_seconds_bucket{le="+Inf"}' in body
+
+
+@pytest.mark.django_db
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "test-metrics-throttle",
+        }
+    },
+    REST_FRAMEWORK={
+        "DEFAULT_AUTHENTICATION_CLASSES": [],
+        "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.AllowAny"],
+        "DEFAULT_THROTTLE_CLASSES": ["apps.core.throttles.ClientOrIPRateThrottle"],
+        "DEFAULT_THROTTLE_RATES": {"client": "1/hour"},
+        "DEFAULT_PAGINATION_CLASS": "apps.core.paginator.PersonalPagination",
+    },
+)
+def test_throttle_rejections_are_counted():
+    cache.clear()
+    client = APIClient()
+    before = THROTTLE_REJECTIONS.value(scope="client")
+
+    client.get("/api/v1/orders/")
+    client.get("/api/v1/orders/")
+    scrape = client.get("/metrics")
+
+    assert THROTTLE_REJECTIONS.value(scope="client") == before + 1
+    assert scrape.status_code == 200
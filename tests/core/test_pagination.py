@@ -0,0 +1,70 @@
+import pytest
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from apps.customers.models import Customer
+from apps.orders.models import Order
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+def _create_customers(total, start=0):
+    return [
+        Customer.objects.create(
+            name=f"Cliente Contagem {index}",
+            document=f"1000000000{index}",
+            email=f"contagem{index}@teste.com",
+            phone="11999999999",
+            address="Rua Contagem",
+        )
+        for index in range(start, start + total)
+    ]
+
+
+@pytest.mark.django_db
+def test_total_is_cached_until_the_model_is_written(api_client, django_assert_num_queries):
+    customer = _create_customers(1)[0]
+    for index in range(2):
+        Order.objects.create(customer=customer, idempotency_key=f"count-{index}", total_amount=1)
+
+    # A página sempre vai ao banco; o COUNT(*) sai do cache.
+    with django_assert_num_queries(2):
+        first = api_client.get("/api/v1/orders/?status=PENDING")
+    with django_assert_num_queries(1):
+        cached = api_client.get("/api/v1/orders/?status=PENDING")
+
+    Order.objects.create(customer=customer, idempotency_key="count-2", total_amount=1)
+    refreshed = api_client.get("/api/v1/orders/?status=PENDING")
+
+    assert first.data["total"] == cached.data["total"] == 2
+    assert first.data["total_estimated"] is False
+    assert refreshed.data["total"] == 3
+
+
+@pytest.mark.django_db
+@override_settings(PAGINATION_COUNT_LIMIT=2)
+def test_total_is_estimated_past_the_count_limit(api_client):
+    _create_customers(5)
+
+    first = api_client.get("/api/v1/customers/?is_active=true&page_size=2")
+    beyond = api_client.get("/api/v1/customers/?is_active=true&page_size=2&page=3")
+
+    assert first.data["total"] == 2
+    assert first.data["total_estimated"] is True
+    assert beyond.status_code == 200
+    assert len(beyond.data["results"]) == 1
+
+
+@pytest.mark.django_db
+def test_cursor_pages_keep_the_page_mode_keys(api_client):
+    _create_customers(3)
+
+    paged = api_client.get("/api/v1/customers/?page_size=2")
+    cursor = api_client.get("/api/v1/customers/?cursor=&page_size=2")
+
+    assert set(paged.data) <= set(cursor.data)
+    assert cursor.data["total_estimated"] is None
+    assert cursor.data["next"]
@@ -0,0 +1,78 @@
+import json
+import logging
+
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+from apps.core.observability import JsonFormatter, fingerprint, track_queries
+
+
+@pytest.fixture
+def request_logs():
+    records = []
+
+    class Collect(logging.Handler):
+        def emit(self, record):
+            records.append(record)
+
+    handler = Collect()
+    logger = logging.getLogger("api.request")
+    logger.addHandler(handler)
+    yield records
+    logger.removeHandler(handler)
+
+
+def test_fingerprint_ignores_literals_and_in_list_size():
+    assert fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'a''b'") == (
+        "SELECT * FROM t WHERE id IN (?+) AND name = ?"
+    )
+    assert fingerprint("SELECT  *\n FROM t2 WHERE id = 10 LIMIT 21") == (
+        "SELECT * FROM t2 WHERE id = ? LIMIT ?"
+    )
+
+
+@pytest.mark.django_db
+def test_profile_flags_repeated_and_slow_statements(settings):
+    settings.SQL_PROFILE_DUPLICATE_THRESHOLD = 3
+    settings.SQL_PROFILE_SLOW_QUERY_MS = 0
+
+    with track_queries(profile=True) as queries:
+        with connection.cursor() as cursor:
+            for value in range(4):
+                cursor.execute("SELECT %s", [value])
+            cursor.execute("SELECT 1, 2")
+
+    report = queries.report()
+
+    assert queries.count == 5
+    assert report["distinct_statements"] == 2
+    assert report["n_plus_one"] is True
+    assert [(entry["sql"], entry["count"]) for entry in report["duplicates"]] == [("SELECT ?", 4)]
+    assert len(report["slow"]) == 5
+
+
+@pytest.mark.django_db
+def test_sampled_request_log_carries_sql_profile(settings, request_logs):
+    settings.SQL_PROFILE_SAMPLE_RATE = 1.0
+
+    APIClient().get("/api/v1/orders/", HTTP_X_CORRELATION_ID="profile-123")
+
+    [record] = request_logs
+    payload = json.loads(JsonFormatter().format(record))
+    assert payload["correlation_id"] == "profile-123"
+    assert payload["db_queries"] >= 1
+    assert "db_time_ms" in payload
+    assert payload["sql_profile"]["distinct_statements"] >= 1
+    assert payload["sql_profile"]["n_plus_one"] is False
+
+
+@pytest.mark.django_db
+def test_request_log_without_sampling_has_only_totals(settings, request_logs):
+    settings.SQL_PROFILE_SAMPLE_RATE = 0
+
+    APIClient().get("/api/v1/orders/")
+
+    [record] = request_logs
+    assert record.db_queries >= 1
+    assert not hasattr(record, "sql_profile")
@@ -0,0 +1,50 @@
+import pytest
+from django.db import OperationalError
+
+from apps.core.transactions import (
+    LOCK_ABORTS,
+    LOCK_RETRIES,
+    LockContentionError,
+    run_with_lock_retry,
+)
+
+
+def test_lock_retry_repeats_deadlocked_operation():
+    calls = []
+
+    def operation():
+        calls.append(1)
+        if len(calls) < 3:
+            raise OperationalError(1213, "Deadlock found when trying to get lock")
+        return "ok"
+
+    retries_before = LOCK_RETRIES.value(operation="test_retry", reason="deadlock")
+
+    result = run_with_lock_retry(operation, operation="test_retry", max_attempts=5, base_delay=0)
+
+    assert result == "ok"
+    assert len(calls) == 3
+    assert LOCK_RETRIES.value(operation="test_retry", reason="deadlock") == retries_before + 2
+
+
+def test_lock_retry_gives_up_after_max_attempts():
+    def operation():
+        raise OperationalError(1205, "Lock wait timeout exceeded")
+
+    with pytest.raises(LockContentionError):
+        run_with_lock_retry(operation, operation="test_abort", max_attempts=2, base_delay=0)
+
+    assert LOCK_ABORTS.value(operation="test_abort", reason="lock_wait_timeout") == 1
+
+
+def test_lock_retry_does_not_retry_other_database_errors():
+    calls = []
+
+    def operation():
+        calls.append(1)
+        raise OperationalError(2006, "MySQL server has gone away")
+
+    with pytest.raises(OperationalError):
+        run_with_lock_retry(operation, operation="test_other", max_attempts=5, base_delay=0)
+
+    assert len(calls) == 1
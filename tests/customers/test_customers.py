@@ -6,6 +6,7 @@ from django.core.cache import cache
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from apps.customers.cache import CUSTOMER_CACHE_REQUESTS, LocalCache, get_active_customer
 from apps.customers.models import Customer
 
 
@@ -245,6 +246,46 @@ def test_filter_customers_by_email(api_client):
     assert response.data["results"][0]["id"] == str(customer_1.id)
 
 
+@pytest.mark.django_db
+def test_search_customers_by_document_email_and_name(api_client):
+    customer_1 = Customer.objects.create(
+        name="José da Silva",
+        document="529.982.247-25",
+        email="jose.silva@teste.com",
+        phone="111111111",
+        address="Rua 1",
+    )
+    customer_2 = Customer.objects.create(
+        name="Maria Silveira",
+        document="16899535009",
+        email="maria@teste.com",
+        phone="222222222",
+        address="Rua 2",
+    )
+
+    def found(query):
+        response = api_client.get("/api/v1/customers/", {"q": query})
+        assert response.status_code == 200
+        return {row["id"] for row in response.data["results"]}
+
+    assert found("52998") == {str(customer_1.id)}
+    assert found("529.982.2") == {str(customer_1.id)}
+    assert found("MARIA@") == {str(customer_2.id)}
+    assert found("silv") == {str(customer_1.id), str(customer_2.id)}
+    assert found("jose silv") == {str(customer_1.id)}
+
+
+@pytest.mark.django_db
+def test_customer_name_search_follows_updates(api_client, customer):
+    api_client.patch(f"/api/v1/customers/{customer.id}/", {"name": "Cliente Renomeado"})
+
+    old = api_client.get("/api/v1/customers/?name_like=teste")
+    new = api_client.get("/api/v1/customers/?name_like=renom")
+
+    assert old.data["total"] == 0
+    assert [row["id"] for row in new.data["results"]] == [str(customer.id)]
+
+
 @pytest.mark.django_db
 def test_filter_customers_by_is_active(api_client):
     active_customer = Customer.objects.create(
@@ -269,3 +310,104 @@ def test_filter_customers_by_is_active(api_client):
     assert response.status_code == 200
     assert response.data["total"] == 1
     assert response.data["results"][0]["id"] == str(active_customer.id)
+
+
+def _create_customers(total):
+    return [
+        Customer.objects.create(
+            name=f"Cliente Cursor {index}",
+            document=f"0000000000{index}",
+            email=f"cursor{index}@teste.com",
+            phone="11999999999",
+            address="Rua Cursor",
+        )
+        for index in range(total)
+    ]
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_walks_forward_and_back(api_client):
+    customers = _create_customers(5)
+    expected = [str(customer.id) for customer in reversed(customers)]
+
+    first = api_client.get("/api/v1/customers/?cursor=&page_size=2")
+    second = api_client.get(f"/api/v1/customers/?cursor={first.data['next']}&page_size=2")
+    third = api_client.get(f"/api/v1/customers/?cursor={second.data['next']}&page_size=2")
+    back = api_client.get(f"/api/v1/customers/?cursor={third.data['previous']}&page_size=2")
+
+    assert first.status_code == 200
+    assert first.data["total"] is None
+    assert first.data["previous"] is None
+    assert [row["id"] for row in first.data["results"]] == expected[:2]
+    assert [row["id"] for row in second.data["results"]] == expected[2:4]
+    assert [row["id"] for row in third.data["results"]] == expected[4:]
+    assert third.data["next"] is None
+    assert [row["id"] for row in back.data["results"]] == expected[2:4]
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_skips_count_query(api_client, django_assert_num_queries):
+    _create_customers(3)
+
+    with django_assert_num_queries(1):
+        response = api_client.get("/api/v1/customers/?cursor=")
+
+    assert response.status_code == 200
+    assert len(response.data["results"]) == 3
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_rejects_invalid_cursor(api_client):
+    response = api_client.get("/api/v1/customers/?cursor=invalido")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_customer_list_and_detail_stay_within_query_budget(api_client, query_budget):
+    customers = _create_customers(5)
+
+    with query_budget(3):
+        listing = api_client.get("/api/v1/customers/?page_size=100")
+    with query_budget(2):
+        detail = api_client.get(f"/api/v1/customers/{customers[0].id}/")
+
+    assert listing.data["total"] == 5
+    assert detail.status_code == 200
+
+
+@pytest.mark.django_db
+def test_sparse_fields_on_customer_detail(api_client, customer):
+    response = api_client.get(f"/api/v1/customers/{customer.id}/?fields=id,name")
+
+    assert response.data == {"id": str(customer.id), "name": customer.name}
+
+
+def test_local_cache_evicts_least_recently_used_and_expired_entries():
+    local = LocalCache(max_size=2, ttl=60)
+    local.set("a", 1)
+    local.set("b", 2)
+    local.get("a")
+    local.set("c", 3)
+
+    expired = LocalCache(max_size=2, ttl=0)
+    expired.set("a", 1)
+
+    assert local.get("a") == 1
+    assert local.get("b") is None
+    assert local.get("c") == 3
+    assert expired.get("a") is None
+
+
+@pytest.mark.django_db
+def test_active_customer_lookup_is_served_locally_until_invalidated(customer):
+    queryset = Customer.objects.filter(is_active=True)
+    local_hits = CUSTOMER_CACHE_REQUESTS.value(tier="local")
+
+    assert get_active_customer(customer.id, queryset) == customer
+    assert get_active_customer(customer.id, queryset) == customer
+    assert CUSTOMER_CACHE_REQUESTS.value(tier="local") == local_hits + 1
+
+    customer.soft_delete()
+
+    assert get_active_customer(customer.id, queryset) is None
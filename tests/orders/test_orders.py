@@ -1,12 +1,35 @@
+import csv
+import json
 import threading
 import uuid
+from datetime import timedelta
+from io import StringIO
 
 import pytest
 from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework.test import APIClient
 
 from apps.customers.models import Customer
-from apps.orders.models import Order, OrderItem, OrderStatus, OrderStatusHistory
+from apps.orders.idempotency import idempotency_lock
+from apps.orders.management.commands.order_contention_benchmark import run_contention_benchmark
+from apps.orders.models import (
+    ArchivedOrder,
+    Order,
+    OrderEvent,
+    OrderItem,
+    OrderStatus,
+    OrderStatusHistory,
+)
+from apps.orders.outbox import relay_pending
+from apps.orders.serializers import OrderCreateSerializer
+from apps.orders.views import OrderViewSet
+from apps.products import stock
+from apps.products.cache import PRODUCT_CACHE_REQUESTS
 from apps.products.models import Product
 
 
@@ -63,7 +86,7 @@ def test_create_order_success(api_client, customer, product):
     assert Order.objects.count() == 1
 
     product.refresh_from_db()
-    assert product.stock_quantity == 8
+    assert product.available_quantity == 8
 
 
 @pytest.mark.django_db
@@ -110,15 +133,14 @@ def test_stock_concurrency(customer, product):
     product.stock_quantity = 10
     product.save()
 
-    payload = {
-        "customer_id": str(customer.id),
-        "idempotency_key": str(uuid.uuid4()),
-        "items": [{"product_id": str(product.id), "quantity": 8}],
-    }
-
     responses = []
 
     def make_request():
+        payload = {
+            "customer_id": str(customer.id),
+            "idempotency_key": str(uuid.uuid4()),
+            "items": [{"product_id": str(product.id), "quantity": 8}],
+        }
         client = APIClient()
         response = client.post("/api/v1/orders/", payload, format="json")
         responses.append(response.status_code)
@@ -135,7 +157,7 @@ def test_stock_concurrency(customer, product):
 
     assert responses.count(201) == 1
     assert responses.count(400) == 1
-    assert product.stock_quantity in [2, 10]
+    assert product.available_quantity in [2, 10]
 
 
 @pytest.mark.django_db
@@ -165,6 +187,57 @@ def test_invalid_status_transition(api_client, customer):
     assert response.status_code == 400
 
 
+@pytest.mark.django_db
+def test_bulk_status_transition_reports_each_order(
+    api_client, customer, django_assert_max_num_queries
+):
+    confirmed = [
+        Order.objects.create(
+            customer=customer,
+            total_amount=100,
+            status=OrderStatus.CONFIRMED,
+            idempotency_key=f"bulk-{index}",
+        )
+        for index in range(20)
+    ]
+    pending = Order.objects.create(customer=customer, total_amount=50, idempotency_key="bulk-p")
+    missing = uuid.uuid4()
+
+    with django_assert_max_num_queries(8):
+        response = api_client.post(
+            "/api/v1/orders/status/",
+            {
+                "order_ids": [str(order.id) for order in confirmed]
+                + [str(pending.id), str(missing)],
+                "new_status": OrderStatus.SEPARATED,
+                "changed_by": "Expedição",
+            },
+            format="json",
+        )
+
+    assert response.status_code == 200
+    assert response.data["updated"] == 20
+    assert response.data["failed"] == 2
+    assert response.data["results"][0] == {
+        "order_id": str(confirmed[0].id),
+        "status": "updated",
+        "previous_status": OrderStatus.CONFIRMED,
+        "new_status": OrderStatus.SEPARATED,
+    }
+    assert [result["order_id"] for result in response.data["results"][-2:]] == [
+        str(pending.id),
+        str(missing),
+    ]
+    assert {result["status"] for result in response.data["results"][-2:]} == {"error"}
+
+    assert Order.objects.filter(status=OrderStatus.SEPARATED).count() == 20
+    pending.refresh_from_db()
+    assert pending.status == OrderStatus.PENDING
+    history = OrderStatusHistory.objects.filter(order__in=confirmed)
+    assert history.count() == 20
+    assert set(history.values_list("changed_by", flat=True)) == {"Expedição"}
+
+
 @pytest.mark.django_db
 def test_cancel_order_returns_stock(api_client, customer, product):
 
@@ -192,7 +265,7 @@ def test_cancel_order_returns_stock(api_client, customer, product):
     assert response.status_code == 204
 
     product.refresh_from_db()
-    assert product.stock_quantity == 10
+    assert product.available_quantity == 10
 
 
 @pytest.mark.django_db
@@ -298,6 +371,83 @@ def test_filter_orders_by_order_number(api_client, customer):
     assert response.data["results"][0]["id"] == str(first_order.id)
 
 
+@pytest.mark.django_db
+def test_filter_orders_by_order_number_prefix_without_marker(api_client, customer):
+    order = Order.objects.create(
+        customer=customer, total_amount=100, idempotency_key="filter-order-number-prefix"
+    )
+
+    response = api_client.get(f"/api/v1/orders/?order_number={order.order_number[4:10].lower()}")
+
+    assert response.status_code == 200
+    assert [row["id"] for row in response.data["results"]] == [str(order.id)]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_create_replays_order_committed_by_a_concurrent_request(
+    api_client, customer, product, monkeypatch
+):
+    place_order = OrderCreateSerializer._place_order
+
+    # O pedido concorrente é gravado depois das buscas por chave e antes do INSERT deste.
+    def racing_place_order(self, customer, items, idempotency_key, observations):
+        Order.objects.create(customer=customer, total_amount=100, idempotency_key=idempotency_key)
+        return place_order(self, customer, items, idempotency_key, observations)
+
+    monkeypatch.setattr(OrderCreateSerializer, "_place_order", racing_place_order)
+    response = api_client.post(
+        "/api/v1/orders/",
+        {
+            "customer_id": str(customer.id),
+            "idempotency_key": "race-key",
+            "items": [{"product_id": str(product.id), "quantity": 1}],
+        },
+        format="json",
+    )
+
+    winner = Order.objects.get(idempotency_key="race-key")
+    assert response.status_code == 200
+    assert response.data["id"] == str(winner.id)
+    assert product.available_quantity == 10
+
+
+@pytest.mark.django_db
+def test_order_number_retry_reraises_other_integrity_errors(customer):
+    Order.objects.create(customer=customer, total_amount=1, idempotency_key="dup-key")
+
+    with pytest.raises(IntegrityError):
+        Order.objects.create(customer=customer, total_amount=1, idempotency_key="dup-key")
+
+    assert Order.objects.filter(idempotency_key="dup-key").count() == 1
+
+
+@pytest.mark.django_db
+def test_filter_orders_by_number_of_order_placed_through_api(api_client, customer, product):
+    response = api_client.post(
+        "/api/v1/orders/",
+        {
+            "customer_id": str(customer.id),
+            "idempotency_key": "filter-api-order",
+            "items": [{"product_id": str(product.id), "quantity": 1}],
+        },
+        format="json",
+    )
+    order_number = response.data["order_number"]
+    legacy = Order.objects.create(
+        customer=customer,
+        total_amount=100,
+        idempotency_key="filter-legacy-number",
+        order_number="54c7c7004edd",
+    )
+
+    placed = api_client.get("/api/v1/orders/", {"order_number": order_number})
+    unprefixed = api_client.get("/api/v1/orders/", {"order_number": legacy.order_number})
+
+    assert order_number.startswith("ORD-")
+    assert [row["id"] for row in placed.data["results"]] == [response.data["id"]]
+    assert [row["id"] for row in unprefixed.data["results"]] == [str(legacy.id)]
+
+
 @pytest.mark.django_db
 def test_filter_orders_by_customer(api_client):
     customer_1 = Customer.objects.create(
@@ -354,3 +504,538 @@ def test_filter_orders_by_status(api_client, customer):
     assert response.status_code == 200
     assert response.data["total"] == 1
     assert response.data["results"][0]["id"] == str(confirmed_order.id)
+
+
+@pytest.mark.django_db
+def test_create_order_with_inactive_product(api_client, customer, product):
+    product.is_active = False
+    product.save()
+
+    payload = {
+        "customer_id": str(customer.id),
+        "idempotency_key": "inactive-product-key",
+        "items": [{"product_id": str(product.id), "quantity": 1}],
+    }
+
+    response = api_client.post("/api/v1/orders/", payload, format="json")
+
+    assert response.status_code == 400
+    assert Order.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_create_looks_up_the_idempotency_key_once(api_client, customer, product):
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.post(
+            "/api/v1/orders/",
+            {
+                "customer_id": str(customer.id),
+                "idempotency_key": "lookup-once",
+                "items": [{"product_id": str(product.id), "quantity": 1}],
+            },
+            format="json",
+        )
+
+    lookups = [
+        query["sql"]
+        for query in queries.captured_queries
+        if query["sql"].startswith("SELECT") and '"idempotency_key" =' in query["sql"]
+    ]
+    assert response.status_code == 201
+    assert [sql.split(" FROM ")[1].split()[0] for sql in lookups] == [
+        '"orders"',
+        '"orders_archive"',
+    ]
+
+
+@pytest.mark.django_db
+def test_create_order_with_many_items_uses_batched_queries(
+    api_client, customer, django_assert_max_num_queries
+):
+    products = [
+        Product.objects.create(
+            sku=f"BATCH-{index}",
+            name=f"Produto Lote {index}",
+            price=10,
+            stock_quantity=100,
+            is_active=True,
+        )
+        for index in range(30)
+    ]
+    stock.ensure_shards([product.id for product in products])
+
+    payload = {
+        "customer_id": str(customer.id),
+        "idempotency_key": "batched-key",
+        "items": [{"product_id": str(product.id), "quantity": 2} for product in products]
+        + [{"product_id": str(products[0].id), "quantity": 3}],
+    }
+
+    # 11 para o pedido em si (inclui a leitura sem lock dos shards e uma única busca da chave),
+    # a chave conferida no arquivo, um upsert por tabela de rollup e o evento no outbox.
+    with django_assert_max_num_queries(16):
+        response = api_client.post("/api/v1/orders/", payload, format="json")
+
+    assert response.status_code == 201
+    assert OrderItem.objects.filter(order_id=response.data["id"]).count() == 31
+    assert Order.objects.get(id=response.data["id"]).total_amount == 630
+
+    products[0].refresh_from_db()
+    products[1].refresh_from_db()
+    assert products[0].available_quantity == 95
+    assert products[1].available_quantity == 98
+
+
+@pytest.mark.django_db(transaction=True)
+def test_overlapping_concurrent_orders_do_not_abort():
+    report = run_contention_benchmark(workers=4, orders=20, products=3, items_per_order=3)
+
+    assert report["created"] == 20
+    assert report["aborted"] == 0
+    assert report["failed"] == 0
+
+
+@pytest.mark.django_db
+def test_order_idempotent_replay_is_served_from_cache(
+    api_client, customer, product, django_assert_num_queries
+):
+    payload = {
+        "customer_id": str(customer.id),
+        "idempotency_key": "cached-key",
+        "items": [{"product_id": str(product.id), "quantity": 1}],
+    }
+
+    first = api_client.post("/api/v1/orders/", payload, format="json")
+
+    with django_assert_num_queries(0):
+        replay = api_client.post("/api/v1/orders/", payload, format="json")
+
+    assert first.status_code == 201
+    assert replay.status_code == 200
+    assert replay.data["id"] == first.data["id"]
+    assert Order.objects.count() == 1
+
+
+@pytest.mark.django_db
+@override_settings(ORDER_IDEMPOTENCY_LOCK_TIMEOUT=1)
+def test_order_with_key_in_progress_returns_conflict(api_client, customer, product):
+    payload = {
+        "customer_id": str(customer.id),
+        "idempotency_key": "in-progress-key",
+        "items": [{"product_id": str(product.id), "quantity": 1}],
+    }
+
+    with idempotency_lock("in-progress-key") as acquired:
+        response = api_client.post("/api/v1/orders/", payload, format="json")
+
+    assert acquired
+    assert response.status_code == 409
+    assert Order.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_import_orders_jsonl_reports_each_record(api_client, customer, product):
+    Order.objects.create(customer=customer, total_amount=0, idempotency_key="import-existing")
+    lines = [
+        {
+            "customer_id": str(customer.id),
+            "idempotency_key": "import-1",
+            "items": [{"product_id": str(product.id), "quantity": 2}],
+        },
+        {
+            "customer_id": str(customer.id),
+            "idempotency_key": "import-1",
+            "items": [{"product_id": str(product.id), "quantity": 2}],
+        },
+        {
+            "customer_id": str(uuid.uuid4()),
+            "idempotency_key": "import-2",
+            "items": [{"product_id": str(product.id), "quantity": 1}],
+        },
+        {
+            "customer_id": str(customer.id),
+            "idempotency_key": "import-existing",
+            "items": [{"product_id": str(product.id), "quantity": 1}],
+        },
+        {
+            "customer_id": str(customer.id),
+            "idempotency_key": "import-3",
+            "items": [{"product_id": str(product.id), "quantity": 50}],
+        },
+    ]
+    body = "\n".join(json.dumps(line) for line in lines) + "\nnot-json\n"
+
+    response = api_client.post(
+        "/api/v1/orders/import/?chunk_size=2", body, content_type="application/x-ndjson"
+    )
+    report = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+    assert response.status_code == 200
+    assert [result["status"] for result in report] == [
+        "created",
+        "duplicate",
+        "error",
+        "duplicate",
+        "error",
+        "error",
+    ]
+    assert report[1]["order_id"] == report[0]["order_id"]
+    assert Order.objects.filter(idempotency_key="import-1").count() == 1
+    assert Order.objects.get(idempotency_key="import-1").total_amount == 200
+    assert product.available_quantity == 8
+
+
+@pytest.mark.django_db
+def test_import_orders_command_groups_csv_rows(tmp_path, customer, product):
+    other = Product.objects.create(sku="CSV-2", name="Outro", price=5, stock_quantity=5)
+    source = tmp_path / "orders.csv"
+    source.write_text(
+        "idempotency_key,customer_id,product_id,quantity,observations\n"
+        f"csv-1,{customer.id},{product.id},1,Marketplace\n"
+        f"csv-1,{customer.id},{other.id},2,Marketplace\n"
+        f"csv-2,{customer.id},{other.id},1,\n",
+        encoding="utf-8",
+    )
+    stdout = StringIO()
+
+    call_command("import_orders", str(source), chunk_size=1, stdout=stdout, stderr=StringIO())
+
+    report = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert [result["status"] for result in report] == ["created", "created"]
+    order = Order.objects.get(idempotency_key="csv-1")
+    assert order.items.count() == 2
+    assert order.total_amount == 110
+    assert other.available_quantity == 2
+
+
+@pytest.mark.django_db
+def test_order_list_and_detail_stay_within_query_budget(api_client, query_budget):
+    orders = [
+        Order.objects.create(
+            customer=Customer.objects.create(
+                name=f"Cliente Orçamento {index}",
+                document=f"2000000000{index}",
+                email=f"orcamento{index}@teste.com",
+                phone="11999999999",
+                address="Rua Orçamento",
+            ),
+            idempotency_key=f"budget-{index}",
+            total_amount=10,
+        )
+        for index in range(5)
+    ]
+
+    with query_budget(3):
+        listing = api_client.get("/api/v1/orders/?page_size=100")
+    with query_budget(2):
+        detail = api_client.get(f"/api/v1/orders/{orders[0].id}/")
+
+    assert listing.status_code == 200
+    assert {row["customer_name"] for row in listing.data["results"]} == {
+        f"Cliente Orçamento {index}" for index in range(5)
+    }
+    assert detail.data["customer_name"] == "Cliente Orçamento 0"
+
+
+@pytest.mark.django_db
+def test_expand_embeds_items_and_history_with_batched_queries(
+    api_client, customer, product, query_budget
+):
+    for index in range(3):
+        order = Order.objects.create(
+            customer=customer, idempotency_key=f"expand-{index}", total_amount=200
+        )
+        OrderItem.objects.create(
+            order=order, product=product, quantity=2, unit_price=100, subtotal=200
+        )
+        OrderStatusHistory.objects.create(
+            order=order,
+            previous_status=OrderStatus.PENDING,
+            new_status=OrderStatus.CONFIRMED,
+            changed_by="teste",
+        )
+
+    with query_budget(5):
+        listing = api_client.get("/api/v1/orders/?expand=items,status_history")
+    with query_budget(4):
+        detail = api_client.get(f"/api/v1/orders/{order.id}/?expand=items")
+
+    assert listing.status_code == 200
+    for row in listing.data["results"]:
+        assert [item["product_name"] for item in row["items"]] == ["Produto Teste"]
+        assert [entry["new_status"] for entry in row["status_history"]] == ["CONFIRMED"]
+    assert detail.data["items"][0]["quantity"] == 2
+    assert "status_history" not in detail.data
+
+
+@pytest.mark.django_db
+def test_expand_rejects_unknown_relations(api_client):
+    response = api_client.get("/api/v1/orders/?expand=items,payments")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_sparse_fields_trim_output_and_projection(api_client, customer, query_budget):
+    Order.objects.create(
+        customer=customer, idempotency_key="sparse", total_amount=10, observations="x" * 500
+    )
+
+    with query_budget(3) as queries:
+        response = api_client.get("/api/v1/orders/?fields=id,order_number,status")
+
+    assert set(response.data["results"][0]) == {"id", "order_number", "status"}
+    listing_sql = queries.captured_queries[-1]["sql"]
+    assert "observations" not in listing_sql
+    assert "customers" not in listing_sql
+
+
+@pytest.mark.django_db
+def test_sparse_fields_reject_unknown_fields(api_client):
+    response = api_client.get("/api/v1/orders/?fields=id,secret")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_sparse_fields_select_expanded_relations(api_client, customer, product):
+    payload = {
+        "customer_id": str(customer.id),
+        "idempotency_key": "sparse-expand",
+        "items": [{"product_id": str(product.id), "quantity": 2}],
+    }
+    order_id = api_client.post("/api/v1/orders/", payload, format="json").data["id"]
+    url = f"/api/v1/orders/{order_id}/"
+
+    def fetch_both():
+        selected = api_client.get(url, {"expand": "items", "fields": "id,items"})
+        omitted = api_client.get(url, {"expand": "items", "fields": "id"})
+        return selected, omitted
+
+    listed = api_client.get("/api/v1/orders/", {"expand": "items", "fields": "id,items"})
+    live, live_omitted = fetch_both()
+    api_client.delete(url)
+    Order.objects.filter(id=order_id).update(updated_at=timezone.now() - timedelta(days=31))
+    call_command("archive_orders", "--days=30", stdout=StringIO())
+    archived, archived_omitted = fetch_both()
+
+    assert listed.status_code == 200
+    assert set(listed.data["results"][0]) == {"id", "items"}
+    assert listed.data["results"][0]["items"][0]["quantity"] == 2
+    assert set(live.data) == {"id", "items"}
+    assert live.json() == archived.json()
+    assert live_omitted.data == archived_omitted.data == {"id": order_id}
+    assert api_client.get(url, {"fields": "id,items"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_order_creation_reads_products_from_cache(api_client, customer, product):
+    hits = PRODUCT_CACHE_REQUESTS.value(kind="instance", result="hit")
+
+    for index in range(2):
+        response = api_client.post(
+            "/api/v1/orders/",
+            {
+                "customer_id": str(customer.id),
+                "idempotency_key": f"product-cache-{index}",
+                "items": [{"product_id": str(product.id), "quantity": 4}],
+            },
+            format="json",
+        )
+        assert response.status_code == 201
+
+    assert PRODUCT_CACHE_REQUESTS.value(kind="instance", result="hit") == hits + 1
+    assert product.available_quantity == 2
+
+
+@pytest.mark.django_db
+def test_export_streams_csv_rows_per_item_honoring_filters(api_client, customer, product):
+    other = Product.objects.create(sku="EXP-2", name="Outro", price=5, stock_quantity=10)
+    response = api_client.post(
+        "/api/v1/orders/",
+        {
+            "customer_id": str(customer.id),
+            "idempotency_key": "export-1",
+            "items": [
+                {"product_id": str(product.id), "quantity": 1},
+                {"product_id": str(other.id), "quantity": 2},
+            ],
+        },
+        format="json",
+    )
+    confirmed = Order.objects.create(
+        customer=customer, total_amount=0, idempotency_key="export-2", status="CONFIRMED"
+    )
+
+    exported = api_client.get("/api/v1/orders/export/?output=csv&status=PENDING")
+    rows = list(csv.DictReader(StringIO(b"".join(exported.streaming_content).decode())))
+
+    assert exported["Content-Type"] == "text/csv"
+    assert [row["product_sku"] for row in rows] == ["GZ-TR", "EXP-2"]
+    assert {row["order_id"] for row in rows} == {response.data["id"]}
+    assert rows[0]["customer_name"] == "Cliente Pedido"
+    assert str(confirmed.id) not in {row["order_id"] for row in rows}
+
+
+@pytest.mark.django_db
+def test_export_orders_command_walks_all_chunks(customer):
+    orders = [
+        Order.objects.create(customer=customer, total_amount=index, idempotency_key=f"exp-{index}")
+        for index in range(3)
+    ]
+    output = StringIO()
+
+    call_command(
+        "export_orders",
+        "--chunk-size=2",
+        f"--created-after={orders[0].created_at.isoformat()}",
+        stdout=output,
+        stderr=StringIO(),
+    )
+    exported = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    assert [row["order_id"] for row in exported] == [str(order.id) for order in orders]
+    assert exported[0]["items"] == []
+    assert exported[2]["total_amount"] == "2.00"
+
+
+@pytest.mark.django_db
+def test_export_rejects_unknown_output(api_client):
+    response = api_client.get("/api/v1/orders/export/?output=xml")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_closed_orders_are_archived_and_still_served(api_client, customer, product):
+    payload = {
+        "customer_id": str(customer.id),
+        "idempotency_key": "archive-1",
+        "items": [{"product_id": str(product.id), "quantity": 2}],
+    }
+    order_id = api_client.post("/api/v1/orders/", payload, format="json").data["id"]
+    api_client.delete(f"/api/v1/orders/{order_id}/")
+    live = api_client.get(f"/api/v1/orders/{order_id}/?expand=items").json()
+    recent = Order.objects.create(
+        customer=customer, total_amount=0, idempotency_key="archive-2", status="DELIVERED"
+    )
+    Order.objects.filter(id=order_id).update(updated_at=timezone.now() - timedelta(days=31))
+
+    call_command("archive_orders", "--days=30", "--batch-size=1", stdout=StringIO())
+
+    assert list(Order.all_objects.values_list("id", flat=True)) == [recent.id]
+    assert not OrderItem.objects.filter(order_id=order_id).exists()
+    assert ArchivedOrder.objects.get(id=order_id).status == "CANCELED"
+
+    archived = api_client.get(f"/api/v1/orders/{order_id}/?expand=items")
+    sparse = api_client.get(f"/api/v1/orders/{order_id}/?fields=id,status")
+    items = api_client.get(f"/api/v1/orders/{order_id}/items/")
+    replay = api_client.post("/api/v1/orders/", payload, format="json")
+
+    assert archived.status_code == 200
+    assert archived.json() == live
+    assert sparse.data == {"id": order_id, "status": "CANCELED"}
+    assert items.data[0]["quantity"] == 2
+    assert replay.status_code == 200
+    assert replay.data["id"] == order_id
+    assert api_client.get(f"/api/v1/orders/{uuid.uuid4()}/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_order_events_feed_follows_changes(api_client, customer, product, settings):
+    settings.ORDER_EVENT_FEED_LAG = 0
+    response = api_client.post(
+        "/api/v1/orders/",
+        {
+            "customer_id": str(customer.id),
+            "idempotency_key": "events-key",
+            "items": [{"product_id": str(product.id), "quantity": 2}],
+        },
+        format="json",
+    )
+    order_id = response.data["id"]
+    api_client.patch(f"/api/v1/orders/{order_id}/status/", {"new_status": "CONFIRMED"})
+
+    first = api_client.get("/api/v1/orders/events/", {"limit": 1})
+    rest = api_client.get("/api/v1/orders/events/", {"since": first.data["next_since"]})
+    api_client.delete(f"/api/v1/orders/{order_id}/")
+    latest = api_client.get("/api/v1/orders/events/", {"since": rest.data["next_since"]})
+
+    assert first.status_code == 200
+    created = first.data["results"][0]
+    assert created["event_type"] == "order.created"
+    assert created["order_id"] == order_id
+    assert created["payload"]["items"][0]["quantity"] == 2
+    assert [event["event_type"] for event in rest.data["results"]] == ["order.status_changed"]
+    assert rest.data["results"][0]["payload"]["new_status"] == "CONFIRMED"
+    assert [event["payload"] for event in latest.data["results"]] == [
+        {"previous_status": "CONFIRMED"}
+    ]
+    assert latest.data["results"][0]["event_type"] == "order.canceled"
+
+    empty = api_client.get("/api/v1/orders/events/", {"since": latest.data["next_since"]})
+    assert empty.data == {"results": [], "next_since": latest.data["next_since"]}
+
+
+@pytest.mark.django_db
+def test_stale_status_patch_emits_no_second_event(api_client, customer, product, monkeypatch):
+    response = api_client.post(
+        "/api/v1/orders/",
+        {
+            "customer_id": str(customer.id),
+            "idempotency_key": "stale-key",
+            "items": [{"product_id": str(product.id), "quantity": 1}],
+        },
+        format="json",
+    )
+    order_id = response.data["id"]
+    stale = Order.objects.get(pk=order_id)
+
+    first = api_client.patch(f"/api/v1/orders/{order_id}/status/", {"new_status": "CONFIRMED"})
+    # Simula o segundo PATCH concorrente, que carregou o pedido antes do primeiro commit.
+    monkeypatch.setattr(OrderViewSet, "get_object", lambda self: stale)
+    second = api_client.patch(f"/api/v1/orders/{order_id}/status/", {"new_status": "CONFIRMED"})
+
+    assert first.status_code == 200
+    assert second.status_code == 400
+    assert OrderEvent.objects.filter(event_type="order.status_changed").count() == 1
+    assert OrderStatusHistory.objects.filter(order_id=order_id, new_status="CONFIRMED").count() == 1
+
+
+class RecordingStreamClient:
+    def __init__(self):
+        self.entries = []
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def xadd(self, name, fields, maxlen=None, approximate=True):
+        self.entries.append((name, fields))
+
+    def execute(self):
+        return []
+
+
+@pytest.mark.django_db
+def test_relay_publishes_pending_events_once(customer, settings):
+    orders = [
+        Order.objects.create(customer=customer, total_amount=10, idempotency_key=f"relay-{index}")
+        for index in range(5)
+    ]
+    OrderEvent.objects.bulk_create(
+        [
+            OrderEvent(event_type="order.created", order_id=order.id, payload={"status": "PENDING"})
+            for order in orders
+        ]
+    )
+    client = RecordingStreamClient()
+
+    assert relay_pending(client, batch_size=2) == 5
+    assert relay_pending(client, batch_size=2) == 0
+
+    assert [name for name, _ in client.entries] == [settings.ORDER_EVENT_STREAM] * 5
+    assert [fields["order_id"] for _, fields in client.entries] == [
+        str(order.id) for order in orders
+    ]
+    assert json.loads(client.entries[0][1]["payload"]) == {"status": "PENDING"}
+    assert not OrderEvent.objects.filter(published_at__isnull=True).exists()
@@ -1,7 +1,14 @@
+from io import StringIO
+
 import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.exceptions import ValidationError
 from rest_framework.test import APIClient
 
-from apps.products.models import Product
+from apps.products import stock
+from apps.products.models import Product, StockMovement, StockMovementKind
 
 
 @pytest.fixture
@@ -134,6 +141,43 @@ def test_filter_products_by_name_like(api_client):
     assert response.data["results"][0]["id"] == str(product_1.id)
 
 
+@pytest.mark.django_db
+def test_search_orders_products_by_relevance(api_client):
+    mentioned = Product.objects.create(
+        sku="SKU-CABO",
+        name="Cabo USB",
+        description="Compatível com notebook",
+        price=30,
+        stock_quantity=10,
+    )
+    named = Product.objects.create(
+        sku="SKU-NOTE", name="Notebook Pro", description="", price=1000, stock_quantity=10
+    )
+    Product.objects.create(
+        sku="SKU-MOUSE", name="Mouse", description="Sem fio", price=50, stock_quantity=10
+    )
+
+    response = api_client.get("/api/v1/products/?q=NOTEBOOK")
+    accented = api_client.get("/api/v1/products/?q=compativel note")
+
+    assert [row["id"] for row in response.data["results"]] == [str(named.id), str(mentioned.id)]
+    assert [row["id"] for row in accented.data["results"]] == [str(mentioned.id)]
+
+
+@pytest.mark.django_db
+def test_rebuild_product_search_indexes_only_stale_products():
+    Product.objects.bulk_create(
+        [Product(sku="SKU-BULK", name="Teclado Mecânico", price=300, stock_quantity=5)]
+    )
+    output = StringIO()
+
+    call_command("rebuild_product_search", stdout=output)
+    call_command("rebuild_product_search", stdout=output)
+
+    assert output.getvalue().splitlines() == ["Produtos indexados: 1", "Produtos indexados: 0"]
+    assert Product.objects.filter(search_terms__term="mecanico").exists()
+
+
 @pytest.mark.django_db
 def test_filter_products_by_is_active(api_client):
     active_product = Product.objects.create(
@@ -158,3 +202,201 @@ def test_filter_products_by_is_active(api_client):
     assert response.status_code == 200
     assert response.data["total"] == 1
     assert response.data["results"][0]["id"] == str(active_product.id)
+
+
+def _reserve(product, quantity):
+    stock.reserve({product.id: quantity}, reference="test", products={product.id: product})
+
+
+@pytest.mark.django_db
+def test_reservations_are_reflected_in_reads_before_settlement(api_client, product):
+    _reserve(product, 3)
+
+    response = api_client.get(f"/api/v1/products/{product.id}/")
+
+    product.refresh_from_db()
+    assert response.status_code == 200
+    assert response.data["stock_quantity"] == 7
+    assert product.stock_quantity == 10
+    reserved = StockMovement.objects.filter(product=product, kind=StockMovementKind.RESERVE)
+    assert sum(reserved.values_list("quantity", flat=True)) == -3
+
+
+@pytest.mark.django_db
+def test_settle_stock_consolidates_shards_into_product(product):
+    _reserve(product, 3)
+    _reserve(product, 2)
+
+    call_command("settle_stock", stdout=StringIO())
+
+    product.refresh_from_db()
+    assert product.stock_quantity == 5
+    shard_quantities = sorted(product.stock_shards.values_list("quantity", flat=True))
+    assert shard_quantities == [0, 0, 0, 1, 1, 1, 1, 1]
+    assert not StockMovement.objects.filter(product=product, settled_at__isnull=True).exists()
+
+
+@pytest.mark.django_db
+def test_reservation_borrows_from_other_shards(product):
+    _reserve(product, 10)
+
+    assert product.available_quantity == 0
+
+    with pytest.raises(ValidationError):
+        _reserve(product, 1)
+
+
+@pytest.mark.django_db
+def test_short_shard_locks_the_whole_basket_at_once(product, monkeypatch):
+    other = Product.objects.create(sku="OTHER-1", name="Outro", price=1, stock_quantity=80)
+    # Com um shard curto, nada é travado por índice antes de travar todos os shards do pedido.
+    monkeypatch.setattr(stock, "_lock_shards", lambda *args: pytest.fail("lock por índice"))
+
+    stock.reserve(
+        {product.id: 9, other.id: 1},
+        reference="basket",
+        products={product.id: product, other.id: other},
+    )
+
+    assert product.available_quantity == 1
+    assert other.available_quantity == 79
+    movements = StockMovement.objects.filter(reference="basket", product=product)
+    assert movements.count() > 1
+
+
+@pytest.mark.django_db
+def test_update_stock_goes_through_ledger(api_client, product):
+    _reserve(product, 4)
+
+    response = api_client.patch(f"/api/v1/products/{product.id}/stock/", {"stock_quantity": 20})
+
+    assert response.status_code == 200
+    assert response.data["stock_quantity"] == 20
+    assert product.available_quantity == 20
+    adjustment = StockMovement.objects.get(product=product, kind=StockMovementKind.ADJUST)
+    assert adjustment.quantity == 14
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_respects_filters(api_client):
+    for index in range(3):
+        Product.objects.create(sku=f"CUR-A{index}", name="A", price=1, stock_quantity=1)
+        Product.objects.create(
+            sku=f"CUR-I{index}", name="I", price=1, stock_quantity=1, is_active=False
+        )
+
+    first = api_client.get("/api/v1/products/?is_active=true&cursor=&page_size=2")
+    second = api_client.get(
+        f"/api/v1/products/?is_active=true&cursor={first.data['next']}&page_size=2"
+    )
+
+    results = first.data["results"] + second.data["results"]
+    assert len(results) == 3
+    assert all(row["is_active"] for row in results)
+    assert second.data["next"] is None
+
+
+@pytest.mark.django_db
+def test_product_list_and_detail_stay_within_query_budget(api_client, query_budget):
+    products = [
+        Product.objects.create(sku=f"BUD-{index}", name="Orçamento", price=1, stock_quantity=8)
+        for index in range(5)
+    ]
+    stock.ensure_shards([product.id for product in products[:3]])
+
+    with query_budget(3):
+        listing = api_client.get("/api/v1/products/?page_size=100")
+    with query_budget(2):
+        detail = api_client.get(f"/api/v1/products/{products[0].id}/")
+
+    assert [row["stock_quantity"] for row in listing.data["results"]] == [8] * 5
+    assert detail.data["stock_quantity"] == 8
+
+
+@pytest.mark.django_db
+def test_sparse_fields_keep_ledger_stock(api_client, product):
+    _reserve(product, 3)
+
+    response = api_client.get("/api/v1/products/?fields=sku,stock_quantity")
+
+    assert response.data["results"] == [{"sku": product.sku, "stock_quantity": 7}]
+
+
+@pytest.mark.django_db
+def test_product_detail_is_cached_until_written(api_client, product, django_assert_num_queries):
+    api_client.get(f"/api/v1/products/{product.id}/")
+    # Só a agregação da ETag vai ao banco.
+    with django_assert_num_queries(1):
+        cached = api_client.get(f"/api/v1/products/{product.id}/")
+
+    api_client.patch(f"/api/v1/products/{product.id}/", {"name": "Renomeado"})
+    renamed = api_client.get(f"/api/v1/products/{product.id}/")
+    _reserve(product, 2)
+    reserved = api_client.get(f"/api/v1/products/{product.id}/?fields=stock_quantity")
+
+    assert cached.data["name"] == "Produto Teste"
+    assert renamed.data["name"] == "Renomeado"
+    assert reserved.data == {"stock_quantity": 8}
+
+
+@pytest.mark.django_db
+def test_product_list_response_is_cached_until_a_row_changes(api_client, product):
+    first = api_client.get("/api/v1/products/?is_active=true&page_size=10")
+    cached = api_client.get("/api/v1/products/?page_size=10&is_active=true")
+
+    _reserve(product, 4)
+    refreshed = api_client.get("/api/v1/products/?is_active=true&page_size=10")
+
+    assert cached["X-Cache"] == "HIT"
+    assert cached.json() == first.json()
+    assert refreshed.json()["results"][0]["stock_quantity"] == 6
+
+
+@pytest.mark.django_db
+def test_product_list_cache_is_dropped_by_any_stock_reservation(api_client, product):
+    other = Product.objects.create(sku="FORA-1", name="Fora", price=1, stock_quantity=5)
+    url = f"/api/v1/products/?sku={product.sku}"
+    api_client.get(url)
+
+    # O saldo ao vivo faz parte da listagem: a reserva derruba a tag da tabela inteira, mesmo
+    # que o produto não apareça na página.
+    _reserve(other, 1)
+    after = api_client.get(url)
+
+    assert after["X-Cache"] == "MISS"
+    assert after.json()["results"][0]["stock_quantity"] == 10
+
+
+@pytest.mark.django_db
+def test_product_list_cache_hit_runs_no_queries(api_client, product, django_assert_num_queries):
+    url = "/api/v1/products/?is_active=true"
+    first = api_client.get(url)
+
+    with django_assert_num_queries(0):
+        hit = api_client.get(url)
+    with django_assert_num_queries(0):
+        not_modified = api_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert hit["X-Cache"] == "HIT"
+    assert hit["ETag"] == first["ETag"]
+    assert hit["Last-Modified"] == first["Last-Modified"]
+    assert not_modified.status_code == 304
+
+
+@pytest.mark.django_db
+@override_settings(RESPONSE_CACHE_TTL=0)
+def test_expired_product_list_is_served_stale_while_locked(api_client, product, monkeypatch):
+    url = "/api/v1/products/?is_active=true"
+    first = api_client.get(url)
+
+    # Outro worker segura o lock de recálculo.
+    add = cache.add
+    monkeypatch.setattr(
+        cache,
+        "add",
+        lambda key, *args, **kwargs: not key.endswith(":lock") and add(key, *args, **kwargs),
+    )
+    stale = api_client.get(url)
+
+    assert stale["X-Cache"] == "STALE"
+    assert stale.json() == first.json()
@@ -0,0 +1,161 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from apps.customers.models import Customer
+from apps.orders.archive import archive_closed_orders
+from apps.orders.models import Order
+from apps.orders.serializers import OrderStatusUpdateSerializer
+from apps.products.models import Product
+from apps.reports.models import DailyStatusRollup
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def customer():
+    return Customer.objects.create(
+        name="Cliente Relatório",
+        document="52998224725",
+        email="relatorio@teste.com",
+        phone="11999999999",
+        address="Rua Relatório",
+    )
+
+
+@pytest.fixture
+def product():
+    return Product.objects.create(sku="REL-1", name="Relatório", price=10, stock_quantity=100)
+
+
+def create_order(api_client, customer, product, key, quantity):
+    response = api_client.post(
+        "/api/v1/orders/",
+        {
+            "customer_id": str(customer.id),
+            "idempotency_key": key,
+            "items": [{"product_id": str(product.id), "quantity": quantity}],
+        },
+        format="json",
+    )
+    assert response.status_code == 201
+    return response.data["id"]
+
+
+def report(api_client, group_by):
+    today = timezone.localdate().isoformat()
+    response = api_client.get(
+        "/api/v1/reports/", {"group_by": group_by, "date_from": today, "date_to": today}
+    )
+    assert response.status_code == 200
+    return [
+        {key: str(value) for key, value in row.items() if key not in ("customer", "product")}
+        for row in response.data["results"]
+    ]
+
+
+@pytest.mark.django_db
+def test_rollups_follow_creation_status_changes_and_cancellation(api_client, customer, product):
+    today = timezone.localdate()
+    first = create_order(api_client, customer, product, "rel-1", 2)
+    second = create_order(api_client, customer, product, "rel-2", 3)
+
+    api_client.patch(f"/api/v1/orders/{first}/status/", {"new_status": "CONFIRMED"})
+    api_client.delete(f"/api/v1/orders/{second}/")
+
+    assert report(api_client, "day_status") == [
+        {"day": str(today), "status": "CANCELED", "order_count": "1", "total_amount": "30.00"},
+        {"day": str(today), "status": "CONFIRMED", "order_count": "1", "total_amount": "20.00"},
+    ]
+    assert report(api_client, "customer_month") == [
+        {"month": str(today.replace(day=1)), "order_count": "1", "total_amount": "20.00"}
+    ]
+    assert report(api_client, "product_day") == [
+        {"day": str(today), "order_count": "1", "quantity": "2", "total_amount": "20.00"}
+    ]
+
+
+@pytest.mark.django_db
+def test_stale_status_update_does_not_count_the_transition_twice(api_client, customer, product):
+    order_id = create_order(api_client, customer, product, "rel-1", 2)
+    stale = OrderStatusUpdateSerializer(
+        data={"new_status": "CONFIRMED"}, context={"order": Order.objects.get(pk=order_id)}
+    )
+    assert stale.is_valid()
+
+    api_client.patch(f"/api/v1/orders/{order_id}/status/", {"new_status": "CONFIRMED"})
+    with pytest.raises(ValidationError):
+        stale.save()
+
+    assert report(api_client, "day_status") == [
+        {
+            "day": str(timezone.localdate()),
+            "status": "CONFIRMED",
+            "order_count": "1",
+            "total_amount": "20.00",
+        }
+    ]
+
+
+@pytest.mark.django_db
+def test_rebuild_reports_matches_incremental_rollups(api_client, customer, product):
+    first = create_order(api_client, customer, product, "rel-1", 2)
+    create_order(api_client, customer, product, "rel-2", 3)
+    api_client.delete(f"/api/v1/orders/{first}/")
+    incremental = {name: report(api_client, name) for name in ("day_status", "product_day")}
+
+    call_command("rebuild_reports", stdout=StringIO())
+
+    assert {name: report(api_client, name) for name in incremental} == incremental
+    assert set(DailyStatusRollup.objects.values_list("shard", flat=True)) == {0}
+
+
+@pytest.mark.django_db
+def test_bulk_status_transitions_match_rebuilt_rollups(api_client, customer, product):
+    orders = [create_order(api_client, customer, product, f"rel-{index}", 2) for index in range(3)]
+    api_client.post(
+        "/api/v1/orders/status/", {"order_ids": orders[:2], "new_status": "CANCELED"}, format="json"
+    )
+    names = ("day_status", "customer_month", "product_day")
+    incremental = {name: report(api_client, name) for name in names}
+
+    call_command("rebuild_reports", stdout=StringIO())
+
+    assert {name: report(api_client, name) for name in names} == incremental
+    assert incremental["product_day"][0]["quantity"] == "2"
+
+
+@pytest.mark.django_db
+def test_rebuild_reports_keeps_archived_orders(api_client, customer, product):
+    delivered = create_order(api_client, customer, product, "rel-1", 2)
+    canceled = create_order(api_client, customer, product, "rel-2", 3)
+    create_order(api_client, customer, product, "rel-3", 1)
+    for new_status in ("CONFIRMED", "SEPARATED", "SHIPPED", "DELIVERED"):
+        api_client.patch(f"/api/v1/orders/{delivered}/status/", {"new_status": new_status})
+    api_client.delete(f"/api/v1/orders/{canceled}/")
+    names = ("day_status", "customer_month", "product_day")
+    incremental = {name: report(api_client, name) for name in names}
+
+    assert sum(list(archive_closed_orders(older_than_days=0))) == 2
+    call_command("rebuild_reports", stdout=StringIO())
+
+    assert {name: report(api_client, name) for name in names} == incremental
+
+
+@pytest.mark.django_db
+def test_report_rejects_ranges_above_the_limit(api_client, settings):
+    settings.REPORT_MAX_RANGE_DAYS = 31
+
+    response = api_client.get(
+        "/api/v1/reports/",
+        {"group_by": "day_status", "date_from": "2026-01-01", "date_to": "2026-03-01"},
+    )
+
+    assert response.status_code == 400